@@ -1,4 +1,4 @@
-from mesa import Agent
+from core.base import Agent
 
 from agents.fire import Fire
 from agents.metal import Metal
@@ -42,13 +42,15 @@ class Bomb(Agent):
                     break
                 
                 # Si encuentra una roca, hacerla explotar y convertirla en un NumberMarker
+                number = self.model.exploration.number_at((x, y))
                 for obj in cell_contents:
-                    if isinstance(obj, Rock) and obj.has_power_item and obj.unique_id in self.model.visited_numbers:
+                    if isinstance(obj, Rock) and obj.has_power_item and number is not None:
                         # Crear el marcador numérico y transferir el ítem de poder si está presente
-                        number_marker = Joker((x, y), self.model, self.model.visited_numbers[obj.unique_id])
+                        number_marker = Joker((x, y), self.model, number)
                         self.model.grid.remove_agent(obj)  # Eliminar la roca
                         self.model.grid.place_agent(number_marker, (x, y))  # Colocar el NumberMarker
                         self.model.schedule.add(number_marker)  # Añadir al schedule
+                        self.model.notify_terrain_change((x, y))
                         break  # Detener la explosión en esta dirección si se encuentra una roca
 
         # Crear un marcador de explosión para cada posición afectada
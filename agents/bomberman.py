@@ -1,12 +1,21 @@
-from mesa import Agent
+from core.base import Agent
 from collections import deque
 from agents.bomb import Bomb
 from agents.fire import Fire
 from agents.rock import Rock
-from agents.metal import Metal
 from agents.numberMarker import NumberMarker
 from agents.joker import Joker
-from utils.search_algorithms import bomberman_heuristic, breadth_first_search_without_markers, get_neighbors_in_orthogonal_order, is_valid_move
+from core.log import get_logger
+from utils.adversarial import ADVERSARIAL_ALGORITHMS
+from utils.search_algorithms import bomberman_heuristic, breadth_first_search_without_markers, get_neighbors_in_orthogonal_order, is_valid_move, is_valid_move_for_escape
+
+logger = get_logger("agents.bomberman")
+
+# Acciones de un Bomberman controlado por una política externa (core.env):
+# quedarse, izquierda, derecha, abajo, arriba y, con el índice siguiente, poner una bomba
+ACTION_MOVES = ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1))
+PLACE_BOMB = len(ACTION_MOVES)
+
 
 class Bomberman(Agent):
     def __init__(self, pos, model):
@@ -22,9 +31,12 @@ class Bomberman(Agent):
         self.safe_position = None  # Posición segura donde Bomberman esperará
         self.exit_position =  self.find_exit_position()  # Posición de la roca con la salida
         self.visited_positions = deque(maxlen=5)
+        self.plan = []  # Acciones (posición, pone_bomba) del planificador en el tiempo, una por tick
+        self.waypoints = None  # Comodines a recoger antes de la salida (JokerRoutePlanner); None si no se planificó
+        self.controlled = False  # Si es True, step aplica self.action en lugar de buscar
+        self.action = 0
 
     def move(self):
-        print("move normal")
         """Controla los movimientos de Bomberman y gestiona la lógica de colocación de bombas y movimiento seguro."""
         # Si está esperando en la posición segura, verifica si la explosión ha terminado
         if self.waiting_for_explosion:
@@ -39,19 +51,13 @@ class Bomberman(Agent):
         # Si Bomberman está en el proceso de regresar al camino original
         if self.return_path:
             self.follow_return_path()  # Seguir el camino de regreso paso por paso
+            if not self.return_path and self.model.coordinator:
+                # Sus reservas se cambiaron por las de la huida: el resto del camino se replanifica
+                self.path = []
             return
 
         # Verifica si Bomberman encuentra una roca con un ítem de poder
-        rock = self.model.grid.get_cell_list_contents([self.pos])
-        for obj in rock:
-            if isinstance(obj, Joker):
-                self.increase_power()  # Incrementa el poder de la bomba
-                x, y = obj.pos
-                number_marker = NumberMarker((x, y), obj.model, obj.value)
-                self.model.grid.remove_agent(obj)  # Eliminar la roca
-                self.model.grid.place_agent(number_marker, (x, y))  # Colocar el NumberMarker
-                self.model.schedule.add(number_marker)  # Añadir al schedule
-
+        self.pick_up_joker()
 
         exit_position = self.find_exit_position()
 
@@ -67,19 +73,86 @@ class Bomberman(Agent):
             self.place_bomb()
             self.exit_found = True
             self.calculate_safe_path()
+            if self.model.coordinator and self.waiting_for_explosion:
+                self.model.coordinator.escape(self)
             return
 
         # Calcular un nuevo camino si es necesario
-        if exit_position and not self.path:
-            self.path = self.model.run_search_algorithm(self.pos, exit_position)
+        target = self.current_target()
+        if target and not self.path:
+            if self.model.coordinator:
+                self.path = self.model.coordinator.path_for(self, target)
+            else:
+                self.path = self.model.run_search_algorithm(self.pos, target)
           
         # Colocar bomba si un bloque está en el camino
         if self.is_block_in_the_way() and not self.placed_bomb:
             self.place_bomb()
             self.calculate_safe_path()
+            if self.model.coordinator and self.waiting_for_explosion:
+                self.model.coordinator.escape(self)
         else:
             self.follow_path()  # Moverse si no hay bloque en el camino
 
+    def move_planned(self):
+        """
+        Sigue el plan de BombPlanner: cada tramo con rocas ya trae dónde poner la bomba,
+        dónde esperar la explosión y en qué tick volver, así que no hay espera reactiva.
+        Si un tramo no se puede planificar, ese tramo se resuelve con move().
+        """
+        if self.waiting_for_explosion or self.return_path:
+            self.move()
+            return
+        if self.pick_up_joker():
+            self.plan = []  # Con más poder cambian el alcance y el tiempo de las bombas
+
+        if not self.plan:
+            exit_position = self.find_exit_position()
+            planner = self.model.bomb_planner
+            if not exit_position or planner.fire_on_rocks():
+                return
+            target = self.current_target()
+            if not self.path:
+                if self.model.coordinator:
+                    self.path = self.model.coordinator.path_for(self, target)
+                else:
+                    self.path = self.model.run_search_algorithm(self.pos, target)
+                if not self.path:
+                    return
+            plan, rest = planner.plan(self.pos, self.path, self.power)
+            if plan is None:
+                self.placed_bomb = planner.active_bomb() is not None
+                self.move()
+                return
+            self.plan, self.path = plan, rest
+            if not self.plan:
+                return
+
+        position, place_bomb = self.plan.pop(0)
+        if position != self.pos:
+            if self.is_block_present(position):
+                # El terreno no cambió cuando se esperaba (p. ej. otro Bomberman): se replanifica
+                self.plan, self.path = [], []
+                return
+            self.model.grid.move_agent(self, position)
+        if place_bomb:
+            self.place_bomb()
+        if self.pos == self.exit_position:
+            self.model.finish_game()
+
+    def pick_up_joker(self):
+        """Recoge el comodín de la casilla actual, si hay uno, y aumenta el poder de la bomba."""
+        for obj in self.model.grid.get_cell_list_contents([self.pos]):
+            if isinstance(obj, Joker):
+                self.increase_power()  # Incrementa el poder de la bomba
+                x, y = obj.pos
+                number_marker = NumberMarker((x, y), obj.model, obj.value)
+                self.model.grid.remove_agent(obj)  # Eliminar la roca
+                self.model.grid.place_agent(number_marker, (x, y))  # Colocar el NumberMarker
+                self.model.schedule.add(number_marker)  # Añadir al schedule
+                return True
+        return False
+
     def move_alphabeta(self):
         """Controla los movimientos de Bomberman usando poda alfa-beta."""
         if self.waiting_for_explosion:
@@ -91,7 +164,7 @@ class Bomberman(Agent):
                 exit_position = self.find_exit_position()
                 if exit_position:
                     best_move = self.model.run_search_algorithm(self.pos, exit_position, is_balloon=False)
-                    print(f"Bomberman recalcula camino tras explosión. Mejor movimiento: {best_move}")
+                    logger.debug("Bomberman recalcula camino tras explosión. Mejor movimiento: %s", best_move)
                     if best_move:
                         self.model.grid.move_agent(self, best_move)
             else:
@@ -104,11 +177,13 @@ class Bomberman(Agent):
 
         # Si la salida está libre y no hay obstáculos, moverse directamente hacia allí
         if self.exit_found and exit_position and not self.is_block_present(exit_position):
-            print(f"Bomberman encontró la salida accesible. Recalculando con poda alfa-beta desde {self.pos} hacia {exit_position}.")
+            logger.debug("Bomberman encontró la salida accesible. Recalculando con poda alfa-beta desde %s hacia %s.",
+                         self.pos, exit_position)
             
             # Volver a aplicar la lógica de poda alfa-beta
             best_move = self.model.run_search_algorithm(self.pos, exit_position, is_balloon=False)
-            print(f"Bomberman está en {self.pos}. Salida en {exit_position}. Mejor movimiento calculado: {best_move}")
+            logger.debug("Bomberman está en %s. Salida en %s. Mejor movimiento calculado: %s",
+                         self.pos, exit_position, best_move)
 
             # Verificar que el movimiento mejora la heurística
             if best_move:
@@ -116,16 +191,18 @@ class Bomberman(Agent):
                 next_heuristic = bomberman_heuristic(best_move, exit_position, self.model)
 
                 if next_heuristic >= current_heuristic:
-                    print(f"Recalculando movimiento, {best_move} no mejora la heurística desde la posición actual {self.pos}.")
+                    logger.debug("Recalculando movimiento, %s no mejora la heurística desde la posición actual %s.",
+                                 best_move, self.pos)
+                    self.model.events["alfa_beta_recalculado"] += 1
                     neighbors = get_neighbors_in_orthogonal_order(self.pos, self.model)
                     valid_alternatives = [n for n in neighbors if is_valid_move(n, self.model)]
                     if valid_alternatives:
                         best_move = min(valid_alternatives, key=lambda n: bomberman_heuristic(n, exit_position, self.model))
-                        print(f"Nuevo mejor movimiento seleccionado: {best_move}")
+                        logger.debug("Nuevo mejor movimiento seleccionado: %s", best_move)
 
             # Ejecutar el mejor movimiento
             if best_move:
-                print(f"Bomberman se mueve de {self.pos} a {best_move} utilizando poda alfa-beta hacia la salida.")
+                logger.debug("Bomberman se mueve de %s a %s utilizando poda alfa-beta hacia la salida.", self.pos, best_move)
                 self.model.grid.move_agent(self, best_move)
 
             # Terminar el juego solo si Bomberman alcanza la salida
@@ -143,7 +220,7 @@ class Bomberman(Agent):
 
         # Usar poda alfa-beta para buscar el mejor movimiento
         best_move = self.model.run_search_algorithm(self.pos, exit_position, is_balloon=False)
-        print(f"Bomberman está en {self.pos}. Mejor movimiento calculado: {best_move}")
+        logger.debug("Bomberman está en %s. Mejor movimiento calculado: %s", self.pos, best_move)
 
         # Verificar que el movimiento mejora la heurística
         if best_move:
@@ -151,72 +228,93 @@ class Bomberman(Agent):
             next_heuristic = bomberman_heuristic(best_move, exit_position, self.model)
 
             if next_heuristic >= current_heuristic:
-                print(f"Recalculando movimiento, {best_move} no mejora la heurística.")
+                logger.debug("Recalculando movimiento, %s no mejora la heurística.", best_move)
+                self.model.events["alfa_beta_recalculado"] += 1
                 neighbors = get_neighbors_in_orthogonal_order(self.pos, self.model)
                 valid_alternatives = [n for n in neighbors if is_valid_move(n, self.model)]
                 if valid_alternatives:
                     best_move = min(valid_alternatives, key=lambda n: bomberman_heuristic(n, exit_position, self.model))
-                    print(f"Nuevo mejor movimiento seleccionado: {best_move}")
+                    logger.debug("Nuevo mejor movimiento seleccionado: %s", best_move)
 
         # Ejecutar el mejor movimiento
         if best_move:
             self.model.grid.move_agent(self, best_move)
 
-    def calculate_safe_path_alphabeta(self):
-        """Calcula una zona segura teniendo en cuenta globos y explosiones."""
-        from collections import deque
+    def move_stochastic(self):
+        """
+        Controla los movimientos de Bomberman con Expectimax o MCTS.
 
-        queue = deque([(self.pos, 0)])  # (posición actual, distancia)
-        visited = set([self.pos])  # Para evitar revisitar posiciones
-        potential_safe_positions = []  # Posiciones consideradas seguras
+        La espera de la explosión y la bomba junto a la salida son las de move_alphabeta,
+        pero el movimiento que devuelve la búsqueda se ejecuta tal cual: ya promedia los
+        movimientos al azar de los globos, y reemplazarlo por el vecino de mejor
+        bomberman_heuristic descartaría ese modelo.
+        """
+        if self.waiting_for_explosion:
+            if self.is_explosion_over():
+                self.waiting_for_explosion = False
+                self.placed_bomb = False
+            else:
+                self.follow_safe_path()
+                return
 
-        while queue:
-            current_pos, distance = queue.popleft()
+        exit_position = self.find_exit_position()
+        if not exit_position:
+            return
+
+        # Colocar bomba si está adyacente a la roca con la salida
+        if self.is_adjacent(exit_position) and not self.exit_found:
+            self.place_bomb()
+            self.exit_found = True
+            self.calculate_safe_path_alphabeta()
+            return
+
+        best_move = self.model.run_search_algorithm(self.pos, exit_position, is_balloon=False)
+        logger.debug("Bomberman está en %s. Mejor movimiento calculado: %s", self.pos, best_move)
+        if best_move:
+            self.model.grid.move_agent(self, best_move)
 
-            # Verificar si la posición es segura
-            if self.is_safe_position_alphabeta(current_pos):
-                potential_safe_positions.append((current_pos, distance))
+        # Terminar el juego solo si Bomberman alcanza la salida ya libre
+        if self.pos == exit_position and not self.is_block_present(exit_position):
+            self.model.finish_game()
 
-            # Expandir vecinos ortogonales
-            for neighbor in get_neighbors_in_orthogonal_order(current_pos, self.model):
-                if neighbor not in visited and self.is_valid_move_for_escape(neighbor):
-                    visited.add(neighbor)
-                    queue.append((neighbor, distance + 1))
+    def calculate_safe_path_alphabeta(self):
+        """
+        Calcula una zona segura teniendo en cuenta globos y explosiones.
+
+        Las casillas alcanzables, las explosiones y la vecindad de los globos se
+        calculan como bitboards; la heurística solo se evalúa sobre las casillas que
+        quedan seguras.
+        """
+        boards = self.model.get_bitboards()
+        layers = boards.layers(self.pos, boards.walkable())
+        balloons = boards.board([agent.pos for agent in self.model.balloons if agent.pos is not None])
+        # Fuera de la explosión y a más de un movimiento de cualquier globo
+        unsafe = boards.blast(self.pos, self.power) | boards.dilate(balloons)
+        reachable = 0
+        for layer in layers:
+            reachable |= layer
+        safe_positions = boards.cells(reachable & ~unsafe)
 
         # Evaluar posiciones seguras con heurística (máxima distancia a globos, mínima a salida)
-        if potential_safe_positions:
+        if safe_positions:
+            exit_position = self.find_exit_position()
             safe_position = min(
-                potential_safe_positions,
+                safe_positions,
                 key=lambda pos: (
-                    bomberman_heuristic(pos[0], self.find_exit_position(), self.model),
-                    -self.distance_to_closest_balloon(pos[0])
+                    bomberman_heuristic(pos, exit_position, self.model),
+                    -self.distance_to_closest_balloon(pos)
                 )
-            )[0]
+            )
             self.safe_position = safe_position
-            self.safe_path = breadth_first_search_without_markers(self.pos, safe_position, self.model)
+            self.safe_path = boards.path(layers, boards.bit(safe_position))
             self.waiting_for_explosion = True
 
-    def is_safe_position_alphabeta(self, pos):
-        from agents.balloon import Balloon
-        """Determina si una posición es segura considerando globos y explosiones."""
-        # Verificar si está fuera del rango de explosión
-        if not self.is_safe_position(pos):
-            return False
-
-        # Verificar si está lejos de los globos
-        for agent in self.model.schedule.agents:
-            if isinstance(agent, Balloon):
-                balloon_distance = abs(pos[0] - agent.pos[0]) + abs(pos[1] - agent.pos[1])
-                if balloon_distance <= 1:  # Posición insegura si está a 1 movimiento del globo
-                    return False
-        return True
-
     def distance_to_closest_balloon(self, pos):
         from agents.balloon import Balloon
         """Calcula la distancia al globo más cercano desde una posición."""
         min_distance = float('inf')
         for agent in self.model.schedule.agents:
-            if isinstance(agent, Balloon):
+            if isinstance(agent, Balloon) and agent.pos is not None:
                 balloon_distance = abs(pos[0] - agent.pos[0]) + abs(pos[1] - agent.pos[1])
                 min_distance = min(min_distance, balloon_distance)
         return min_distance
@@ -257,47 +355,21 @@ class Bomberman(Agent):
       
 
     def calculate_safe_path(self):
-        """Calcula el camino paso a paso hacia una posición segura usando un BFS sin marcar casillas."""
-        queue = deque([(self.pos, 0)])
-        visited = set([self.pos])
-
-        while queue:
-            current_pos, _ = queue.popleft()
-            if self.is_safe_position(current_pos):
-                self.safe_position = current_pos
-                self.safe_path = breadth_first_search_without_markers(self.pos, current_pos, self.model)
-              
-                self.waiting_for_explosion = True
-                return
-
-            # Expande vecinos ortogonales
-            for neighbor in get_neighbors_in_orthogonal_order(current_pos, self.model):
-                if neighbor not in visited and self.is_valid_move_for_escape(neighbor):
-                    visited.add(neighbor)
-                    queue.append((neighbor, 1))
-
-    def is_safe_position(self, pos):
-        """Determina si una posición está fuera del alcance de la explosión y no contiene obstáculos como rocas."""
-        x, y = self.pos
-        px, py = pos
-        if not (x == px and abs(py - y) <= self.power) and not (y == py and abs(px - x) <= self.power):
-            # Verifica que la posición no contenga una roca
-            cell_contents = self.model.grid.get_cell_list_contents(pos)
-            if not any(isinstance(obj, Rock) for obj in cell_contents):
-                return True
-        return False
-
-
-    def is_valid_move_for_escape(self, pos):
-        """Determina si Bomberman puede moverse a una posición para escapar de la explosión."""
-        x, y = pos
-        if (x, y) == (1,2):
-            print("hola")
-        cell_contents = self.model.grid.get_cell_list_contents(pos)
-        for obj in cell_contents:
-            if isinstance(obj, Rock) or isinstance(obj, Metal):
-                return False
-        return True
+        """
+        Calcula el camino hacia la casilla segura más cercana.
+
+        Una expansión por anchura con bitboards avanza capa por capa sobre las casillas
+        sin rocas ni metal hasta tocar una casilla fuera de la explosión de la bomba
+        recién puesta; desempata igual que la BFS casilla por casilla, así que elige la
+        misma casilla y el mismo camino.
+        """
+        boards = self.model.get_bitboards()
+        safe = boards.full & ~boards.blast(self.pos, self.power)
+        path = boards.path(boards.layers(self.pos, boards.walkable(), until=safe), safe)
+        if path:
+            self.safe_position = path[-1]
+            self.safe_path = path
+            self.waiting_for_explosion = True
 
     def calculate_return_path(self):
         """Calcula el camino de regreso al último punto explorado antes de ir a la posición segura."""
@@ -332,6 +404,27 @@ class Bomberman(Agent):
         """Busca la posición de la roca que contiene la salida (R_s)."""
         return self.model.exit_position
 
+    def current_target(self):
+        """
+        Próxima meta del camino: el siguiente comodín de la ruta o la salida.
+
+        Sin JokerRoutePlanner la meta es siempre la salida. Con él, la ruta se calcula la
+        primera vez y cada comodín sale de ella al recogerlo, si se perdió (una roca que
+        explotó sin número de exploración se destruye con su comodín) o si quedó fuera de
+        alcance; en esos casos también se descarta el camino que iba hacia él.
+        """
+        exit_position = self.find_exit_position()
+        planner = self.model.joker_planner
+        if planner is None or not exit_position:
+            return exit_position
+        if self.waypoints is None:
+            self.waypoints = planner.plan(self.pos, self.power)
+        while self.waypoints and (self.waypoints[0] == self.pos or not planner.has_joker(self.waypoints[0])
+                                  or not self.model.is_reachable(self.pos, self.waypoints[0])):
+            if self.waypoints.pop(0) != self.pos:
+                self.path = []
+        return self.waypoints[0] if self.waypoints else exit_position
+
     def follow_path(self):
         """Sigue el camino calculado hacia la salida o la siguiente posición."""
         if self.path:
@@ -341,10 +434,41 @@ class Bomberman(Agent):
             if next_position == self.exit_position:  
                 self.model.finish_game()
 
+    def act(self, action):
+        """
+        Aplica una acción elegida desde afuera con las mismas reglas del juego.
+
+        Un movimiento hacia metal, roca o fuera del mapa deja a Bomberman en su lugar, y
+        no se pone una segunda bomba en la misma casilla.
+
+        Args:
+            action (int): Índice en ACTION_MOVES, o PLACE_BOMB.
+        """
+        if action == PLACE_BOMB:
+            if not any(isinstance(obj, Bomb) for obj in self.model.grid.get_cell_list_contents([self.pos])):
+                self.place_bomb()
+            return
+        dx, dy = ACTION_MOVES[action]
+        target = (self.pos[0] + dx, self.pos[1] + dy)
+        if target != self.pos and not self.model.grid.out_of_bounds(target) and is_valid_move_for_escape(target, self.model):
+            self.model.grid.move_agent(self, target)
+            self.pick_up_joker()
+            if self.pos == self.exit_position:
+                self.model.finish_game()
+
     def step(self):
-        self.model.update_previous_position(self, self.pos)
-        if self.model.algorithm == "AlphaBeta":
+        # Otro Bomberman ya llegó a la salida en este tick
+        if not self.model.running:
+            return
+        if self.controlled:
+            self.act(self.action)
+        # Los modos adversariales deciden un movimiento por tick
+        elif self.model.algorithm == "AlphaBeta":
             self.move_alphabeta()
+        elif self.model.algorithm in ADVERSARIAL_ALGORITHMS:
+            self.move_stochastic()
+        elif self.model.bomb_planner:
+            self.move_planned()
         else:
             self.move()
         
@@ -1,4 +1,4 @@
-from mesa import Agent
+from core.base import Agent
 from agents.rock import Rock
 
 
@@ -9,21 +9,17 @@ class Fire(Agent):
         self.life_span = 1  # Duración de la explosión visual
 
     def step(self):
-        from agents.balloon import Balloon
         # Reducir la duración y eliminar después de un paso
         self.life_span -= 1
         if self.life_span <= 0:
-            # Eliminar cualquier bloque o globo en la posición del FireMarker
+            # Eliminar los bloques en la posición del FireMarker; los globos alcanzados
+            # se eliminan en la fase de colisiones del modelo, al final de cada tick
             cell_contents = self.model.grid.get_cell_list_contents(self.pos)
             for obj in cell_contents:
                 if isinstance(obj, Rock):  # Destruye todas las rocas, incluyendo la que tiene salida
                     self.model.grid.remove_agent(obj)
-                  
-                if isinstance(obj, Balloon):  # Eliminar globos afectados por la explosión
-                    self.model.grid.remove_agent(obj)
-                    print(f"Globo destruido en {self.pos} por la explosión")
-                   
-                    
+                    self.model.notify_terrain_change(self.pos)
+
             # Convertir la posición en camino libre y eliminar el FireMarker
             self.model.grid.remove_agent(self)
             self.model.schedule.remove(self)
@@ -1,5 +1,7 @@
-from mesa import Agent
+from core.base import Agent
 class Joker(Agent):
+    inert = True  # step no hace nada: EventActivation no lo activa
+
     def __init__(self, pos, model, value):
         super().__init__(pos, model)
         self.pos = pos
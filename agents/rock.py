@@ -1,7 +1,8 @@
-from mesa import Agent
-import random
+from core.base import Agent
 
 class Rock(Agent):
+    inert = True  # step no hace nada: EventActivation no lo activa
+
     def __init__(self, pos, model, has_power_item=False, has_exit=False):
         super().__init__(pos, model)
         self.pos = pos
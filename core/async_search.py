@@ -0,0 +1,125 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from agents.balloon import Balloon
+
+
+class SearchCancelled(Exception):
+    """Se lanza dentro de una búsqueda en segundo plano cuyo resultado ya no sirve."""
+
+
+class SearchContext:
+    """
+    Vista del modelo que reciben las búsquedas ejecutadas en segundo plano.
+
+    Las lecturas de la grilla van directo a model.grid (leer la lista de una casilla es
+    seguro entre hilos, y no se guarda una referencia a una grilla vieja tras un
+    reinicio); si el terreno cambia mientras tanto, la revisión de la grilla
+    cambia y el resultado se descarta. Lo que la búsqueda escribe (marcadores de
+    exploración y estados exportados) se acumula aquí y el hilo principal lo aplica
+    al recibir el resultado. Los globos se copian al crear la vista para que la
+    heurística vea posiciones fijas. La semilla de MCTS se sortea aquí, en el hilo
+    principal, en el mismo punto de la secuencia de model.random que sin búsqueda
+    asíncrona.
+    """
+
+    def __init__(self, model):
+        self._model = model
+        self.schedule = SimpleNamespace(agents=[
+            copy.copy(agent) for agent in model.schedule.agents
+            if isinstance(agent, Balloon) and agent.pos is not None
+        ])
+        self.visited = []
+        self.states = []
+        self.cancelled = False
+        self.search_seed = model.random.randrange(2 ** 32) if model.algorithm == "MCTS" else None
+        self.elapsed = 0.0  # Duración de la búsqueda, medida en el executor
+
+    def place_agent_number(self, pos, number):
+        if self.cancelled:
+            raise SearchCancelled()
+        self.visited.append((pos, number))
+
+    def record_state(self, position, heuristic_value=None):
+        if self.cancelled:
+            raise SearchCancelled()
+        self.states.append((position, heuristic_value))
+
+    def __getattr__(self, name):
+        # Configuración del modelo (algoritmo, heurística, dimensiones, ...)
+        return getattr(self._model, name)
+
+
+class AsyncSearchPlanner:
+    """
+    Ejecuta las búsquedas del modelo en un executor para no bloquear el paso de la simulación.
+
+    request() devuelve None mientras la búsqueda está en curso y el resultado cuando
+    termina; el agente que pidió el camino simplemente espera (o sigue su plan actual)
+    y vuelve a preguntar en el siguiente tick. Las solicitudes hechas sobre una revisión
+    anterior de la grilla, o que nadie volvió a pedir, se cancelan.
+
+    Args:
+        model (BombermanModel): Modelo dueño de las búsquedas.
+        executor (Executor, optional): Executor compartido; por defecto se crea uno de un solo hilo.
+    """
+
+    def __init__(self, model, executor=None):
+        self.model = model
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="bomberman-search")
+        self.pending = {}  # (inicio, meta, es_globo, revisión) -> [future, contexto, último tick pedido]
+        self.compute_time = 0.0  # Segundos de búsqueda cuyos resultados ya se entregaron
+
+    def request(self, start, goal, is_balloon=False):
+        tick = self.model.schedule.steps
+        self.discard_stale(self.model.grid_revision, tick)
+
+        key = (start, goal, is_balloon, self.model.grid_revision)
+        entry = self.pending.get(key)
+        if entry is None:
+            context = SearchContext(self.model)
+            future = self.executor.submit(self.run_search, context, start, goal, is_balloon)
+            self.pending[key] = [future, context, tick]
+            return None
+
+        future, context, _ = entry
+        if not future.done():
+            entry[2] = tick
+            return None
+
+        del self.pending[key]
+        for pos, number in context.visited:
+            self.model.place_agent_number(pos, number)
+        for position, heuristic_value in context.states:
+            self.model.record_state(position, heuristic_value)
+        if "search_stats" in context.__dict__:
+            self.model.search_stats = context.search_stats
+        self.compute_time += context.elapsed
+        self.model.count_search(context.elapsed, context.__dict__.get("search_stats", {}))
+        return future.result()
+
+    def run_search(self, context, start, goal, is_balloon):
+        """Ejecuta la búsqueda en el executor y deja en context.elapsed cuánto tardó."""
+        started = time.perf_counter()
+        try:
+            return self.model.execute_search(start, goal, is_balloon, context)
+        finally:
+            context.elapsed = time.perf_counter() - started
+
+    def discard_stale(self, revision, tick):
+        """Cancela las búsquedas de otra revisión de la grilla o abandonadas en el tick anterior."""
+        for key, (future, context, last_tick) in list(self.pending.items()):
+            if key[3] != revision or last_tick < tick - 1:
+                context.cancelled = True
+                future.cancel()
+                del self.pending[key]
+
+    def shutdown(self):
+        for future, context, _ in self.pending.values():
+            context.cancelled = True
+            future.cancel()
+        self.pending.clear()
+        if self.owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
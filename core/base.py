@@ -0,0 +1,58 @@
+import random
+
+
+class Model:
+    """
+    Base mínima de BombermanModel con la parte de mesa.Model que usa el proyecto.
+
+    Importar mesa carga también su visualización (tornado), pandas y networkx, lo que
+    cuesta casi medio segundo en cada proceso. Con esta base el núcleo de la simulación
+    no importa mesa: solo el backend "mesa" (MultiGrid y RandomActivation) y la vista
+    web lo hacen, al crearlos. RandomActivation solo necesita model.random y
+    _advance_time.
+    """
+
+    def __init__(self):
+        self.random = random.Random()
+        self._seed = None
+        self._steps = 0
+        self._time = 0
+        self.running = True
+        self.schedule = None
+        self.current_id = 0
+
+    def reset_randomizer(self, seed=None):
+        if seed is None:
+            seed = self._seed if self._seed is not None else random.random()
+        self.random.seed(seed)
+        self._seed = seed
+
+    def next_id(self):
+        self.current_id += 1
+        return self.current_id
+
+    def _advance_time(self, deltat=1):
+        self._steps += 1
+        self._time += deltat
+
+
+class Agent:
+    """
+    Base mínima de los agentes, con la interfaz de mesa.Agent que usan el juego y la
+    grilla. A diferencia de Mesa, el agente no se registra en el modelo: solo lo
+    guardan la grilla y el scheduler, así que al retirarlo no queda ninguna referencia.
+    """
+
+    inert = False  # True si step no hace nada; EventActivation no lo activa
+
+    def __init__(self, unique_id, model):
+        self.unique_id = unique_id
+        self.model = model
+        self.pos = None
+
+    @property
+    def random(self):
+        return self.model.random
+
+    def step(self):
+        pass
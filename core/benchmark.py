@@ -0,0 +1,174 @@
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+from core.log import configure_logging
+from core.model import BombermanModel
+from utils.map_generator import LAYOUTS, generate_map, parse_size
+
+# Módulos del núcleo que se importan en cada proceso (CLI, benchmark, workers de MCTS)
+CORE_MODULES = ("core.model", "agents.bomberman", "utils.search_algorithms")
+# Visualización, servidor y sus dependencias: el núcleo no debe cargarlos
+HEAVY_MODULES = ("mesa", "tornado", "pandas", "networkx", "core.server")
+
+
+def run_episode(map_file, algorithm, heuristic="Manhattan", seed=0, max_steps=500, **model_kwargs):
+    """
+    Ejecuta un episodio completo sin interfaz gráfica y mide su duración.
+
+    Args:
+        map_file (str): Ruta del mapa a cargar.
+        algorithm (str): Algoritmo de búsqueda de Bomberman.
+        heuristic (str): Heurística para los algoritmos informados.
+        seed (int): Semilla del generador del modelo; con la misma semilla el episodio se repite idéntico.
+        max_steps (int): Número máximo de pasos antes de cortar el episodio.
+
+    Returns:
+        dict: Configuración del episodio, pasos ejecutados, si terminó, picos de memoria de
+            las búsquedas (frontera y nodos guardados), conteo de eventos del juego y tiempo
+            de pared en segundos.
+    """
+    start = time.perf_counter()
+    # Sin archivo de estados por defecto: escribirlo en cada nodo domina el tiempo en mapas grandes
+    model_kwargs.setdefault("export_file", None)
+    model = BombermanModel(map_file, algorithm, heuristic, seed=seed, **model_kwargs)
+    steps = 0
+    frontier_peak = nodes_stored = 0
+    try:
+        while model.running and steps < max_steps:
+            model.step()
+            steps += 1
+            frontier_peak = max(frontier_peak, model.search_stats.get("frontier_peak", 0))
+            nodes_stored = max(nodes_stored, model.search_stats.get("nodes_stored", 0))
+    finally:
+        model.close()
+    return {
+        "map_file": map_file,
+        "algorithm": algorithm,
+        "heuristic": heuristic,
+        "seed": seed,
+        "steps": steps,
+        "finished": not model.running,
+        "frontier_peak": frontier_peak,
+        "nodes_stored": nodes_stored,
+        "events": dict(model.events),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def run_batch(map_files, algorithms, heuristic="Manhattan", seeds=(0,), max_steps=500, **model_kwargs):
+    """
+    Ejecuta todas las combinaciones de mapa, algoritmo y semilla.
+
+    Cada fila del resultado incluye su semilla, de modo que cualquier corrida
+    lenta puede repetirse de forma aislada con run_episode. Un mapa puede ser
+    la ruta de un archivo o un par (nombre, filas) generado en memoria.
+
+    Returns:
+        list: Un diccionario por episodio, en el formato de run_episode.
+    """
+    results = []
+    for map_file in map_files:
+        name, rows = map_file if isinstance(map_file, tuple) else (map_file, None)
+        for algorithm in algorithms:
+            for seed in seeds:
+                results.append(run_episode(name, algorithm, heuristic, seed, max_steps, map_data=rows, **model_kwargs))
+    return results
+
+
+def measure_import(module):
+    """
+    Importa module en un intérprete nuevo y mide el tiempo con -X importtime.
+
+    Returns:
+        tuple: (milisegundos acumulados de la importación, módulos de HEAVY_MODULES que se cargaron).
+    """
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True, cwd=root)
+    elapsed = 0
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            elapsed = int(parts[1]) / 1000
+    return elapsed, [name for name in result.stdout.strip().split(",") if name]
+
+
+def check_imports(max_ms):
+    """Imprime el tiempo de importación del núcleo; devuelve False si supera max_ms o carga algo pesado."""
+    ok = True
+    print(f"{'módulo':<26} {'ms':>8}  pesados")
+    for module in CORE_MODULES:
+        elapsed, heavy = measure_import(module)
+        ok = ok and elapsed <= max_ms and not heavy
+        print(f"{module:<26} {elapsed:>8.1f}  {', '.join(heavy) or '-'}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por lotes de la simulación de Bomberman.")
+    parser.add_argument("maps", nargs="*", help="Archivos de mapa a evaluar.")
+    parser.add_argument("--generate", metavar="ANCHOxALTO",
+                        help="Además de los archivos, evalúa mapas generados en memoria de este tamaño.")
+    parser.add_argument("--layout", default="classic", choices=LAYOUTS, help="Distribución de los mapas generados.")
+    parser.add_argument("--map-count", type=int, default=1, help="Cantidad de mapas generados.")
+    parser.add_argument("--algorithms", default="BFS,DFS,UCS,BS,HC,A*,IDA*,SMA*,HPA*,AlphaBeta,Expectimax,MCTS",
+                        help="Algoritmos separados por comas.")
+    parser.add_argument("--heuristic", default="Manhattan", choices=["Manhattan", "Euclidiana", "Exacta", "ALT"])
+    parser.add_argument("--seeds", default="0", help="Semillas separadas por comas, o un rango 'inicio:fin'.")
+    parser.add_argument("--max-steps", type=int, default=500)
+    parser.add_argument("--node-budget", type=int, default=None, help="Límite de nodos para IDA* y SMA*.")
+    parser.add_argument("--backend", default="lean", choices=["lean", "event", "mesa"],
+                        help="Grilla y scheduler del modelo; 'lean' y 'event' son los rápidos sin interfaz.")
+    parser.add_argument("--bomb-planning", action="store_true",
+                        help="Planifica bomba, escondite y regreso en el tiempo en lugar de reaccionar a cada roca.")
+    parser.add_argument("--corridors", action="store_true",
+                        help="UCS y A* buscan sobre el grafo de pasillos contraídos (mapas tipo laberinto).")
+    parser.add_argument("--collect-jokers", action="store_true",
+                        help="Bomberman recoge los comodines que acortan la partida antes de ir a la salida.")
+    parser.add_argument("--cooperative", action="store_true",
+                        help="Con varios Bomberman, planifica sus caminos en lote con reservas en el tiempo "
+                             "(A* espacio-temporal en lugar de los algoritmos elegidos).")
+    parser.add_argument("--import-time", action="store_true",
+                        help="Solo mide la importación del núcleo; falla si es lenta o carga la visualización.")
+    parser.add_argument("--max-import-ms", type=float, default=200.0)
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Nivel mínimo de los registros del juego (colisiones, globos destruidos, ...).")
+    parser.add_argument("--debug", action="store_true", help="Activa el canal de depuración (varios mensajes por tick).")
+    args = parser.parse_args(argv)
+    configure_logging(getattr(logging, args.log_level), debug=args.debug or None)
+    if args.import_time:
+        sys.exit(0 if check_imports(args.max_import_ms) else 1)
+
+    if ":" in args.seeds:
+        first, last = args.seeds.split(":")
+        seeds = range(int(first), int(last))
+    else:
+        seeds = [int(seed) for seed in args.seeds.split(",")]
+
+    maps = list(args.maps)
+    if args.generate:
+        width, height = parse_size(args.generate)
+        maps += [(f"{args.layout}-{width}x{height}-{index}", generate_map(width, height, args.layout, seed=index))
+                 for index in range(args.map_count)]
+    if not maps:
+        parser.error("Indica archivos de mapa o --generate.")
+
+    results = run_batch(maps, args.algorithms.split(","), args.heuristic, seeds, args.max_steps,
+                        search_node_budget=args.node_budget, backend=args.backend,
+                        bomb_planning=args.bomb_planning, contract_corridors=args.corridors,
+                        collect_jokers=args.collect_jokers, cooperative_planning=args.cooperative)
+    print(f"{'mapa':<24} {'algoritmo':<10} {'semilla':>8} {'pasos':>6} {'fin':>4} "
+          f"{'frontera':>9} {'memoria':>8} {'colisiones':>10} {'tiempo (s)':>10}")
+    for row in results:
+        collisions = row['events'].get("colision_directa", 0) + row['events'].get("colision_alternada", 0)
+        print(f"{row['map_file']:<24} {row['algorithm']:<10} {row['seed']:>8} {row['steps']:>6} "
+              f"{'sí' if row['finished'] else 'no':>4} {row['frontier_peak']:>9} {row['nodes_stored']:>8} "
+              f"{collisions:>10} {row['elapsed']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+from heapq import heappush, heappop
+from itertools import count
+from utils.search_algorithms import cell_cost, get_neighbors_in_orthogonal_order, report_search_stats
+
+# Ticks extra que un agente puede esperar o desviarse respecto del camino sin reservas
+PLANNING_SLACK = 20
+# Ticks que el fuego sigue en el mapa después de que explota la bomba
+FIRE_TICKS = 1
+
+
+class ReservationTable:
+    """
+    Tabla espacio-tiempo de casillas reservadas por los caminos ya planificados.
+
+    Una reserva (posición, tick) indica dónde estará un agente al final de ese tick;
+    además de ocupar la casilla, impide que otro agente intercambie posiciones con él.
+    """
+
+    def __init__(self):
+        self.cells = {}  # (posición, tick) -> agente
+        self.owned = {}  # agente -> [(posición, tick)]
+
+    def is_free(self, pos, tick, agent):
+        return self.cells.get((pos, tick), agent) is agent
+
+    def can_move(self, agent, origin, target, tick):
+        """Comprueba que agent pueda pasar de origin (tick) a target (tick + 1)."""
+        if not self.is_free(target, tick + 1, agent):
+            return False
+        # Intercambio de casillas: el otro agente va de target a origin en el mismo tick
+        other = self.cells.get((target, tick))
+        return other is None or other is agent or self.cells.get((origin, tick + 1)) is not other
+
+    def reserve(self, agent, path, start_tick):
+        """Reserva path[k] en el tick start_tick + k."""
+        self.release(agent)
+        cells = [(pos, start_tick + k) for k, pos in enumerate(path)]
+        for key in cells:
+            self.cells[key] = agent
+        self.owned[agent] = cells
+
+    def release(self, agent):
+        for key in self.owned.pop(agent, []):
+            if self.cells.get(key) is agent:
+                del self.cells[key]
+
+    def expected_position(self, agent, tick):
+        for pos, reserved_tick in self.owned.get(agent, []):
+            if reserved_tick == tick:
+                return pos
+        return None
+
+
+def space_time_search(start, goal, start_tick, agent, model, field, reservations):
+    """
+    A* sobre estados (posición, tick) que respeta las reservas de los demás agentes.
+
+    Esperar en la casilla cuesta 1; moverse cuesta cell_cost del destino. El campo
+    de distancias a la meta es la heurística, exacta si no hay conflictos.
+
+    Returns:
+        list: Posición en cada tick desde start_tick (incluye start), o None si no se
+            encontró un camino dentro del horizonte de planificación.
+    """
+    if start not in field:
+        return None
+    horizon = start_tick + field[start] + PLANNING_SLACK
+    counter = count()
+    queue = [(field[start], next(counter), start, start_tick)]
+    g_cost = {(start, start_tick): 0}
+    came_from = {(start, start_tick): None}
+    visited = set()
+    marked = set()  # Una casilla se marca una sola vez aunque se visite en varios ticks
+    frontier_peak = 1
+
+    while queue:
+        _, _, pos, tick = heappop(queue)
+        state = (pos, tick)
+        if state in visited:
+            continue
+        visited.add(state)
+        if pos not in marked:
+            marked.add(pos)
+            model.place_agent_number(pos, len(marked) - 1)
+
+        if pos == goal:
+            report_search_stats(model, len(visited), frontier_peak, len(g_cost))
+            path = []
+            while state is not None:
+                path.append(state[0])
+                state = came_from[state]
+            path.reverse()
+            return path
+        if tick >= horizon:
+            continue
+
+        for neighbor in [pos] + get_neighbors_in_orthogonal_order(pos, model):
+            if neighbor not in field or not reservations.can_move(agent, pos, neighbor, tick):
+                continue
+            step = 1 if neighbor == pos else cell_cost(neighbor, model)
+            following = (neighbor, tick + 1)
+            tentative = g_cost[state] + step
+            if following not in visited and tentative < g_cost.get(following, float('inf')):
+                g_cost[following] = tentative
+                came_from[following] = state
+                heappush(queue, (tentative + field[neighbor], next(counter), neighbor, tick + 1))
+        frontier_peak = max(frontier_peak, len(queue))
+
+    report_search_stats(model, len(visited), frontier_peak, len(g_cost))
+    return None
+
+
+class CooperativePlanner:
+    """
+    Planificación conjunta de varios Bomberman (A* cooperativo).
+
+    La primera solicitud de cada tick planifica de una vez a todos los Bomberman que
+    se quedaron sin camino, cada uno hacia su propia meta (current_target: la salida o
+    el siguiente comodín de su ruta). Los que van a la misma meta comparten su campo de
+    distancias (la tabla de HeuristicLibrary, recalculada solo cuando cambia el terreno)
+    y todos reservan sus caminos en una tabla espacio-tiempo, de modo que los que
+    planifican después esquivan a los anteriores. Los que están más cerca de su meta
+    planifican primero.
+
+    Una roca en el camino cuesta más ticks que los que reserva su casilla: al poner la
+    bomba, el agente cambia las reservas de su camino por las de la huida y la espera
+    en la casilla segura (escape), y al volver de ella planifica de nuevo. Las reservas
+    de un agente que se salió de su plan por otro motivo se liberan.
+
+    Args:
+        model (BombermanModel): Modelo con varios Bomberman.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.reservations = ReservationTable()
+        self.planned_tick = None
+        self.plans = {}
+
+    def path_for(self, agent, goal):
+        """Devuelve el camino de agent hacia goal, planificando el lote del tick si hace falta."""
+        tick = self.model.schedule.steps
+        if self.planned_tick != tick:
+            self.planned_tick = tick
+            self.plans = self.plan_batch(tick, goals={agent: goal})
+        path = self.plans.pop(agent, None)
+        if path is None or path[-1] != goal:
+            # El agente no estaba en el lote (p. ej. acaba de volver de esconderse) o su meta cambió
+            path = self.plan_batch(tick, [agent], goals={agent: goal}).get(agent)
+        return path
+
+    def plan_batch(self, tick, agents=None, goals=None):
+        """
+        Planifica a agents (por defecto, todos los Bomberman sin camino) hacia sus metas.
+
+        Args:
+            tick (int): Tick en el que empiezan los caminos.
+            agents (list, optional): Agentes a planificar.
+            goals (dict, optional): Meta ya conocida de algunos agentes; los demás usan
+                su current_target().
+
+        Returns:
+            dict: Agente -> camino (None si no tiene meta o no es alcanzable).
+        """
+        from agents.bomberman import Bomberman
+        if agents is None:
+            agents = [agent for agent in self.model.schedule.agents
+                      if isinstance(agent, Bomberman) and agent.pos is not None and not agent.path
+                      and not agent.waiting_for_explosion and not agent.return_path]
+        # Según el orden de activación, un agente ya se movió en este tick o todavía no
+        for agent in list(self.reservations.owned):
+            expected = (self.reservations.expected_position(agent, tick),
+                        self.reservations.expected_position(agent, tick - 1))
+            if agent in agents or agent.pos not in expected:
+                self.reservations.release(agent)
+
+        goals = dict(goals or {})
+        fields = {}
+        for agent in agents:
+            goal = goals.get(agent) or agent.current_target()
+            goals[agent] = goal
+            if goal is not None and goal not in fields:
+                fields[goal] = self.model.heuristics.goal_table(goal)
+
+        plans = {}
+        for agent in sorted(agents, key=lambda agent: fields.get(goals[agent], {}).get(agent.pos, float('inf'))):
+            goal = goals[agent]
+            if goal is None:
+                plans[agent] = None
+                continue
+            field = fields[goal]
+            path = space_time_search(agent.pos, goal, tick, agent, self.model, field, self.reservations)
+            if path is None:
+                path = self.descend(agent.pos, field)
+            else:
+                self.reservations.reserve(agent, path, tick)
+            plans[agent] = path
+        return plans
+
+    def escape(self, agent):
+        """
+        Cambia las reservas de agent por su huida de la bomba que acaba de poner.
+
+        Reserva safe_path y la casilla segura hasta que la bomba explota y el fuego se
+        apaga (power + 2 ticks del temporizador más FIRE_TICKS); el camino que tenía
+        reservado ya no se cumple en esos ticks.
+        """
+        route = [agent.pos] + list(agent.safe_path)
+        hold = agent.power + 2 + FIRE_TICKS
+        self.reservations.reserve(agent, route + [route[-1]] * hold, self.model.schedule.steps)
+
+    def descend(self, start, field):
+        """Camino sin reservas siguiendo el campo de distancias (si la meta es alcanzable)."""
+        if start not in field:
+            return None
+        path = [start]
+        while field[path[-1]] > 0:
+            path.append(min(get_neighbors_in_orthogonal_order(path[-1], self.model),
+                            key=lambda pos: field.get(pos, float('inf'))))
+        return path
@@ -0,0 +1,199 @@
+import random
+import numpy as np
+from agents.balloon import Balloon
+from agents.bomb import Bomb
+from agents.bomberman import PLACE_BOMB, Bomberman
+from agents.fire import Fire
+from agents.joker import Joker
+from agents.metal import Metal
+from agents.rock import Rock
+from core.model import BombermanModel
+
+# Canales de la observación, cada uno un plano ancho x alto indexado como [x, y]
+CHANNELS = ("metal", "roca", "globo", "bomba", "fuego", "comodin", "bomberman", "salida")
+CHANNEL_BY_TYPE = {Rock: 1, Balloon: 2, Bomb: 3, Fire: 4, Joker: 5, Bomberman: 6}
+METAL, EXIT = 0, 7
+N_ACTIONS = PLACE_BOMB + 1
+
+REWARD_EXIT = 1.0
+REWARD_COLLISION = -1.0
+REWARD_STEP = -0.01
+
+
+class BombermanEnv:
+    """
+    Entorno al estilo Gym donde una política externa controla a Bomberman.
+
+    Cada episodio es un BombermanModel con el backend "lean" y las reglas de siempre
+    (globos, bombas, fuego, comodines); solo cambia quién decide la acción de Bomberman.
+    En mapas con varias casillas C_b se conserva solo el primer Bomberman, así que la
+    salida y las colisiones dependen solo de la política. Una colisión con un globo
+    termina el episodio en lugar de reiniciarlo.
+    Los comodines toman su valor del orden de exploración de las búsquedas, así que un
+    Bomberman controlado, que no busca, no los encuentra en las rocas.
+
+    Acciones: 0 quedarse, 1 izquierda, 2 derecha, 3 abajo, 4 arriba, 5 poner bomba.
+    Recompensa: REWARD_STEP por tick, más REWARD_EXIT al llegar a la salida o
+    REWARD_COLLISION al chocar con un globo.
+
+    Args:
+        map_file (str): Archivo del mapa.
+        map_data (list, optional): Mapa en memoria (ver utils.map_generator); reemplaza al archivo.
+        algorithm (str): Algoritmo del modelo; solo influye en los globos (AlphaBeta con
+            alpha_beta_depth mayor que 1 los hace perseguir a Bomberman).
+        alpha_beta_depth (int): Nivel de Alfa-Beta de los globos (1, 3 o 6, como en la vista web).
+        jokers (int): Comodines escondidos en las rocas.
+        max_steps (int): Ticks hasta truncar el episodio.
+        seed (int, optional): Semilla de la secuencia de episodios.
+    """
+
+    def __init__(self, map_file="data/mapaRam.txt", map_data=None, algorithm="A*", jokers=3, max_steps=500,
+                 seed=None, alpha_beta_depth=1):
+        self.map_file = map_file
+        self.map_data = map_data
+        self.algorithm = algorithm
+        self.alpha_beta_depth = alpha_beta_depth
+        self.jokers = jokers
+        self.max_steps = max_steps
+        self.random = random.Random(seed)
+        self.model = None
+        self.bomberman = None
+        self.metal = None
+        self.steps = 0
+
+    @property
+    def observation_shape(self):
+        return len(CHANNELS), self.model.grid_width, self.model.grid_height
+
+    def reset(self, seed=None):
+        """
+        Empieza un episodio nuevo.
+
+        Returns:
+            tuple: (observación, info).
+        """
+        if seed is None:
+            seed = self.random.randrange(2 ** 32)
+        self.model = BombermanModel(self.map_file, self.algorithm, "Manhattan", jokers=self.jokers,
+                                    alpha_beta_depth=self.alpha_beta_depth, seed=seed, backend="lean",
+                                    map_data=self.map_data, export_file=None, reset_on_collision=False)
+        self.bomberman = self.model.bombermen[0]
+        self.bomberman.controlled = True
+        # Los demás Bomberman buscarían y se moverían por su cuenta, y el canal "bomberman"
+        # no distinguiría al de la política: se retiran junto con su coordinador
+        for other in self.model.bombermen[1:]:
+            self.model.grid.remove_agent(other)
+            self.model.schedule.remove(other)
+        del self.model.bombermen[1:]
+        self.model.coordinator = None
+        # El metal no cambia durante el episodio: su plano se arma una sola vez
+        self.metal = np.zeros((self.model.grid_width, self.model.grid_height), dtype=np.uint8)
+        for contents, pos in self.model.grid.coord_iter():
+            if any(isinstance(obj, Metal) for obj in contents):
+                self.metal[pos] = 1
+        self.steps = 0
+        return self.observe(), self.info()
+
+    def step(self, action):
+        """
+        Avanza un tick con la acción de Bomberman.
+
+        Returns:
+            tuple: (observación, recompensa, terminado, truncado, info).
+        """
+        reward, terminated, truncated, info = self.advance(action)
+        return self.observe(), reward, terminated, truncated, info
+
+    def advance(self, action):
+        """Como step, pero sin armar la observación (la versión vectorizada la escribe en su arreglo)."""
+        self.bomberman.action = int(action)
+        self.model.step()
+        self.steps += 1
+        reward = REWARD_STEP
+        terminated = not self.model.running
+        if terminated:
+            reward += REWARD_COLLISION if self.model.collision else REWARD_EXIT
+        truncated = not terminated and self.steps >= self.max_steps
+        return reward, terminated, truncated, self.info()
+
+    def observe(self, out=None):
+        """
+        Escribe la observación en out (o en un arreglo nuevo) y la devuelve.
+
+        Returns:
+            numpy.ndarray: Arreglo uint8 de forma (canales, ancho, alto).
+        """
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=np.uint8)
+        out.fill(0)
+        out[METAL] = self.metal
+        for agent in self.model.schedule.agents:
+            channel = CHANNEL_BY_TYPE.get(type(agent))
+            if channel is not None and agent.pos is not None:
+                out[channel][agent.pos] = 1
+        if self.model.exit_position:
+            out[EXIT][self.model.exit_position] = 1
+        return out
+
+    def info(self):
+        return {"steps": self.steps, "power": self.bomberman.power, "collision": self.model.collision}
+
+
+class VectorBombermanEnv:
+    """
+    N episodios independientes que avanzan a la vez, con observaciones apiladas.
+
+    Todos los episodios usan el mismo mapa, así que las observaciones comparten forma
+    y se escriben directamente en un solo arreglo (N, canales, ancho, alto). Un
+    episodio que termina se reinicia en el mismo paso; su última observación queda en
+    info["final_observation"].
+
+    Args:
+        num_envs (int): Cantidad de episodios.
+        seed (int, optional): Semilla de la que se derivan las de cada episodio.
+        **kwargs: Parámetros de BombermanEnv.
+    """
+
+    def __init__(self, num_envs, seed=None, **kwargs):
+        seeds = random.Random(seed)
+        self.envs = [BombermanEnv(seed=seeds.randrange(2 ** 32), **kwargs) for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.observations = None
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+    def reset(self):
+        """
+        Reinicia todos los episodios.
+
+        Returns:
+            tuple: (observaciones, lista de infos).
+        """
+        infos = [env.reset()[1] for env in self.envs]
+        self.observations = np.empty((self.num_envs,) + self.envs[0].observation_shape, dtype=np.uint8)
+        for i, env in enumerate(self.envs):
+            env.observe(self.observations[i])
+        return self.observations, infos
+
+    def step(self, actions):
+        """
+        Avanza un tick en cada episodio.
+
+        Args:
+            actions (sequence): Una acción por episodio.
+
+        Returns:
+            tuple: (observaciones, recompensas, terminados, truncados, lista de infos). Los
+                arreglos se reutilizan entre pasos: copiarlos si hay que guardarlos.
+        """
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            reward, terminated, truncated, info = env.advance(action)
+            self.rewards[i], self.terminated[i], self.truncated[i] = reward, terminated, truncated
+            if terminated or truncated:
+                info["final_observation"] = env.observe()
+                env.reset()
+            env.observe(self.observations[i])
+            infos.append(info)
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
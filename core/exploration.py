@@ -0,0 +1,107 @@
+from collections import deque
+import numpy as np
+
+# Búsquedas recientes cuya numeración se conserva (y se muestra en la vista web)
+EXPLORATION_HISTORY = 8
+
+
+class ExplorationLog:
+    """
+    Orden de exploración de las últimas búsquedas, en memoria acotada.
+
+    Cada búsqueda (una "corrida") se guarda como un arreglo int32 con el índice
+    x * alto + y de las casillas en el orden en que se expandieron: el número de
+    una visita es su posición en el arreglo. Solo se conservan las últimas
+    history corridas (un buffer circular), así que la memoria no crece con la
+    duración de la partida. La vista {casilla: número} se mantiene al día con cada
+    visita (si varias corridas pasaron por la misma casilla, vale la más reciente)
+    y, junto con ella, qué corrida puso cada número: cuando la corrida más vieja sale
+    del buffer solo se borran las casillas que todavía le pertenecen.
+
+    Args:
+        width (int): Ancho de la grilla.
+        height (int): Alto de la grilla.
+        history (int): Cantidad de corridas que se conservan.
+    """
+
+    def __init__(self, width, height, history=EXPLORATION_HISTORY):
+        self.width = width
+        self.height = height
+        self.runs = deque(maxlen=history)
+        self.completed = 0  # Corridas cerradas desde el inicio (incluidas las que ya salieron del buffer)
+        self.buffer = np.empty(256, dtype=np.int32)  # Corrida en curso
+        self.length = 0
+        self.revision = 0  # Aumenta con cada cambio de la vista (la vista web redibuja los marcadores)
+        self.view = np.full(width * height, -1, dtype=np.int32)  # Número de cada casilla, -1 sin visitar
+        self.owner = np.full(width * height, -1, dtype=np.int64)  # Corrida (por orden de cierre) de ese número
+
+    def record(self, pos):
+        """Agrega pos a la corrida en curso; su número es la cantidad de visitas anteriores."""
+        if self.length == len(self.buffer):
+            self.buffer = np.resize(self.buffer, 2 * len(self.buffer))
+        cell = pos[0] * self.height + pos[1]
+        self.buffer[self.length] = cell
+        # Dentro de una corrida una casilla puede repetirse (p. ej. IDA*): gana la última visita
+        self.view[cell] = self.length
+        self.owner[cell] = self.completed
+        self.length += 1
+        self.revision += 1
+
+    def flush(self):
+        """Cierra la corrida en curso (si tiene visitas) y la pasa al buffer circular."""
+        if self.length:
+            if len(self.runs) == self.runs.maxlen:
+                self.forget(self.runs[0], self.completed - len(self.runs))
+            self.runs.append(self.buffer[:self.length].copy())
+            self.completed += 1
+            self.length = 0
+            self.revision += 1
+
+    def forget(self, run, run_id):
+        """Borra de la vista las casillas cuyo número todavía viene de la corrida run_id."""
+        stale = run[self.owner[run] == run_id]
+        self.view[stale] = -1
+        self.owner[stale] = -1
+
+    def restore(self, completed, runs, current):
+        """
+        Reemplaza el registro por uno guardado (core.snapshot).
+
+        Args:
+            completed (int): Corridas cerradas desde el inicio.
+            runs (list): Corridas cerradas que siguen en el buffer, de la más vieja a la más nueva.
+            current (numpy.ndarray): Casillas de la corrida en curso.
+        """
+        self.runs.clear()
+        self.runs.extend(runs)
+        self.completed = completed
+        self.length = 0
+        self.view.fill(-1)
+        self.owner.fill(-1)
+        for run_id, run in enumerate(self.runs, start=completed - len(self.runs)):
+            cells, last = np.unique(run[::-1], return_index=True)
+            self.view[cells] = len(run) - 1 - last
+            self.owner[cells] = run_id
+        for cell in current:
+            self.record((int(cell) // self.height, int(cell) % self.height))
+        self.revision += 1
+
+    def recent_runs(self, count):
+        """Las últimas count corridas cerradas que siguen en el buffer, de la más vieja a la más nueva."""
+        count = min(count, len(self.runs))
+        return list(self.runs)[len(self.runs) - count:]
+
+    def numbers(self):
+        """Arreglo int32 con el número de cada casilla (índice x * alto + y), -1 si no fue visitada."""
+        return self.view
+
+    def number_at(self, pos):
+        """Número de exploración de pos, o None si ninguna corrida reciente pasó por allí."""
+        number = self.view[pos[0] * self.height + pos[1]]
+        return int(number) if number >= 0 else None
+
+    def as_dict(self):
+        """Exporta la vista como {posición: número}."""
+        view = self.view
+        cells = np.flatnonzero(view >= 0)
+        return {(int(index) // self.height, int(index) % self.height): int(view[index]) for index in cells}
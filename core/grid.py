@@ -0,0 +1,92 @@
+from agents.balloon import Balloon
+from agents.bomberman import Bomberman
+from agents.metal import Metal
+from agents.rock import Rock
+
+# Capas de cada casilla; el contenido se devuelve en este orden
+TERRAIN, ITEMS, MOBILE = 0, 1, 2
+LAYER_BY_TYPE = {Metal: TERRAIN, Rock: TERRAIN, Bomberman: MOBILE, Balloon: MOBILE}
+
+
+class LeanGrid:
+    """
+    Grilla liviana con la interfaz de MultiGrid que usan los agentes y las búsquedas.
+
+    Cada casilla guarda sus agentes en tres capas tipadas: terreno (metal y rocas),
+    objetos (bombas, fuego, comodines, marcadores) y agentes móviles (Bomberman y
+    globos). Las capas son diccionarios indexados por casilla, así que las casillas
+    vacías no ocupan memoria y consultar una casilla no pasa por los decoradores ni
+    la contabilidad de casillas vacías de Mesa. No sirve para CanvasGrid: la vista
+    web sigue usando el backend de Mesa.
+
+    Args:
+        width (int): Ancho de la grilla.
+        height (int): Alto de la grilla.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.torus = False
+        self.layers = ({}, {}, {})
+
+    def out_of_bounds(self, pos):
+        x, y = pos
+        return x < 0 or x >= self.width or y < 0 or y >= self.height
+
+    def place_agent(self, agent, pos):
+        x, y = pos
+        cell = self.layers[LAYER_BY_TYPE.get(type(agent), ITEMS)].setdefault(x * self.height + y, [])
+        if agent not in cell:
+            cell.append(agent)
+        agent.pos = pos
+
+    def remove_agent(self, agent):
+        x, y = agent.pos
+        layer = self.layers[LAYER_BY_TYPE.get(type(agent), ITEMS)]
+        index = x * self.height + y
+        cell = layer[index]
+        cell.remove(agent)
+        if not cell:
+            del layer[index]
+        agent.pos = None
+
+    def move_agent(self, agent, pos):
+        self.remove_agent(agent)
+        self.place_agent(agent, pos)
+
+    def get_cell_list_contents(self, cell_list):
+        """Agentes de una casilla (x, y) o de una lista de casillas, como en MultiGrid."""
+        if len(cell_list) == 2 and not isinstance(cell_list[0], tuple):
+            cell_list = [cell_list]
+        contents = []
+        for x, y in cell_list:
+            index = x * self.height + y
+            for layer in self.layers:
+                cell = layer.get(index)
+                if cell:
+                    contents.extend(cell)
+        return contents
+
+    def is_cell_empty(self, pos):
+        x, y = pos
+        index = x * self.height + y
+        return not any(index in layer for layer in self.layers)
+
+    def get_neighborhood(self, pos, moore, include_center=False, radius=1):
+        x, y = pos
+        neighborhood = []
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                if not moore and abs(dx) + abs(dy) > radius:
+                    continue
+                if dx == dy == 0 and not include_center:
+                    continue
+                if not self.out_of_bounds((x + dx, y + dy)):
+                    neighborhood.append((x + dx, y + dy))
+        return neighborhood
+
+    def coord_iter(self):
+        for x in range(self.width):
+            for y in range(self.height):
+                yield self.get_cell_list_contents((x, y)), (x, y)
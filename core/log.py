@@ -0,0 +1,68 @@
+import logging
+import os
+
+# Todos los registros del proyecto cuelgan de este logger: "bomberman.<subsistema>"
+ROOT_LOGGER = "bomberman"
+# Variable de entorno que activa el canal de depuración sin tocar el código
+DEBUG_ENV = "BOMBERMAN_DEBUG"
+
+# Sin configurar, los registros no se muestran: las corridas por lotes no pagan E/S por ellos
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+
+def get_logger(subsystem):
+    """Logger de un subsistema, p. ej. get_logger("agents.balloon")."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita cada mensaje a burst registros por ventana de interval segundos.
+
+    Los mensajes se agrupan por logger y plantilla (sin los argumentos), así que
+    "Globo destruido en %s" cuenta como uno solo aunque cambie la posición. El
+    primer registro de la ventana siguiente indica cuántos se descartaron.
+    """
+
+    def __init__(self, burst=5, interval=1.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.windows = {}  # (logger, plantilla) -> [inicio de la ventana, emitidos, descartados]
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        window = self.windows.get(key)
+        if window is None or record.created - window[0] >= self.interval:
+            dropped = window[2] if window else 0
+            self.windows[key] = [record.created, 1, 0]
+            if dropped:
+                record.msg = f"{record.msg} ({dropped} registros similares descartados)"
+            return True
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+def configure_logging(level=logging.INFO, debug=None, burst=5, interval=1.0):
+    """
+    Envía los registros del proyecto a stderr con límite de frecuencia.
+
+    Args:
+        level (int): Nivel mínimo cuando el canal de depuración está apagado.
+        debug (bool, optional): Activa los mensajes DEBUG (uno o más por tick); por
+            defecto se lee de la variable de entorno BOMBERMAN_DEBUG.
+        burst (int): Registros iguales permitidos por ventana.
+        interval (float): Duración de la ventana en segundos.
+    """
+    if debug is None:
+        debug = bool(os.environ.get(DEBUG_ENV))
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    handler.addFilter(RateLimitFilter(burst, interval))
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.DEBUG if debug else level)
+    logger.propagate = False
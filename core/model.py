@@ -1,25 +1,104 @@
-from mesa import Model
-from mesa.time import RandomActivation
-from mesa.space import MultiGrid
+import os
+import time
+from collections import Counter
+from core.base import Model
 from agents.bomberman import Bomberman
 from agents.numberMarker import NumberMarker
 from agents.rock import Rock
 from agents.metal import Metal
 from agents.balloon import Balloon
+from agents.fire import Fire
+from core.exploration import ExplorationLog
+from core.grid import LeanGrid
+from core.log import get_logger
+from core.scheduling import EventActivation, LeanActivation
+from utils.adversarial import ADVERSARIAL_ALGORITHMS, expectimax_search, mcts_search
+from utils.heuristics import HeuristicLibrary, TABLE_HEURISTICS
 from utils.search_algorithms import (breadth_first_search, depth_first_search, uniform_cost_search,
-                                      beam_search, manhattan_distance, euclidean_distance, 
-                                      hill_climbing, a_star_search, alpha_beta_search, bomberman_heuristic,
-                                      balloon_heuristic)
-import random
+                                      beam_search, 
+                                      hill_climbing, a_star_search, ida_star_search, sma_star_search,
+                                      alpha_beta_search, bomberman_heuristic, balloon_heuristic, cell_cost)
+
+logger = get_logger("core.model")
+
+
+def read_map(map_file):
+    """
+    Lee un mapa en formato CSV.
+
+    Returns:
+        list: Filas del archivo (la primera es la de arriba), cada una como lista de códigos.
+    """
+    with open(map_file, "r") as f:
+        return [line.strip().split(',') for line in f if line.strip()]
+
+
+# Mapas ya leídos por read_map_cached: ruta -> (fecha de modificación, filas)
+MAP_CACHE = {}
+
+
+def read_map_cached(map_file):
+    """
+    Como read_map, pero lee cada archivo una sola vez y comparte el resultado.
+
+    Las filas se devuelven como tuplas para que nadie modifique el mapa compartido
+    (varias sesiones del servidor usan el mismo). Si el archivo cambió desde la última
+    lectura, se vuelve a leer.
+
+    Returns:
+        tuple: Filas del mapa, cada una como tupla de códigos.
+    """
+    path = os.path.abspath(map_file)
+    mtime = os.path.getmtime(path)
+    cached = MAP_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = MAP_CACHE[path] = (mtime, tuple(tuple(row) for row in read_map(path)))
+    return cached[1]
+
+
 class BombermanModel(Model):
-    def __init__(self,  map_file, algorithm, heuristic, jokers=3, alpha_beta_depth=1):
+    def __init__(self,  map_file, algorithm, heuristic, jokers=3, alpha_beta_depth=1, seed=None, replay_file=None,
+                 async_search=False, search_node_budget=None, backend="mesa", expectimax_depth=2,
+                 rollout_budget=200, move_time_budget=None, search_workers=1, map_data=None,
+                 export_file="game_states.txt", bomb_planning=False, reset_on_collision=True,
+                 search_executor=None, contract_corridors=False, collect_jokers=False, cooperative_planning=False,
+                 snapshot=None):
         super().__init__()
+        # Toda la aleatoriedad (comodines, globos, orden de activación) sale de self.random,
+        # de modo que dos corridas con la misma semilla son idénticas.
+        self.reset_randomizer(seed)
+        self.seed = self._seed
         self.map_file = map_file
-        self.grid_width, self.grid_height = self.get_map_dimensions(map_file)
-        self.grid = MultiGrid(self.grid_width, self.grid_height, torus=False)
-        self.schedule = RandomActivation(self)
-        self.visited_numbers = {}
-        self.previous_positions = {}
+        # Un mapa generado en memoria (map_data) reemplaza al archivo; map_file queda como nombre
+        self.map_data = map_data
+        # Un snapshot (core.snapshot) trae los agentes en su estado guardado en lugar del mapa inicial
+        if snapshot is not None:
+            self.grid_width, self.grid_height = snapshot.width, snapshot.height
+        else:
+            rows = map_data if map_data is not None else read_map(map_file)
+            self.grid_width, self.grid_height = self.get_map_dimensions(rows)
+        # "lean" cambia la grilla y el scheduler de Mesa por versiones livianas para corridas
+        # sin interfaz, y "event" además deja de activar a los agentes inertes (rocas, metal,
+        # comodines); la vista web necesita el backend "mesa"
+        self.backend = backend
+        if backend == "lean":
+            self.grid = LeanGrid(self.grid_width, self.grid_height)
+            self.schedule = LeanActivation(self)
+        elif backend == "event":
+            self.grid = LeanGrid(self.grid_width, self.grid_height)
+            self.schedule = EventActivation(self)
+        elif backend == "mesa":
+            # Mesa se importa recién aquí: cargarlo también trae su visualización
+            from mesa.space import MultiGrid
+            from mesa.time import RandomActivation
+            self.grid = MultiGrid(self.grid_width, self.grid_height, torus=False)
+            self.schedule = RandomActivation(self)
+        else:
+            raise ValueError(f"Backend desconocido: {backend}")
+        # Orden de exploración de las últimas búsquedas; se recrea con el modelo en cada reinicio
+        self.exploration = ExplorationLog(self.grid_width, self.grid_height)
+        self.markers = {}  # posición -> NumberMarker que la muestra en la vista web
+        self.markers_revision = 0
         self.algorithm = algorithm  
         self.heuristic = heuristic
         self.jokers = jokers  # Añadir esta línea
@@ -27,13 +106,94 @@ class BombermanModel(Model):
         self.alpha_beta_depth = alpha_beta_depth 
         self.running = True
         self.exit_position = None 
-        self.export_file = "game_states.txt"
+        # Archivo con los estados que recorren las búsquedas; None lo desactiva (p. ej. en el benchmark)
+        self.export_file = export_file
+        self.search_node_budget = search_node_budget  # Límite de nodos para IDA* y SMA*
+        self.expectimax_depth = expectimax_depth
+        self.rollout_budget = rollout_budget  # Simulaciones de MCTS por movimiento
+        self.move_time_budget = move_time_budget  # Segundos por movimiento de MCTS (opcional)
+        self.search_workers = search_workers  # Procesos entre los que se reparten las simulaciones
+        self.search_pool = None
+        self.search_stats = {}  # Métricas de la última búsqueda (nodos expandidos, frontera máxima)
+        # Métricas del último paso (tiempo, búsquedas, agentes) para el panel de rendimiento de la vista web
+        self.tick_stats = {}
+        self.tick_search = Counter()
+        # Conteo de eventos del juego (colisiones, globos destruidos, ...); se conserva entre reinicios
+        self.events = Counter()
+        self.grid_revision = 0  # Aumenta cada vez que el terreno cambia (p. ej. se destruye una roca)
+        self.bitboards = None  # Terreno como bitboards para las zonas seguras; se arma al primer uso
+        self.connectivity = None  # Componentes conexas por regla de paso; se arma al primer uso
+        self.unreachable = {}  # (inicio, meta) sin camino -> revisión de la grilla en que se comprobó
+        # Con reset_on_collision=False una colisión termina la partida en lugar de reiniciarla
+        self.reset_on_collision = reset_on_collision
+        self.collision = None  # Tipo de la colisión que terminó la partida, si la hubo
+        self.stepping = False
+        self.reset_requested = False
         
         # Crear archivo vacío para exportar estados
-        with open(self.export_file, "w") as f:
-            f.write("Estados de juego en pre-orden:\n")
+        if self.export_file:
+            with open(self.export_file, "w") as f:
+                f.write("Estados de juego en pre-orden:\n")
+
+        self.bombermen = []
+        self.balloons = []  # Globos del mapa; los destruidos se retiran en la fase de colisiones
+        if snapshot is not None:
+            snapshot.populate(self)
+        else:
+            self.load_map(rows)
+
+        # Tablas de distancias para las heurísticas "Exacta" y "ALT"; la de la salida se precalcula
+        self.heuristics = HeuristicLibrary(self)
+        if heuristic == "Exacta" and self.exit_position:
+            self.heuristics.goal_table(self.exit_position)
+        elif heuristic == "ALT":
+            self.heuristics.landmark_tables()
+
+        # Con cooperative_planning y varios Bomberman, los caminos se planifican en lote con
+        # A* espacio-temporal y se reservan en el tiempo; reemplaza al algoritmo elegido.
+        # Sin la opción cada Bomberman busca por su cuenta con el algoritmo elegido.
+        self.coordinator = None
+        if cooperative_planning and len(self.bombermen) > 1:
+            from core.cooperative import CooperativePlanner
+            self.coordinator = CooperativePlanner(self)
+
+        # Con bomb_planning, Bomberman planifica bombas, escondite y regreso en el tiempo
+        self.bomb_planner = None
+        if bomb_planning:
+            from utils.bomb_planner import BombPlanner
+            self.bomb_planner = BombPlanner(self)
+
+        # Con collect_jokers, Bomberman decide qué comodines recoger antes de ir a la salida
+        self.joker_planner = None
+        if collect_jokers:
+            from utils.joker_routes import JokerRoutePlanner
+            self.joker_planner = JokerRoutePlanner(self)
+
+        # Con contract_corridors, UCS y A* buscan sobre el grafo de pasillos contraídos
+        self.corridors = None
+        if contract_corridors and algorithm in ("UCS", "A*"):
+            from utils.corridors import CorridorGraph
+            self.corridors = CorridorGraph(self)
+
+        # Grafo de clusters para HPA*, precalculado una sola vez por mapa
+        self.hierarchy = None
+        if algorithm == "HPA*":
+            from utils.hierarchical import ClusterAbstraction
+            self.hierarchy = ClusterAbstraction(self)
 
-        self.load_map(map_file)
+        # Registro binario del episodio para reproducirlo sin repetir las búsquedas
+        self.recorder = None
+        if replay_file:
+            from core.replay import EpisodeRecorder
+            self.recorder = EpisodeRecorder(replay_file, self)
+
+        # Búsquedas en segundo plano para que un paso costoso no bloquee el servidor
+        # (search_executor permite compartir los hilos de búsqueda entre varios modelos)
+        self.search_executor = search_executor
+        self.planner = None
+        if async_search:
+            from core.async_search import AsyncSearchPlanner
+            self.planner = AsyncSearchPlanner(self, executor=search_executor)
     
     def record_state(self, position, heuristic_value=None):
         """
@@ -43,143 +203,416 @@ class BombermanModel(Model):
             position (tuple): La posición actual de Bomberman.
             heuristic_value (float, optional): Valor de la heurística (solo para algoritmos informados).
         """
+        if not self.export_file:
+            return
         with open(self.export_file, "a", encoding="utf-8") as f:
             if heuristic_value is not None:
                 f.write(f"Posición: {position}, Heurística: {heuristic_value}\n")
             else:
                 f.write(f"Posición: {position}\n")
 
-    def get_map_dimensions(self, map_file):
-        with open(map_file, "r") as f:
-            lines = f.readlines()
-            height = len(lines)
-            width = len(lines[0].strip().split(','))
-        return width, height
-
-    def load_map(self, map_file):
-        with open(map_file, "r") as f:
-            lines = f.readlines()
-            bomberman_position = None 
-            valid_positions = []  
-            balloon_positions = []
-            rock_positions = []
-
-            for y, line in enumerate(reversed(lines)): 
-                elements = line.strip().split(',')
-                for x, elem in enumerate(elements):
-                    if elem == "C_b":  
-                        bomberman_position = (x, y)
-                    elif elem == "C":
-                        valid_positions.append((x, y))
-                    elif elem == "C_g":
-                        balloon_positions.append((x, y))
-                    elif elem == "R":
-                        rock_positions.append((x, y))  # Agregar la posición a rock_positions
-                    elif elem == "R_s":
-                        rock = Rock((x, y), self, has_exit=True)
-                        self.exit_position = (x, y)
-                        self.grid.place_agent(rock, (x, y))
-                        self.schedule.add(rock)
-                    elif elem == "M":
-                        metal = Metal((x, y), self)
-                        self.grid.place_agent(metal, (x, y))
-                        
-            # Seleccionar posiciones aleatorias para los comodines
-            joker_positions = random.sample(rock_positions, min(self.jokers, len(rock_positions)))
+    def get_map_dimensions(self, rows):
+        return len(rows[0]), len(rows)
+
+    def load_map(self, rows):
+        """Crea los agentes a partir de las filas del mapa (la primera fila es la de arriba)."""
+        bomberman_positions = []
+        valid_positions = []  
+        balloon_positions = []
+        rock_positions = []
+
+        for y, elements in enumerate(reversed(rows)):
+            for x, elem in enumerate(elements):
+                if elem == "C_b":  
+                    bomberman_positions.append((x, y))
+                elif elem == "C":
+                    valid_positions.append((x, y))
+                elif elem == "C_g":
+                    balloon_positions.append((x, y))
+                elif elem == "R":
+                    rock_positions.append((x, y))  # Agregar la posición a rock_positions
+                elif elem == "R_s":
+                    rock = Rock((x, y), self, has_exit=True)
+                    self.exit_position = (x, y)
+                    self.grid.place_agent(rock, (x, y))
+                    self.schedule.add(rock)
+                elif elem == "M":
+                    metal = Metal((x, y), self)
+                    self.grid.place_agent(metal, (x, y))
+                    
+        # Seleccionar posiciones aleatorias para los comodines
+        joker_positions = self.random.sample(rock_positions, min(self.jokers, len(rock_positions)))
           
-            # Colocar las rocas, asignando comodines aleatoriamente
-            for pos in rock_positions:
-                has_power_item = pos in joker_positions
-                rock = Rock(pos, self, has_power_item=has_power_item)
-                self.grid.place_agent(rock, pos)
-                self.schedule.add(rock)
-
-            for balloon_position in balloon_positions:
-                balloon = Balloon(balloon_position, self)
-                self.grid.place_agent(balloon, balloon_position)
-                self.schedule.add(balloon)
-
-            if not balloon_positions:
-                self.add_balloons(3)
-
-            if not bomberman_position:
-                if valid_positions:
-                    bomberman_position = random.choice(valid_positions)
-                else:
-                    raise ValueError("No hay posiciones válidas en el mapa para colocar a Bomberman.")
+        # Colocar las rocas, asignando comodines aleatoriamente
+        for pos in rock_positions:
+            has_power_item = pos in joker_positions
+            rock = Rock(pos, self, has_power_item=has_power_item)
+            self.grid.place_agent(rock, pos)
+            self.schedule.add(rock)
+
+        for balloon_position in balloon_positions:
+            balloon = Balloon(balloon_position, self)
+            self.grid.place_agent(balloon, balloon_position)
+            self.schedule.add(balloon)
+            self.balloons.append(balloon)
+
+        if not balloon_positions:
+            self.add_balloons(3)
 
+        if not bomberman_positions:
+            if valid_positions:
+                bomberman_positions.append(self.random.choice(valid_positions))
+            else:
+                raise ValueError("No hay posiciones válidas en el mapa para colocar a Bomberman.")
+
+        # Un Bomberman por cada casilla C_b del mapa
+        for bomberman_position in bomberman_positions:
             bomberman = Bomberman(bomberman_position, self)
             self.grid.place_agent(bomberman, bomberman_position)
             self.schedule.add(bomberman)
+            self.bombermen.append(bomberman)
 
 
     def place_agent_number(self, pos, number):
         """
             Marca una casilla en el mapa con un número que representa el orden en que fue visitada.
 
+            Las búsquedas numeran desde 0 de uno en uno, así que el número 0 abre una corrida
+            nueva en self.exploration. Los NumberMarker se actualizan al final del paso.
+
             Args:
                 pos (tuple): La posición en la grilla.
                 number (int): El número que representa el orden de la visita.
         """
-        self.visited_numbers[pos] = number
-        self.grid.place_agent(NumberMarker(pos, self, number), pos)
+        if number == 0:
+            self.exploration.flush()
+        self.exploration.record(pos)
+
+    @property
+    def visited_numbers(self):
+        """Número de exploración de cada casilla visitada por las búsquedas recientes."""
+        return self.exploration.as_dict()
+
+    def sync_number_markers(self):
+        """
+        Deja un solo NumberMarker por casilla numerada, reutilizando los existentes, para
+        que la vista web no acumule un agente por cada nodo expandido.
+        """
+        numbers = self.visited_numbers
+        for pos in [pos for pos in self.markers if pos not in numbers]:
+            self.grid.remove_agent(self.markers.pop(pos))
+        for pos, number in numbers.items():
+            marker = self.markers.get(pos)
+            if marker is None:
+                marker = self.markers[pos] = NumberMarker(pos, self, number)
+                self.grid.place_agent(marker, pos)
+            marker.number = number
 
     def step(self):
+        started = time.perf_counter()
+        self.tick_search = Counter()
+        self.stepping = True
+        start = [(agent, agent.pos) for agent in self.bombermen + self.balloons]
         self.schedule.step()
+        # Si Bomberman llegó a la salida en este tick la partida ya terminó: una colisión
+        # posterior no debe reiniciarla y deshacer la victoria
+        if self.running:
+            self.resolve_collisions(start)
+        self.stepping = False
+        self.exploration.flush()
+        # Solo la vista web dibuja los marcadores; las corridas sin interfaz usan el backend lean
+        if self.backend == "mesa" and self.exploration.revision != self.markers_revision:
+            self.sync_number_markers()
+            self.markers_revision = self.exploration.revision
+        tick_stats = {"tick_time": time.perf_counter() - started, "agents": self.schedule.get_agent_count(),
+                      **self.tick_search}
+        # Un reinicio pedido durante el paso se aplica al final, cuando ningún agente
+        # del episodio anterior queda por activarse
+        if self.reset_requested:
+            self.reset_game()
+        self.tick_stats = tick_stats
+        if self.recorder:
+            self.recorder.record_tick(self)
+            if not self.running:
+                self.recorder.close()
+
+    def notify_terrain_change(self, pos):
+        """Registra que el terreno cambió en pos; invalida las búsquedas hechas sobre la revisión anterior."""
+        self.grid_revision += 1
+        self.unreachable.clear()
+        self.heuristics.invalidate(pos)
+        if self.hierarchy:
+            self.hierarchy.invalidate(pos)
+        if self.corridors:
+            self.corridors.invalidate(pos)
+        if self.bitboards:
+            self.bitboards.update(pos)
+        if self.connectivity:
+            self.connectivity.update(pos)
 
     def run_search_algorithm(self, start, goal, is_balloon=False):
+        """
+        Ejecuta el algoritmo seleccionado. En modo asíncrono devuelve None mientras
+        la búsqueda sigue en curso y el resultado en el tick en que termina.
+
+        Una meta fuera de la componente del inicio devuelve None sin buscar (los modos
+        adversariales devuelven un movimiento, no un camino, y siempre buscan). Queda
+        anotada como inalcanzable hasta que cambie el terreno: mientras tanto, quien la
+        vuelva a pedir en cada tick recibe None sin consultar de nuevo ni contar otro
+        evento "meta_inalcanzable".
+        """
+        if self.algorithm not in ADVERSARIAL_ALGORITHMS:
+            if self.unreachable.get((start, goal)) == self.grid_revision:
+                return None
+            if not self.is_reachable(start, goal):
+                self.unreachable[(start, goal)] = self.grid_revision
+                self.events["meta_inalcanzable"] += 1
+                return None
+        if self.planner:
+            return self.planner.request(start, goal, is_balloon)
+        started = time.perf_counter()
+        stats = self.search_stats
+        path = self.execute_search(start, goal, is_balloon)
+        # Las búsquedas que no informan métricas (p. ej. Alfa-Beta) dejan search_stats como estaba
+        self.count_search(time.perf_counter() - started, self.search_stats if self.search_stats is not stats else {})
+        return path
+
+    def count_search(self, elapsed, stats):
+        """
+        Suma una búsqueda terminada a las métricas del paso en curso.
+
+        Args:
+            elapsed (float): Segundos que tardó la búsqueda.
+            stats (dict): Sus métricas (ver report_search_stats); vacío si no las informó.
+        """
+        self.tick_search["searches"] += 1
+        self.tick_search["search_time"] += elapsed
+        self.tick_search["nodes_expanded"] += stats.get("nodes_expanded", 0)
+        self.tick_search["frontier_peak"] = max(self.tick_search["frontier_peak"], stats.get("frontier_peak", 0))
+
+    def execute_search(self, start, goal, is_balloon=False, target=None):
+        """
+        Ejecuta la búsqueda de forma sincrónica.
+
+        Args:
+            target (optional): Vista del modelo sobre la que corre la búsqueda
+                (un SearchContext en modo asíncrono); por defecto, el propio modelo.
+        """
+        if target is None:
+            target = self
         if self.algorithm == "AlphaBeta":
             heuristic_func = balloon_heuristic if is_balloon else bomberman_heuristic
             return alpha_beta_search(
-                start, goal, self, depth=self.alpha_beta_depth,
+                start, goal, target, depth=self.alpha_beta_depth,
                 is_maximizing=not is_balloon,
                 heuristic=heuristic_func,  # Pasar la heurística seleccionada
-                record_state=self.record_state
+                record_state=target.record_state
             )[0]  # Solo devolver la posición óptima
 
-        heuristic_func = manhattan_distance if self.heuristic == "Manhattan" else euclidean_distance
+        if self.algorithm == "Expectimax":
+            return expectimax_search(start, goal, target, depth=self.expectimax_depth,
+                                     record_state=target.record_state)[0]
+        if self.algorithm == "MCTS":
+            return mcts_search(start, goal, target, rollouts=self.rollout_budget, time_budget=self.move_time_budget,
+                               pool=self.get_search_pool(), workers=self.search_workers,
+                               record_state=target.record_state, seed=getattr(target, "search_seed", None))[0]
+
+        heuristic_func = self.heuristics.function(self.heuristic)
+        # Las heurísticas de tabla miden el costo con rocas; A*, IDA* y SMA* usan ese mismo
+        # costo para que sean exactas (con pasos de costo 1 sobreestimarían)
+        cost = cell_cost if self.heuristic in TABLE_HEURISTICS else None
 
         if self.algorithm == "BFS":
-            return breadth_first_search(start, goal, self, record_state=self.record_state)
+            return breadth_first_search(start, goal, target, record_state=target.record_state)
         elif self.algorithm == "DFS":
-            return depth_first_search(start, goal, self, record_state=self.record_state)
+            return depth_first_search(start, goal, target, record_state=target.record_state)
         elif self.algorithm == "UCS":
-            return uniform_cost_search(start, goal, self, record_state=self.record_state)
+            if self.corridors:
+                return self.corridors.find_path(start, goal, target, record_state=target.record_state)
+            return uniform_cost_search(start, goal, target, record_state=target.record_state)
         elif self.algorithm == "BS":
-            return beam_search(start, goal, self, heuristic=heuristic_func, record_state=self.record_state)
+            return beam_search(start, goal, target, heuristic=heuristic_func, record_state=target.record_state)
         elif self.algorithm == "HC":
-            return hill_climbing(start, goal, self, heuristic=heuristic_func, record_state=self.record_state)
+            return hill_climbing(start, goal, target, heuristic=heuristic_func, record_state=target.record_state)
         elif self.algorithm == "A*":
-            return a_star_search(start, goal, self, heuristic=heuristic_func, record_state=self.record_state)
+            if self.corridors:
+                return self.corridors.find_path(start, goal, target, heuristic=heuristic_func,
+                                                record_state=target.record_state, cost=cost)
+            return a_star_search(start, goal, target, heuristic=heuristic_func, record_state=target.record_state,
+                                 cost=cost)
+        elif self.algorithm == "IDA*":
+            return ida_star_search(start, goal, target, heuristic=heuristic_func,
+                                   max_nodes=self.search_node_budget, record_state=target.record_state, cost=cost)
+        elif self.algorithm == "SMA*":
+            return sma_star_search(start, goal, target, heuristic=heuristic_func,
+                                   max_nodes=self.search_node_budget, record_state=target.record_state, cost=cost)
+        elif self.algorithm == "HPA*":
+            return self.hierarchy.find_path(start, goal, target, heuristic=heuristic_func,
+                                            record_state=target.record_state)
         
+    def get_search_pool(self):
+        """Crea (una sola vez, y se conserva entre reinicios) el pool de procesos de MCTS."""
+        if self.search_pool is None and self.search_workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.search_pool = ProcessPoolExecutor(max_workers=self.search_workers)
+        return self.search_pool
+
+    def close(self):
+        """
+        Libera los procesos y hilos propios del modelo: el pool de MCTS y las búsquedas
+        asíncronas pendientes. reset_game conserva el pool, así que quien descarta el
+        modelo (una sesión web, el benchmark) debe llamar a close.
+        """
+        if self.planner:
+            self.planner.shutdown()
+        if self.search_pool is not None:
+            self.search_pool.shutdown(wait=False, cancel_futures=True)
+            self.search_pool = None
+
+    def get_connectivity(self):
+        """Crea (una sola vez) el índice de componentes conexas del terreno."""
+        if self.connectivity is None:
+            from utils.connectivity import ConnectivityIndex
+            self.connectivity = ConnectivityIndex(self)
+        return self.connectivity
+
+    def is_reachable(self, start, goal, rule="move"):
+        """Indica en tiempo casi constante si una búsqueda puede llegar de start a goal (ver ConnectivityIndex)."""
+        return self.get_connectivity().connected(start, goal, rule)
+
+    def get_bitboards(self):
+        """Crea (una sola vez) los bitboards del terreno que usan las consultas de alcance y zonas seguras."""
+        if self.bitboards is None:
+            from utils.bitboard import GridBitboards
+            self.bitboards = GridBitboards(self)
+        return self.bitboards
+
     def get_heuristic(self, pos1, pos2):
         """
         Calcula la heurística en función de la selección del usuario.
         """
-        if self.heuristic == "Manhattan":
-            return manhattan_distance(pos1, pos2)
-        elif self.heuristic == "Euclidiana":
-            return euclidean_distance(pos1, pos2)
+        return self.heuristics.function(self.heuristic)(pos1, pos2)
         
     def add_balloons(self, count):
-          for _ in range(count):
-            # Buscar una posición válida aleatoria (C)
-            while True:
-                x = random.randrange(self.grid_width)
-                y = random.randrange(self.grid_height)
-                if self.grid.is_cell_empty((x, y)):  # Verificar si es un camino libre
-                    balloon = Balloon((x, y), self)
-                    self.grid.place_agent(balloon, (x, y))
-                    self.schedule.add(balloon)
-                    break
-
-    def update_previous_position(self, agent, new_position):
-        self.previous_positions[agent] = new_position
-
-    def reset_game(self):      
-        self.__init__(self.map_file, self.algorithm, self.heuristic, self.jokers) 
+        """
+        Coloca globos en casillas vacías elegidas al azar.
+
+        Se muestrea sobre la lista de casillas libres en lugar de probar posiciones
+        al azar, así el costo es acotado y un mapa lleno no deja el ciclo girando.
+        """
+        empty_cells = [(x, y) for x in range(self.grid_width) for y in range(self.grid_height)
+                       if self.grid.is_cell_empty((x, y))]
+        for pos in self.random.sample(empty_cells, min(count, len(empty_cells))):
+            balloon = Balloon(pos, self)
+            self.grid.place_agent(balloon, pos)
+            self.schedule.add(balloon)
+            self.balloons.append(balloon)
+
+    def closest_bomberman(self, pos):
+        """Devuelve el Bomberman más cercano (distancia Manhattan) a pos."""
+        return min(self.bombermen, key=lambda agent: abs(agent.pos[0] - pos[0]) + abs(agent.pos[1] - pos[1]))
+
+    def resolve_collisions(self, start):
+        """
+        Fase de colisiones del tick, cuando todos los agentes ya se movieron.
+
+        Las posiciones finales de los Bomberman y sus movimientos (desde, hasta) van a
+        tablas hash, y cada globo se compara contra ellas: hay colisión directa si
+        termina en la casilla de un Bomberman y alternada si ambos cruzaron la misma
+        arista en sentidos opuestos. Después, los globos que terminan sobre fuego se
+        destruyen. El costo es proporcional a la cantidad de agentes móviles y el
+        resultado no depende del orden en que el scheduler los activó.
+
+        Args:
+            start (list): Pares (agente, posición al inicio del tick) de Bomberman y globos.
+        """
+        bombermen_at = set()
+        crossings = set()
+        balloons = []
+        for agent, pos in start:
+            if isinstance(agent, Balloon):
+                if agent.pos is not None:
+                    balloons.append((agent, pos))
+            elif agent.pos is not None:
+                bombermen_at.add(agent.pos)
+                if pos != agent.pos:
+                    crossings.add((pos, agent.pos))
+
+        for balloon, pos in balloons:
+            if balloon.pos in bombermen_at:
+                logger.info("Colisión directa entre globo y Bomberman en %s.", balloon.pos)
+                self.handle_collision("colision_directa")
+                return
+            if (balloon.pos, pos) in crossings:
+                logger.info("Colisión alternada entre globo y Bomberman en %s.", balloon.pos)
+                self.handle_collision("colision_alternada")
+                return
+
+        for balloon, _ in balloons:
+            if any(isinstance(obj, Fire) for obj in self.grid.get_cell_list_contents([balloon.pos])):
+                logger.info("Globo destruido en %s por la explosión", balloon.pos)
+                self.events["globo_destruido"] += 1
+                self.grid.remove_agent(balloon)
+                self.schedule.remove(balloon)
+                self.balloons.remove(balloon)
+
+    def reset_game(self):
+        if self.stepping:
+            self.reset_requested = True
+            return
+        # La nueva semilla se deriva del generador actual: la secuencia completa de
+        # reinicios sigue siendo reproducible sin repetir el mismo episodio.
+        recorder = self.recorder
+        search_pool = self.search_pool
+        events = self.events
+        if self.planner:
+            self.planner.shutdown()
+        self.__init__(self.map_file, self.algorithm, self.heuristic, self.jokers,
+                      self.alpha_beta_depth, seed=self.random.randrange(2 ** 32),
+                      async_search=self.planner is not None, search_node_budget=self.search_node_budget,
+                      backend=self.backend, expectimax_depth=self.expectimax_depth,
+                      rollout_budget=self.rollout_budget, move_time_budget=self.move_time_budget,
+                      search_workers=self.search_workers, map_data=self.map_data,
+                      export_file=self.export_file, bomb_planning=self.bomb_planner is not None,
+                      reset_on_collision=self.reset_on_collision, search_executor=self.search_executor,
+                      contract_corridors=self.corridors is not None,
+                      collect_jokers=self.joker_planner is not None,
+                      cooperative_planning=self.coordinator is not None)
+        self.search_pool = search_pool
+        self.events = events
+        self.events["reinicios"] += 1
+        # El mismo registro continúa tras el reinicio, a partir de un keyframe del nuevo estado
+        if recorder:
+            self.recorder = recorder
+            recorder.restart(self)
+
+    def handle_collision(self, kind):
+        """
+        Registra una colisión entre un globo y Bomberman.
+
+        Por defecto reinicia la partida. Con reset_on_collision=False la detiene y deja
+        el tipo en self.collision, para que quien controla el episodio (p. ej. core.env)
+        decida cómo seguir.
+
+        Args:
+            kind (str): "colision_directa" o "colision_alternada".
+        """
+        self.events[kind] += 1
+        if self.reset_on_collision:
+            self.reset_game()
+        else:
+            self.collision = kind
+            self.running = False
 
     def finish_game(self):
-        """Detiene el juego al finalizar."""
-        print("¡Juego detenido! Bomberman ha alcanzado la salida.")
+        """
+        Detiene el juego al finalizar.
+
+        Con varios Bomberman, otros pueden llegar a la salida en el mismo tick después del
+        primero; la partida ya terminó y solo cuenta la primera llegada.
+        """
+        if not self.running:
+            return
+        logger.info("¡Juego detenido! Bomberman ha alcanzado la salida.")
+        self.events["salida_alcanzada"] += 1
         self.running = False 
\ No newline at end of file
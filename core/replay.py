@@ -0,0 +1,258 @@
+import struct
+import numpy as np
+from bisect import bisect_right
+from agents.balloon import Balloon
+from agents.bomb import Bomb
+from agents.bomberman import Bomberman
+from agents.fire import Fire
+from agents.joker import Joker
+from agents.metal import Metal
+from agents.rock import Rock
+
+# Formato binario del registro de episodios:
+#   cabecera:  magic, versión, ancho, alto, intervalo entre keyframes
+#   tick:      b"T", número de tick, cantidad de eventos, eventos (op << 4 | tipo, id, x, y)
+#   keyframe:  b"K", número de tick, cantidad de agentes, agentes (id, tipo, x, y)
+#   búsqueda:  b"E", número de tick, cantidad de visitas, casillas (int32 x * alto + y) en orden de visita
+# Un keyframe reemplaza por completo el estado, por eso también se usa tras un reinicio.
+MAGIC = b"BMRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBHHH")
+RECORD = struct.Struct("<cII")
+EVENT = struct.Struct("<BIHH")
+ENTRY = struct.Struct("<IBHH")
+
+TICK_TAG = b"T"
+KEYFRAME_TAG = b"K"
+EXPLORATION_TAG = b"E"
+
+SPAWN, MOVE, REMOVE = 0, 1, 2
+
+KINDS = ("bomberman", "balloon", "rock", "exit_rock", "power_rock", "metal", "bomb", "fire", "joker")
+
+
+def agent_kind(agent):
+    """Devuelve el código de tipo de un agente, o None si no se registra (p. ej. NumberMarker)."""
+    if isinstance(agent, Bomberman):
+        return 0
+    if isinstance(agent, Balloon):
+        return 1
+    if isinstance(agent, Rock):
+        if agent.has_exit:
+            return 3
+        return 4 if agent.has_power_item else 2
+    if isinstance(agent, Metal):
+        return 5
+    if isinstance(agent, Bomb):
+        return 6
+    if isinstance(agent, Fire):
+        return 7
+    if isinstance(agent, Joker):
+        return 8
+    return None
+
+
+class EpisodeRecorder:
+    """
+    Escribe el registro binario de un episodio a partir de las diferencias entre ticks.
+
+    Args:
+        path (str): Archivo de salida.
+        model (BombermanModel): Modelo ya cargado; su estado inicial se guarda como keyframe del tick 0.
+        keyframe_interval (int): Cada cuántos ticks se escribe un estado completo para poder buscar rápido.
+    """
+
+    def __init__(self, path, model, keyframe_interval=50):
+        self.file = open(path, "wb")
+        self.keyframe_interval = keyframe_interval
+        self.tick = 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, model.grid_width, model.grid_height, keyframe_interval))
+        self.restart(model)
+        self.write_keyframe()
+
+    def restart(self, model):
+        """Olvida los agentes conocidos; el próximo tick se escribe como keyframe (p. ej. tras reset_game)."""
+        self.ids = {}
+        self.state = {}
+        self.static = {}
+        self.pending_keyframe = True
+        self.exported_runs = 0  # Corridas de model.exploration ya escritas
+        # El metal no está en el schedule y nunca cambia: se registra una sola vez
+        for contents, pos in model.grid.coord_iter():
+            for agent in contents:
+                if isinstance(agent, Metal):
+                    self.static[self._id(agent)] = (5, pos)
+        self.state = self._scan(model)
+
+    def _id(self, agent):
+        idx = self.ids.get(agent)
+        if idx is None:
+            idx = self.ids[agent] = len(self.ids)
+        return idx
+
+    def _scan(self, model):
+        """Construye el estado actual {id: (tipo, posición)} de los agentes dinámicos."""
+        current = {}
+        for agent in model.schedule.agents:
+            if agent.pos is None:
+                continue
+            kind = agent_kind(agent)
+            if kind is not None:
+                current[self._id(agent)] = (kind, agent.pos)
+        return current
+
+    def record_tick(self, model):
+        """Registra los cambios producidos por el último paso del modelo."""
+        if self.file.closed:
+            return
+        self.tick += 1
+        self.write_explorations(model.exploration)
+        current = self._scan(model)
+        if self.pending_keyframe or self.tick % self.keyframe_interval == 0:
+            self.state = current
+            self.write_keyframe()
+            return
+
+        events = []
+        for idx, (kind, pos) in current.items():
+            previous = self.state.get(idx)
+            if previous is None:
+                events.append(EVENT.pack(SPAWN << 4 | kind, idx, *pos))
+            elif previous[1] != pos:
+                events.append(EVENT.pack(MOVE << 4 | kind, idx, *pos))
+        for idx, (kind, pos) in self.state.items():
+            if idx not in current:
+                events.append(EVENT.pack(REMOVE << 4 | kind, idx, *pos))
+        self.state = current
+
+        self.file.write(RECORD.pack(TICK_TAG, self.tick, len(events)))
+        self.file.write(b"".join(events))
+
+    def write_explorations(self, exploration):
+        """Escribe las búsquedas cerradas desde el último tick (solo las que siguen en el buffer)."""
+        for run in exploration.recent_runs(exploration.completed - self.exported_runs):
+            self.file.write(RECORD.pack(EXPLORATION_TAG, self.tick, len(run)))
+            self.file.write(run.astype("<i4").tobytes())
+        self.exported_runs = exploration.completed
+
+    def write_keyframe(self):
+        entries = {**self.static, **self.state}
+        self.file.write(RECORD.pack(KEYFRAME_TAG, self.tick, len(entries)))
+        self.file.write(b"".join(ENTRY.pack(idx, kind, *pos) for idx, (kind, pos) in entries.items()))
+        self.file.flush()
+        self.pending_keyframe = False
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class ReplayFrame:
+    """Estado reconstruido de un tick: {id: (tipo, posición)}."""
+
+    def __init__(self, tick, width, height, agents):
+        self.tick = tick
+        self.width = width
+        self.height = height
+        self.agents = agents
+
+    def positions(self, kind):
+        """Posiciones de todos los agentes de un tipo, p. ej. positions("balloon")."""
+        code = KINDS.index(kind)
+        return [pos for agent_kind, pos in self.agents.values() if agent_kind == code]
+
+    def cells(self):
+        """Contenido por casilla {posición: [tipos]}, listo para dibujar en la vista web."""
+        cells = {}
+        for kind, pos in self.agents.values():
+            cells.setdefault(pos, []).append(KINDS[kind])
+        return cells
+
+
+class EpisodeReplay:
+    """
+    Reproduce un registro de EpisodeRecorder sin volver a ejecutar búsquedas.
+
+    El archivo se indexa una sola vez; state_at(n) parte del último keyframe
+    anterior a n y aplica solo los ticks intermedios.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        magic, version, self.width, self.height, self.keyframe_interval = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} no es un registro de episodio compatible.")
+
+        self.records = []  # (tick, etiqueta, cantidad, offset de los datos)
+        self.keyframes = []  # índices en self.records
+        self.explorations = []  # (tick, offset, cantidad) de cada búsqueda registrada
+        offset = HEADER.size
+        while offset < len(self.data):
+            tag, tick, size = RECORD.unpack_from(self.data, offset)
+            offset += RECORD.size
+            if tag == EXPLORATION_TAG:
+                self.explorations.append((tick, offset, size))
+                offset += size * 4
+                continue
+            if tag == KEYFRAME_TAG:
+                self.keyframes.append(len(self.records))
+            self.records.append((tick, tag, size, offset))
+            offset += size * (ENTRY.size if tag == KEYFRAME_TAG else EVENT.size)
+        self.keyframe_ticks = [self.records[i][0] for i in self.keyframes]
+        self.exploration_ticks = [tick for tick, _, _ in self.explorations]
+
+    @property
+    def last_tick(self):
+        return self.records[-1][0]
+
+    def _apply(self, agents, record):
+        _, tag, size, offset = record
+        if tag == KEYFRAME_TAG:
+            agents.clear()
+            for idx, kind, x, y in ENTRY.iter_unpack(self.data[offset:offset + size * ENTRY.size]):
+                agents[idx] = (kind, (x, y))
+            return
+        for op_kind, idx, x, y in EVENT.iter_unpack(self.data[offset:offset + size * EVENT.size]):
+            if op_kind >> 4 == REMOVE:
+                agents.pop(idx, None)
+            else:
+                agents[idx] = (op_kind & 0x0F, (x, y))
+
+    def state_at(self, tick):
+        """Reconstruye el estado al final del tick indicado."""
+        position = bisect_right(self.keyframe_ticks, tick) - 1
+        if position < 0:
+            raise ValueError(f"El tick {tick} es anterior al inicio del registro.")
+        agents = {}
+        for record in self.records[self.keyframes[position]:]:
+            if record[0] > tick:
+                break
+            self._apply(agents, record)
+        return ReplayFrame(tick, self.width, self.height, agents)
+
+    def exploration_at(self, tick):
+        """
+        Numeración de la última búsqueda registrada hasta el tick indicado.
+
+        Returns:
+            dict: {posición: número de visita}; vacío si no hubo búsquedas.
+        """
+        position = bisect_right(self.exploration_ticks, tick) - 1
+        if position < 0:
+            return {}
+        _, offset, size = self.explorations[position]
+        cells = np.frombuffer(self.data, dtype="<i4", count=size, offset=offset)
+        return {(int(index) // self.height, int(index) % self.height): number
+                for number, index in enumerate(cells)}
+
+    def frames(self, start=0):
+        """Avance rápido: genera un ReplayFrame por tick desde start hasta el final."""
+        frame = self.state_at(start)
+        yield frame
+        agents = dict(frame.agents)
+        for record in self.records:
+            if record[0] <= start:
+                continue
+            self._apply(agents, record)
+            yield ReplayFrame(record[0], self.width, self.height, dict(agents))
@@ -0,0 +1,78 @@
+class LeanActivation:
+    """
+    Reemplazo liviano de RandomActivation para las corridas sin interfaz.
+
+    Activa a todos los agentes una vez por paso en orden aleatorio (tomado de
+    model.random, así que respeta la semilla). Los agentes se guardan en un
+    diccionario ordenado en vez del AgentSet de referencias débiles de Mesa, y
+    un agente retirado a mitad del paso ya no se activa.
+
+    Args:
+        model (BombermanModel): Modelo dueño de los agentes.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.steps = 0
+        self.time = 0
+        self._agents = {}
+
+    @property
+    def agents(self):
+        return list(self._agents)
+
+    def get_agent_count(self):
+        return len(self._agents)
+
+    def add(self, agent):
+        self._agents[agent] = None
+
+    def remove(self, agent):
+        del self._agents[agent]
+
+    def step(self):
+        order = list(self._agents)
+        self.model.random.shuffle(order)
+        for agent in order:
+            if agent in self._agents:
+                agent.step()
+        self.steps += 1
+        self.time += 1
+
+
+class EventActivation(LeanActivation):
+    """
+    Scheduler que solo activa a los agentes con algo que hacer en cada paso.
+
+    Las rocas, el metal, los comodines y los NumberMarker (agentes con inert = True)
+    siguen en el scheduler, así que agents los lista como siempre, pero no se activan:
+    su step no hace nada. Bomberman, los globos, las bombas y el fuego se activan una
+    vez por paso en orden aleatorio, como en LeanActivation, y el costo de un paso
+    depende de cuántos agentes activos hay y no del tamaño del mapa. Al barajar menos
+    agentes, la misma semilla produce episodios distintos que con LeanActivation.
+
+    Args:
+        model (BombermanModel): Modelo dueño de los agentes.
+    """
+
+    def __init__(self, model):
+        super().__init__(model)
+        self._active = {}
+
+    def add(self, agent):
+        super().add(agent)
+        if not agent.inert:
+            self._active[agent] = None
+
+    def remove(self, agent):
+        super().remove(agent)
+        self._active.pop(agent, None)
+
+    def step(self):
+        order = list(self._active)
+        self.model.random.shuffle(order)
+        for agent in order:
+            if agent in self._active:
+                agent.step()
+        self.steps += 1
+        self.time += 1
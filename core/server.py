@@ -1,10 +1,16 @@
-from mesa.visualization.modules import CanvasGrid
-from mesa.visualization.ModularVisualization import ModularServer
-from mesa.visualization.UserParam import Choice
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor
+import tornado.escape
+import tornado.ioloop
+from mesa.visualization.modules import CanvasGrid, ChartModule, TextElement
+from mesa.visualization.ModularVisualization import ModularServer, SocketHandler, is_user_param
+from mesa.visualization.UserParam import Choice, Checkbox
 from agents.balloon import Balloon
 from agents.bomb import Bomb
 from agents.fire import Fire
-from core.model import BombermanModel, NumberMarker
+from core.log import configure_logging
+from core.model import BombermanModel, NumberMarker, read_map_cached
 from agents.bomberman import Bomberman
 from agents.rock import Rock
 from agents.metal import Metal
@@ -22,8 +28,9 @@ def agent_portrayal(agent):
         portrayal["text_color"] = "black"
         return portrayal 
 
-    if hasattr(agent, 'model') and agent.pos in agent.model.visited_numbers:
-        portrayal["text"] = str(agent.model.visited_numbers[agent.pos])
+    number = agent.model.exploration.number_at(agent.pos) if hasattr(agent, 'model') else None
+    if number is not None:
+        portrayal["text"] = str(number)
         portrayal["text_color"] = "red"
     
     if isinstance(agent, Bomberman):
@@ -51,15 +58,259 @@ def agent_portrayal(agent):
     
     return portrayal
 
-map_file = "data/mapaRam.txt"
-model = BombermanModel(map_file, "BFS", "Manhattan")
-grid = CanvasGrid(agent_portrayal, model.grid_width, model.grid_height, 500, 500)
-algorithm_choice = Choice("Algoritmo de búsqueda", value="BFS", choices=["BFS", "DFS", "UCS", "BS", "HC", "A*", "AlphaBeta"])
-heuristic_choice = Choice("Heurística", value="Manhattan", choices=["Manhattan", "Euclidiana"])
-#cambiar el rango por 0
-jokers_choice = Choice("Número de comodines", value=3, choices=list(range(1, 11)))
-level_choice = Choice("Nivel", value=1, choices=[1, 3, 6])
-server = ModularServer(BombermanModel, [grid], "Bomberman Model", {"map_file": map_file, "algorithm": algorithm_choice, 
-                                                                   "heuristic": heuristic_choice, "jokers": jokers_choice, "alpha_beta_depth": level_choice})
-server.port = 8521
-server.launch()
+class SessionCanvasGrid(CanvasGrid):
+    """
+    CanvasGrid del tamaño del mapa más grande que ofrece el servidor.
+
+    La vista dibuja con un alto fijo; los mapas más chicos se alinean arriba a la izquierda.
+    """
+
+    def render(self, model):
+        grid_state = super().render(model)
+        offset = self.grid_height - model.grid.height
+        if offset:
+            for portrayals in grid_state.values():
+                for portrayal in portrayals:
+                    portrayal["y"] += offset
+        return grid_state
+
+
+class PerformanceChart(ChartModule):
+    """
+    Gráfico por paso de las métricas de model.tick_stats.
+
+    ChartModule lee la última fila de un DataCollector; este lee el diccionario que el
+    modelo arma en cada paso, así cada sesión grafica su propia partida y el servidor
+    no guarda la serie completa (el navegador acumula los puntos y los borra al reiniciar).
+
+    Args:
+        series (list): Como en ChartModule, cada serie con "Stat" (clave de tick_stats) y,
+            opcionalmente, "Scale" (p. ej. 1000 para pasar de segundos a milisegundos).
+    """
+
+    def render(self, model):
+        return [model.tick_stats.get(s["Stat"], 0) * s.get("Scale", 1) for s in self.series]
+
+
+class PerformanceSummary(TextElement):
+    """Algoritmo y heurística de la sesión con las métricas de su último paso."""
+
+    def render(self, model):
+        stats = model.tick_stats
+        # Con la planificación cooperativa activa, los Bomberman no usan el algoritmo elegido
+        algorithm = f"A* cooperativo ({len(model.bombermen)} Bomberman)" if model.coordinator else model.algorithm
+        return (f"{algorithm} / {model.heuristic} &mdash; paso {stats.get('tick_time', 0) * 1000:.1f} ms, "
+                f"{stats.get('searches', 0)} búsquedas en {stats.get('search_time', 0) * 1000:.1f} ms, "
+                f"{stats.get('nodes_expanded', 0)} nodos expandidos, frontera máxima {stats.get('frontier_peak', 0)}, "
+                f"{stats.get('agents', 0)} agentes")
+
+
+def performance_panel():
+    """Módulos del panel de rendimiento: resumen, tiempos, nodos y agentes por paso."""
+    return [
+        PerformanceSummary(),
+        PerformanceChart([{"Label": "Paso (ms)", "Color": "#1f77b4", "Stat": "tick_time", "Scale": 1000},
+                          {"Label": "Búsquedas (ms)", "Color": "#d62728", "Stat": "search_time", "Scale": 1000}]),
+        PerformanceChart([{"Label": "Nodos expandidos", "Color": "#2ca02c", "Stat": "nodes_expanded"},
+                          {"Label": "Frontera máxima", "Color": "#ff7f0e", "Stat": "frontier_peak"}]),
+        PerformanceChart([{"Label": "Agentes", "Color": "#7f7f7f", "Stat": "agents"}]),
+    ]
+
+
+class Session:
+    """
+    Partida de un visitante: sus parámetros y su propio BombermanModel.
+
+    Los pasos corren en los hilos de paso del servidor, no en el IOLoop, así que un
+    paso pesado (p. ej. Alfa-Beta en nivel 6) no frena a las demás sesiones mientras
+    dura. tick_budget no acota el trabajo de un paso: lo que el paso (más las búsquedas
+    en segundo plano cuyos resultados recibió) se pasa de tick_budget queda como deuda
+    y el siguiente paso de la sesión se demora ese tiempo, para que una partida pesada
+    no acapare los hilos de paso.
+
+    Args:
+        server (SessionServer): Servidor que comparte mapas y executor de búsquedas.
+        params (dict): Valores de los parámetros del modelo.
+    """
+
+    def __init__(self, server, params):
+        self.server = server
+        self.params = params
+        self.debt = 0.0
+        self.model = None
+        self.reset()
+
+    def reset(self):
+        self.close()
+        params = dict(self.params)
+        self.model = BombermanModel(map_data=read_map_cached(params["map_file"]),
+                                    search_executor=self.server.search_executor, **params)
+        self.debt = 0.0
+
+    def wait_time(self):
+        """Segundos que la sesión debe esperar antes de su próximo paso."""
+        return self.debt
+
+    def step(self):
+        planner = self.model.planner
+        searched = planner.compute_time if planner else 0.0
+        started = time.perf_counter()
+        self.model.step()
+        cost = time.perf_counter() - started
+        if planner and self.model.planner is planner:
+            cost += planner.compute_time - searched
+        self.debt = max(0.0, cost - self.server.tick_budget)
+
+    def close(self):
+        if self.model is not None:
+            self.model.close()
+
+
+class SessionSocketHandler(SocketHandler):
+    """Conexión de un visitante: cada una tiene su Session en lugar del modelo global de ModularServer."""
+
+    def open(self):
+        super().open()
+        self.session = Session(self.application, self.application.default_params())
+        self.stepping = False
+        self.reset_pending = False  # Reinicio pedido mientras un paso corría en otro hilo
+
+    def on_close(self):
+        # Con un paso en curso, la sesión se cierra cuando ese paso termina
+        if not self.stepping:
+            self.session.close()
+
+    @property
+    def viz_state_message(self):
+        model = self.session.model
+        return {"type": "viz_state", "data": [element.render(model) for element in self.application.visualization_elements]}
+
+    def on_message(self, message):
+        msg = tornado.escape.json_decode(message)
+        if msg["type"] == "get_step":
+            if not self.session.model.running:
+                self.write_message({"type": "end"})
+            elif not self.stepping:
+                # La respuesta se demora lo que la sesión debe; mientras tanto el servidor atiende a las demás
+                self.stepping = True
+                tornado.ioloop.IOLoop.current().call_later(self.session.wait_time(), self.send_step)
+        elif msg["type"] == "reset":
+            if self.stepping:
+                self.reset_pending = True
+            else:
+                self.reset_session()
+        elif msg["type"] == "submit_params":
+            if msg["param"] in self.application.user_params:
+                self.session.params[msg["param"]] = msg["value"]
+
+    def reset_session(self):
+        self.reset_pending = False
+        self.session.reset()
+        self.write_message(self.viz_state_message)
+
+    def advance(self):
+        """Paso y render de la sesión; corre en un hilo de paso, fuera del IOLoop."""
+        self.session.step()
+        return self.viz_state_message
+
+    async def send_step(self):
+        if self.ws_connection is None:
+            self.stepping = False
+            self.session.close()
+            return
+        message = await tornado.ioloop.IOLoop.current().run_in_executor(self.application.step_executor, self.advance)
+        self.stepping = False
+        if self.ws_connection is None:
+            self.session.close()
+            return
+        if self.reset_pending:
+            self.reset_session()
+        else:
+            self.write_message(message)
+
+
+class SessionServer(ModularServer):
+    """
+    ModularServer con una partida por conexión.
+
+    Los mapas se leen una sola vez (read_map_cached) y las sesiones comparten las filas
+    sin copiarlas; los pasos de todas las sesiones corren en step_threads hilos y sus
+    búsquedas asíncronas en otro executor de search_threads hilos, así el IOLoop solo
+    atiende mensajes. Las sesiones no escriben el archivo de estados: todas escribirían
+    el mismo.
+
+    Args:
+        tick_budget (float): Segundos de cómputo por paso de cada sesión antes de demorarla.
+        search_threads (int): Hilos compartidos para las búsquedas asíncronas.
+        step_threads (int): Hilos compartidos para los pasos de las sesiones.
+    """
+
+    def __init__(self, *args, tick_budget=0.05, search_threads=2, step_threads=4, **kwargs):
+        self.tick_budget = tick_budget
+        self.search_executor = ThreadPoolExecutor(max_workers=search_threads, thread_name_prefix="bomberman-search")
+        self.step_executor = ThreadPoolExecutor(max_workers=step_threads, thread_name_prefix="bomberman-step")
+        super().__init__(*args, **kwargs)
+        # Reemplaza el manejador /ws de ModularServer (las reglas agregadas después se consultan primero)
+        self.add_handlers(r".*", [(r"/ws", SessionSocketHandler)])
+
+    def default_params(self):
+        """Valores iniciales de los parámetros para una sesión nueva."""
+        return {key: val.value if is_user_param(val) else val for key, val in self.model_kwargs.items()
+                if not (is_user_param(val) and val.param_type == "static_text")}
+
+    def reset_model(self):
+        # El modelo global solo se arma para que ModularServer tenga uno; cada conexión usa el suyo.
+        # La sesión anterior se cierra para no dejar sus búsquedas ni su pool de procesos vivos
+        if getattr(self, "session", None) is not None:
+            self.session.close()
+        self.session = Session(self, self.default_params())
+        self.model = self.session.model
+
+
+def create_server(map_file="data/mapaRam.txt", port=8521, map_dir="data", tick_budget=0.05, search_threads=2,
+                  step_threads=4):
+    """
+    Arma el servidor de la vista web sin lanzarlo.
+
+    Cada visitante tiene su propia partida y elige el mapa entre los de map_dir. Las
+    dimensiones de la vista se toman del mapa más grande, sin construir un modelo.
+
+    Args:
+        map_file (str): Mapa elegido al abrir la página.
+        port (int): Puerto HTTP.
+        map_dir (str): Carpeta con los mapas que se ofrecen.
+        tick_budget (float): Segundos de cómputo por paso de cada sesión.
+        search_threads (int): Hilos compartidos por las búsquedas de todas las sesiones.
+        step_threads (int): Hilos compartidos por los pasos de todas las sesiones.
+
+    Returns:
+        SessionServer: Servidor listo para launch().
+    """
+    maps = sorted(set(glob.glob(f"{map_dir}/*.txt")) | {map_file})
+    width = max(len(read_map_cached(path)[0]) for path in maps)
+    height = max(len(read_map_cached(path)) for path in maps)
+    grid = SessionCanvasGrid(agent_portrayal, width, height, 500, 500)
+    map_choice = Choice("Mapa", value=map_file, choices=maps)
+    algorithm_choice = Choice("Algoritmo de búsqueda", value="BFS", choices=["BFS", "DFS", "UCS", "BS", "HC", "A*", "IDA*", "SMA*", "HPA*", "AlphaBeta", "Expectimax", "MCTS"])
+    heuristic_choice = Choice("Heurística", value="Manhattan", choices=["Manhattan", "Euclidiana", "Exacta", "ALT"])
+    #cambiar el rango por 0
+    jokers_choice = Choice("Número de comodines", value=3, choices=list(range(1, 11)))
+    level_choice = Choice("Nivel", value=1, choices=[1, 3, 6])
+    # Las búsquedas corren en segundo plano para que el servidor siga respondiendo en mapas grandes
+    async_choice = Checkbox("Búsqueda asíncrona", value=True)
+    bomb_planning_choice = Checkbox("Planificar bombas en el tiempo", value=False)
+    # Solo tiene efecto en mapas con varias casillas C_b y reemplaza al algoritmo elegido
+    cooperative_choice = Checkbox("Planificación cooperativa (varios Bomberman)", value=False)
+    server = SessionServer(BombermanModel, [grid, *performance_panel()], "Bomberman Model", {"map_file": map_choice, "algorithm": algorithm_choice,
+                                                                       "heuristic": heuristic_choice, "jokers": jokers_choice, "alpha_beta_depth": level_choice,
+                                                                       "async_search": async_choice, "bomb_planning": bomb_planning_choice,
+                                                                       "cooperative_planning": cooperative_choice,
+                                                                       "export_file": None},
+                           tick_budget=tick_budget, search_threads=search_threads, step_threads=step_threads)
+    server.port = port
+    return server
+
+
+if __name__ == "__main__":
+    configure_logging()
+    create_server().launch()
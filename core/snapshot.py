@@ -0,0 +1,308 @@
+import json
+import struct
+import zlib
+from collections import Counter
+import numpy as np
+from agents.balloon import Balloon
+from agents.bomb import Bomb
+from agents.bomberman import Bomberman
+from agents.fire import Fire
+from agents.joker import Joker
+from agents.metal import Metal
+from agents.numberMarker import NumberMarker
+from agents.rock import Rock
+
+# Formato binario de un snapshot:
+#   cabecera (sin comprimir): magic, versión, ancho, alto
+#   cuerpo (zlib):  configuración JSON, mapa original, generador aleatorio, contadores,
+#                   registro de exploración y agentes
+# Los agentes van en el orden de la grilla (casilla por casilla, en el orden en que se
+# apilan) y el scheduler se guarda aparte como lista de índices: el orden en que se
+# agregaron decide cómo se barajan en cada paso.
+MAGIC = b"BMSN"
+VERSION = 3
+# Versiones anteriores que todavía se leen: la 1 guardaba las posiciones previas de los
+# agentes en lugar de la lista de globos, y hasta la 2 Bomberman no tenía ruta de comodines
+READABLE_VERSIONS = (1, 2, 3)
+HEADER = struct.Struct("<4sBHH")
+COUNT = struct.Struct("<I")
+POSITION = struct.Struct("<HH")
+AGENT = struct.Struct("<BBHHii")  # tipo, id numérico, x, y, id (una posición o un número)
+COUNTERS = struct.Struct("<IIIIIB")  # pasos, tiempo, último id, comodines usados, revisión, en curso
+BOMBERMAN = struct.Struct("<HB")  # poder, banderas
+BOMB = struct.Struct("<hHB")  # temporizador, poder, explotó
+NO_POSITION = 0xFFFF
+
+MAP_CODES = ("C", "C_b", "C_g", "R", "R_s", "M")
+KIND_BY_TYPE = {Bomberman: 0, Balloon: 1, Rock: 2, Metal: 3, Bomb: 4, Fire: 5, Joker: 6, NumberMarker: 7}
+
+# Parámetros de BombermanModel que se guardan; el registro de episodio no se retoma
+CONFIG_KEYS = ("map_file", "algorithm", "heuristic", "jokers", "alpha_beta_depth", "seed", "search_node_budget",
+               "backend", "expectimax_depth", "rollout_budget", "move_time_budget", "search_workers", "export_file",
+               "reset_on_collision")
+
+
+class Writer:
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, fmt, *values):
+        self.parts.append(fmt.pack(*values))
+
+    def position(self, pos):
+        self.pack(POSITION, *(pos if pos is not None else (NO_POSITION, NO_POSITION)))
+
+    def positions(self, positions):
+        self.pack(COUNT, len(positions))
+        for pos in positions:
+            self.position(pos)
+
+    def blob(self, data):
+        self.pack(COUNT, len(data))
+        self.parts.append(data)
+
+
+class Reader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def position(self):
+        x, y = self.unpack(POSITION)
+        return None if x == NO_POSITION else (x, y)
+
+    def positions(self):
+        return [self.position() for _ in range(self.unpack(COUNT)[0])]
+
+    def blob(self):
+        size = self.unpack(COUNT)[0]
+        self.offset += size
+        return self.data[self.offset - size:self.offset]
+
+
+def dumps(model):
+    """
+    Serializa el estado completo de un modelo en curso.
+
+    Incluye terreno, agentes (bombas con su temporizador, poder y caminos de Bomberman,
+    plan de bombas), el estado del generador aleatorio y el registro de exploración,
+    así que el modelo restaurado sigue exactamente igual que el original. Lo que se
+    recalcula solo (tablas de heurísticas, grafo de HPA*, reservas de varios Bomberman,
+    búsquedas asíncronas pendientes) no se guarda.
+
+    Returns:
+        bytes: Snapshot en formato binario versionado.
+    """
+    out = Writer()
+    config = {key: getattr(model, key) for key in CONFIG_KEYS}
+    config["async_search"] = model.planner is not None
+    config["bomb_planning"] = model.bomb_planner is not None
+    config["contract_corridors"] = model.corridors is not None
+    config["collect_jokers"] = model.joker_planner is not None
+    config["cooperative_planning"] = model.coordinator is not None
+    config["events"] = dict(model.events)
+    config["collision"] = model.collision
+    out.blob(json.dumps(config).encode("utf-8"))
+    if model.map_data is not None:
+        out.blob(bytes(MAP_CODES.index(code) for row in model.map_data for code in row))
+    else:
+        out.blob(b"")
+
+    version, state, gauss = model.random.getstate()
+    out.pack(struct.Struct("<B625I"), version, *state)
+    out.pack(struct.Struct("<Bd"), gauss is not None, gauss or 0.0)
+    out.pack(COUNTERS, model.schedule.steps, model.schedule.time, model.current_id, model.joker_count,
+             model.grid_revision, model.running)
+    out.position(model.exit_position)
+
+    exploration = model.exploration
+    out.pack(COUNT, exploration.completed)
+    out.pack(COUNT, len(exploration.runs))
+    for run in list(exploration.runs) + [exploration.buffer[:exploration.length]]:
+        out.blob(run.astype("<i4").tobytes())
+
+    # Los NumberMarker de la vista web se rearman solos a partir del registro de exploración
+    markers = set(model.markers.values())
+    agents = [agent for contents, _ in model.grid.coord_iter() for agent in contents if agent not in markers]
+    placed = set(agents)
+    scheduled = list(model.schedule.agents)
+    agents += [agent for agent in scheduled if agent not in placed]
+    index = {agent: i for i, agent in enumerate(agents)}
+    out.pack(COUNT, len(agents))
+    for agent in agents:
+        write_agent(out, agent)
+
+    out.pack(COUNT, len(scheduled))
+    for agent in scheduled:
+        out.pack(COUNT, index[agent])
+    out.pack(COUNT, len(model.bombermen))
+    for bomberman in model.bombermen:
+        out.pack(COUNT, index[bomberman])
+    out.pack(COUNT, len(model.balloons))
+    for balloon in model.balloons:
+        out.pack(COUNT, index[balloon])
+
+    body = zlib.compress(b"".join(out.parts))
+    return HEADER.pack(MAGIC, VERSION, model.grid_width, model.grid_height) + body
+
+
+def write_agent(out, agent):
+    numeric = not isinstance(agent.unique_id, tuple)
+    uid = (agent.unique_id, 0) if numeric else agent.unique_id
+    pos = agent.pos if agent.pos is not None else (NO_POSITION, NO_POSITION)
+    out.pack(AGENT, KIND_BY_TYPE[type(agent)], numeric, *pos, *uid)
+    if isinstance(agent, Bomberman):
+        flags = (agent.exit_found | agent.placed_bomb << 1 | agent.waiting_for_explosion << 2 | agent.controlled << 3
+                 | (agent.waypoints is not None) << 4)
+        out.pack(BOMBERMAN, agent.power, flags)
+        out.position(agent.safe_position)
+        for positions in (agent.path or [], agent.safe_path or [], agent.return_path or [], agent.visited_positions,
+                          agent.waypoints or []):
+            out.positions(list(positions))
+        out.positions([pos for pos, _ in agent.plan])
+        out.blob(bytes(place_bomb for _, place_bomb in agent.plan))
+    elif isinstance(agent, Rock):
+        out.pack(struct.Struct("<BB"), agent.has_exit, agent.has_power_item)
+    elif isinstance(agent, Bomb):
+        out.pack(BOMB, agent.timer, agent.power, agent.exploded)
+    elif isinstance(agent, Fire):
+        out.pack(struct.Struct("<h"), agent.life_span)
+    elif isinstance(agent, Joker):
+        out.pack(struct.Struct("<i"), agent.value)
+    elif isinstance(agent, NumberMarker):
+        out.pack(struct.Struct("<i"), agent.number)
+
+
+class Snapshot:
+    """
+    Snapshot leído de bytes, listo para poblar un BombermanModel nuevo.
+
+    Args:
+        data (bytes): Resultado de dumps().
+    """
+
+    def __init__(self, data):
+        magic, self.version, self.width, self.height = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Los datos no son un snapshot de Bomberman.")
+        if self.version not in READABLE_VERSIONS:
+            raise ValueError(f"Snapshot en formato versión {self.version}; esta versión lee las "
+                             f"{', '.join(map(str, READABLE_VERSIONS))} (escribe la {VERSION}).")
+        self.reader = Reader(zlib.decompress(data[HEADER.size:]))
+        self.config = json.loads(self.reader.blob().decode("utf-8"))
+        codes = self.reader.blob()
+        self.map_data = None
+        if codes:
+            self.map_data = [[MAP_CODES[code] for code in codes[y * self.width:(y + 1) * self.width]]
+                             for y in range(self.height)]
+
+    def model_kwargs(self):
+        config = dict(self.config)
+        config.pop("events")
+        config.pop("collision", None)
+        config["map_data"] = self.map_data
+        return config
+
+    def populate(self, model):
+        """Coloca los agentes guardados y restaura contadores, exploración y generador aleatorio de model."""
+        read = self.reader
+        version, *state = read.unpack(struct.Struct("<B625I"))
+        has_gauss, gauss = read.unpack(struct.Struct("<Bd"))
+        model.random.setstate((version, tuple(state), gauss if has_gauss else None))
+        steps, time, model.current_id, model.joker_count, model.grid_revision, running = read.unpack(COUNTERS)
+        model.schedule.steps, model.schedule.time, model.running = steps, time, bool(running)
+        model._steps, model._time = steps, time
+        model.exit_position = read.position()
+        model.events = Counter(self.config["events"])
+        model.collision = self.config.get("collision")
+
+        completed = read.unpack(COUNT)[0]
+        runs = [np.frombuffer(read.blob(), dtype="<i4").astype(np.int32) for _ in range(read.unpack(COUNT)[0] + 1)]
+        model.exploration.restore(completed, runs[:-1], runs[-1])
+
+        agents = [read_agent(read, model, self.version) for _ in range(read.unpack(COUNT)[0])]
+        for _ in range(read.unpack(COUNT)[0]):
+            model.schedule.add(agents[read.unpack(COUNT)[0]])
+        model.bombermen = [agents[read.unpack(COUNT)[0]] for _ in range(read.unpack(COUNT)[0])]
+        if self.version >= 2:
+            model.balloons = [agents[read.unpack(COUNT)[0]] for _ in range(read.unpack(COUNT)[0])]
+        else:
+            # Las posiciones previas ya no se usan: las colisiones se resuelven dentro del tick
+            for _ in range(read.unpack(COUNT)[0]):
+                read.unpack(COUNT)
+                read.position()
+            model.balloons = [agent for agent in model.schedule.agents
+                              if isinstance(agent, Balloon) and agent.pos is not None]
+
+
+def read_agent(read, model, version=VERSION):
+    kind, numeric, x, y, uid_a, uid_b = read.unpack(AGENT)
+    pos = None if x == NO_POSITION else (x, y)
+    uid = uid_a if numeric else (uid_a, uid_b)
+    if kind == 0:
+        agent = Bomberman(uid, model)
+        agent.power, bits = read.unpack(BOMBERMAN)
+        agent.exit_found, agent.placed_bomb, agent.waiting_for_explosion = bool(bits & 1), bool(bits & 2), bool(bits & 4)
+        agent.controlled = bool(bits & 8)
+        agent.safe_position = read.position()
+        agent.path, agent.safe_path, agent.return_path = read.positions(), read.positions(), read.positions()
+        agent.visited_positions.extend(read.positions())
+        waypoints = read.positions() if version >= 3 else []
+        agent.waypoints = waypoints if bits & 16 else None
+        plan = read.positions()
+        agent.plan = list(zip(plan, (bool(flag) for flag in read.blob())))
+    elif kind == 1:
+        agent = Balloon(uid, model)
+    elif kind == 2:
+        has_exit, has_power_item = read.unpack(struct.Struct("<BB"))
+        agent = Rock(uid, model, has_power_item=bool(has_power_item), has_exit=bool(has_exit))
+    elif kind == 3:
+        agent = Metal(uid, model)
+    elif kind == 4:
+        timer, power, exploded = read.unpack(BOMB)
+        agent = Bomb(uid, pos, model, power)
+        agent.timer, agent.exploded = timer, bool(exploded)
+    elif kind == 5:
+        agent = Fire(uid, pos, model)
+        agent.life_span = read.unpack(struct.Struct("<h"))[0]
+    elif kind == 6:
+        agent = Joker(uid, model, read.unpack(struct.Struct("<i"))[0])
+    else:
+        agent = NumberMarker(uid, model, read.unpack(struct.Struct("<i"))[0])
+    # Los constructores guardan como posición el id de creación; la real es la guardada
+    agent.pos = None
+    if pos is not None:
+        model.grid.place_agent(agent, pos)
+    return agent
+
+
+def loads(data, **overrides):
+    """
+    Crea un BombermanModel a partir de un snapshot.
+
+    Args:
+        data (bytes): Resultado de dumps().
+        **overrides: Parámetros del modelo a cambiar, p. ej. export_file=None en un
+            proceso de trabajo o backend="lean".
+
+    Returns:
+        BombermanModel: Modelo en el mismo estado que el original.
+    """
+    from core.model import BombermanModel
+    snapshot = Snapshot(data)
+    return BombermanModel(snapshot=snapshot, **{**snapshot.model_kwargs(), **overrides})
+
+
+def save(model, path):
+    with open(path, "wb") as f:
+        f.write(dumps(model))
+
+
+def load(path, **overrides):
+    with open(path, "rb") as f:
+        return loads(f.read(), **overrides)
@@ -1,4 +1,6 @@
-from core.server import server
+from core.log import configure_logging
+from core.server import create_server
 
 if __name__ == "__main__":
-    server.launch()
+    configure_logging()
+    create_server().launch()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Las pruebas importan core, agents y utils desde la raíz del repositorio
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,57 @@
+import pytest
+from core.benchmark import run_episode
+from core.model import BombermanModel
+
+
+def trace(model, steps):
+    """Posiciones de Bomberman y de los globos al final de cada paso."""
+    states = []
+    for _ in range(steps):
+        if not model.running:
+            break
+        model.step()
+        states.append((tuple(b.pos for b in model.bombermen), tuple(b.pos for b in model.balloons)))
+    return states
+
+
+@pytest.mark.parametrize("backend", ["lean", "event", "mesa"])
+@pytest.mark.parametrize("algorithm", ["BFS", "A*", "SMA*", "Expectimax", "MCTS"])
+def test_same_seed_same_episode(backend, algorithm):
+    runs = [BombermanModel("data/map.txt", algorithm, "Manhattan", seed=7, backend=backend, export_file=None,
+                           rollout_budget=30) for _ in range(2)]
+    first, second = (trace(model, 60) for model in runs)
+    assert first == second
+    assert runs[0].events == runs[1].events
+    assert runs[0].visited_numbers == runs[1].visited_numbers
+
+
+def test_seed_changes_episode():
+    first = trace(BombermanModel("data/map.txt", "A*", "Manhattan", seed=1, backend="lean", export_file=None), 60)
+    second = trace(BombermanModel("data/map.txt", "A*", "Manhattan", seed=2, backend="lean", export_file=None), 60)
+    assert first != second
+
+
+def test_reset_sequence_is_reproducible():
+    # Cada reinicio deriva su semilla del generador del modelo
+    models = [BombermanModel("data/mapa2.txt", "BFS", "Manhattan", seed=3, backend="lean", export_file=None)
+              for _ in range(2)]
+    for model in models:
+        for _ in range(3):
+            model.reset_game()
+    assert models[0].seed == models[1].seed
+    assert trace(models[0], 40) == trace(models[1], 40)
+
+
+# Episodios fijados con la semilla 0 en data/map.txt: si cambian, cambió el comportamiento
+@pytest.mark.parametrize("algorithm, steps, events", [
+    ("BFS", 146, {"colision_alternada": 4, "colision_directa": 2, "reinicios": 6, "globo_destruido": 1,
+                  "salida_alcanzada": 1}),
+    ("A*", 146, {"colision_alternada": 4, "colision_directa": 2, "reinicios": 6, "globo_destruido": 1,
+                 "salida_alcanzada": 1}),
+    ("HPA*", 81, {"colision_alternada": 3, "reinicios": 3, "salida_alcanzada": 1}),
+])
+def test_benchmark_episode_regression(algorithm, steps, events):
+    result = run_episode("data/map.txt", algorithm, seed=0, max_steps=300, backend="lean")
+    assert result["finished"]
+    assert result["steps"] == steps
+    assert result["events"] == events
@@ -0,0 +1,61 @@
+import pytest
+from agents.rock import Rock
+from core.model import BombermanModel
+from core.replay import EpisodeReplay
+
+
+def record_episode(path, algorithm="A*", seed=0, steps=150, keyframe_interval=None):
+    """Corre un episodio grabándolo y devuelve lo que se vio en cada tick."""
+    model = BombermanModel("data/map.txt", algorithm, "Manhattan", seed=seed, backend="lean", export_file=None,
+                           replay_file=str(path))
+    if keyframe_interval:
+        model.recorder.keyframe_interval = keyframe_interval
+    seen = {}
+    for tick in range(1, steps + 1):
+        if not model.running:
+            break
+        model.step()
+        seen[tick] = {
+            "bomberman": sorted(b.pos for b in model.bombermen),
+            "balloon": sorted(b.pos for b in model.balloons),
+            "rocks": sorted(a.pos for a in model.schedule.agents if isinstance(a, Rock) and a.pos is not None),
+        }
+    model.recorder.close()
+    return seen
+
+
+@pytest.mark.parametrize("keyframe_interval", [None, 7])
+def test_state_at_matches_recorded_episode(tmp_path, keyframe_interval):
+    seen = record_episode(tmp_path / "episodio.bmrp", keyframe_interval=keyframe_interval)
+    replay = EpisodeReplay(str(tmp_path / "episodio.bmrp"))
+    assert replay.last_tick == max(seen)
+    for tick, expected in seen.items():
+        frame = replay.state_at(tick)
+        assert sorted(frame.positions("bomberman")) == expected["bomberman"]
+        assert sorted(frame.positions("balloon")) == expected["balloon"]
+        rocks = frame.positions("rock") + frame.positions("exit_rock") + frame.positions("power_rock")
+        assert sorted(rocks) == expected["rocks"]
+
+
+def test_frames_match_state_at(tmp_path):
+    record_episode(tmp_path / "episodio.bmrp", steps=60)
+    replay = EpisodeReplay(str(tmp_path / "episodio.bmrp"))
+    for frame in replay.frames(10):
+        assert frame.agents == replay.state_at(frame.tick).agents
+
+
+def test_exploration_at_returns_last_search(tmp_path):
+    model = BombermanModel("data/map.txt", "BFS", "Manhattan", seed=0, backend="lean", export_file=None,
+                           replay_file=str(tmp_path / "episodio.bmrp"))
+    searched = {}
+    for tick in range(1, 30):
+        completed = model.exploration.completed
+        model.step()
+        if model.exploration.completed > completed:
+            run = model.exploration.recent_runs(1)[0]
+            searched[tick] = {(int(i) // model.grid_height, int(i) % model.grid_height) for i in run}
+    model.recorder.close()
+    replay = EpisodeReplay(str(tmp_path / "episodio.bmrp"))
+    assert searched
+    for tick, cells in searched.items():
+        assert set(replay.exploration_at(tick)) == cells
@@ -0,0 +1,165 @@
+import random
+import numpy as np
+import pytest
+from agents.joker import Joker
+from agents.rock import Rock
+from core.exploration import ExplorationLog
+from core.model import BombermanModel
+from utils.corridors import CorridorGraph
+from utils.heuristics import distance_table, goal_distance_table
+from utils.hierarchical import ClusterAbstraction
+from utils.map_generator import generate_map
+from utils.search_algorithms import (a_star_search, breadth_first_search, cell_cost, ida_star_search,
+                                      is_valid_move, manhattan_distance, sma_star_search, uniform_cost_search)
+
+
+def make_model(layout, seed, size=21, **kwargs):
+    data = generate_map(size, size, layout, seed=seed)
+    return BombermanModel(f"{layout}-{seed}", "A*", "Manhattan", seed=seed, backend="lean", export_file=None,
+                          map_data=data, **kwargs)
+
+
+def queries(model, count, seed):
+    """Pares (inicio, meta) al azar entre casillas transitables, más el de Bomberman a la salida."""
+    rng = random.Random(seed)
+    open_cells = [(x, y) for x in range(model.grid_width) for y in range(model.grid_height)
+                  if is_valid_move((x, y), model)]
+    pairs = [(model.bombermen[0].pos, model.exit_position)]
+    pairs += [tuple(rng.sample(open_cells, 2)) for _ in range(count)]
+    return [(start, goal) for start, goal in pairs if model.is_reachable(start, goal)]
+
+
+def check_path(path, start, goal, model):
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+        assert is_valid_move(b, model)
+
+
+def steps(path):
+    return len(path) - 1
+
+
+def weighted(path, model):
+    return sum(cell_cost(pos, model) for pos in path[1:])
+
+
+@pytest.mark.parametrize("layout", ["classic", "maze", "arena"])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_optimal_searches_agree_on_unit_cost(layout, seed):
+    model = make_model(layout, seed)
+    for start, goal in queries(model, 15, seed):
+        expected = steps(breadth_first_search(start, goal, model))
+        for path in (uniform_cost_search(start, goal, model),
+                     a_star_search(start, goal, model, manhattan_distance),
+                     ida_star_search(start, goal, model, manhattan_distance),
+                     sma_star_search(start, goal, model, manhattan_distance, max_nodes=10 ** 6)):
+            check_path(path, start, goal, model)
+            assert steps(path) == expected
+
+
+@pytest.mark.parametrize("layout", ["classic", "maze"])
+def test_sma_star_stays_optimal_with_little_memory(layout):
+    model = make_model(layout, 3)
+    for start, goal in queries(model, 15, 3):
+        best = steps(a_star_search(start, goal, model, manhattan_distance))
+        path = sma_star_search(start, goal, model, manhattan_distance, max_nodes=max(best + 2, 30))
+        if path is not None:  # Con muy poca memoria puede abandonar, pero nunca devolver uno peor
+            check_path(path, start, goal, model)
+            assert steps(path) == best
+
+
+@pytest.mark.parametrize("heuristic", ["Exacta", "ALT"])
+def test_table_heuristics_give_optimal_weighted_paths(heuristic):
+    model = make_model("classic", 5)
+    h = model.heuristics.function(heuristic)
+    for start, goal in queries(model, 15, 5):
+        expected = goal_distance_table(goal, model)[start]
+        for path in (a_star_search(start, goal, model, h, cost=cell_cost),
+                     ida_star_search(start, goal, model, h, cost=cell_cost),
+                     sma_star_search(start, goal, model, h, max_nodes=10 ** 6, cost=cell_cost)):
+            check_path(path, start, goal, model)
+            assert weighted(path, model) == expected
+
+
+def test_heuristic_tables_follow_destroyed_rocks():
+    model = make_model("classic", 2, size=31)
+    goal = model.exit_position
+    model.heuristics.goal_table(goal)
+    model.heuristics.landmark_tables()
+    rocks = [agent for agent in model.schedule.agents if isinstance(agent, Rock) and agent.pos != goal][:15]
+    for rock in rocks:
+        pos = rock.pos
+        model.grid.remove_agent(rock)
+        model.notify_terrain_change(pos)
+        assert model.heuristics.goal_table(goal) == goal_distance_table(goal, model)
+    for from_landmark, to_landmark in model.heuristics.landmark_tables():
+        landmark = next(pos for pos, cost in from_landmark.items() if cost == 0)
+        assert from_landmark == distance_table(landmark, model)
+        assert to_landmark == distance_table(landmark, model, reverse=True)
+
+
+@pytest.mark.parametrize("layout", ["classic", "maze", "arena"])
+def test_hpa_star_finds_valid_paths(layout):
+    model = make_model(layout, 4, size=33)
+    hierarchy = ClusterAbstraction(model)
+    for start, goal in queries(model, 15, 4):
+        path = hierarchy.find_path(start, goal, model, manhattan_distance)
+        check_path(path, start, goal, model)
+        # El refinamiento por clusters no es óptimo, pero no debe alejarse demasiado
+        assert steps(path) <= 2 * steps(breadth_first_search(start, goal, model)) + 8
+
+
+@pytest.mark.parametrize("layout", ["maze", "classic"])
+def test_corridor_graph_matches_cell_searches(layout):
+    model = make_model(layout, 6, size=31)
+    graph = CorridorGraph(model)
+    for start, goal in queries(model, 15, 6):
+        path = graph.find_path(start, goal, model)
+        check_path(path, start, goal, model)
+        assert steps(path) == steps(uniform_cost_search(start, goal, model))
+        path = graph.find_path(start, goal, model, heuristic=model.heuristics.exact, cost=cell_cost)
+        check_path(path, start, goal, model)
+        assert weighted(path, model) == goal_distance_table(goal, model)[start]
+
+
+def test_corridor_graph_numbers_corridor_cells():
+    # Un comodín solo aparece si su roca tiene número de exploración
+    model = make_model("maze", 1, size=31)
+    start, goal = model.bombermen[0].pos, model.exit_position
+    path = CorridorGraph(model).find_path(start, goal, model)
+    numbered = model.visited_numbers
+    assert all(pos in numbered for pos in path)
+    assert sorted(numbered.values()) == list(range(len(numbered)))
+
+
+def test_corridor_search_reveals_jokers():
+    revealed = 0
+    for seed in range(4):
+        model = make_model("maze", seed, size=31, contract_corridors=True, jokers=10)
+        for _ in range(300):
+            if not model.running:
+                break
+            model.step()
+        revealed += model.joker_count + sum(isinstance(agent, Joker) for agent in model.schedule.agents)
+    assert revealed > 0
+
+
+def reference_numbers(log):
+    view = np.full(log.width * log.height, -1, dtype=np.int32)
+    for run in list(log.runs) + [log.buffer[:log.length]]:
+        cells, last = np.unique(run[::-1], return_index=True)
+        view[cells] = len(run) - 1 - last
+    return view
+
+
+def test_exploration_view_matches_full_rebuild():
+    rng = random.Random(0)
+    for _ in range(50):
+        log = ExplorationLog(7, 5, history=rng.randint(1, 4))
+        for _ in range(rng.randint(1, 80)):
+            if rng.random() < 0.15:
+                log.flush()
+            else:
+                log.record((rng.randrange(7), rng.randrange(5)))
+            assert np.array_equal(log.numbers(), reference_numbers(log))
@@ -0,0 +1,69 @@
+import os
+import pytest
+from core import snapshot
+from core.model import BombermanModel
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def state(model):
+    return (tuple(b.pos for b in model.bombermen), tuple(b.pos for b in model.balloons), model.schedule.steps,
+            dict(model.events), model.visited_numbers)
+
+
+def advance(model, steps):
+    for _ in range(steps):
+        if not model.running:
+            break
+        model.step()
+
+
+@pytest.mark.parametrize("algorithm, kwargs", [
+    ("A*", {}),
+    ("IDA*", {}),
+    ("A*", {"bomb_planning": True}),
+    ("A*", {"collect_jokers": True}),
+    ("UCS", {"contract_corridors": True}),
+    ("A*", {"cooperative_planning": True}),
+])
+def test_round_trip_continues_identically(algorithm, kwargs):
+    map_file = "data/mapa20x20.txt" if kwargs.get("cooperative_planning") else "data/map.txt"
+    model = BombermanModel(map_file, algorithm, "Manhattan", seed=4, backend="lean", export_file=None, **kwargs)
+    advance(model, 20)
+    copy = snapshot.loads(snapshot.dumps(model))
+    assert state(copy) == state(model)
+    advance(model, 40)
+    advance(copy, 40)
+    assert state(copy) == state(model)
+
+
+def test_round_trip_keeps_configuration():
+    model = BombermanModel("data/map.txt", "A*", "Exacta", seed=1, backend="lean", export_file=None,
+                           bomb_planning=True, collect_jokers=True)
+    copy = snapshot.loads(snapshot.dumps(model))
+    assert (copy.algorithm, copy.heuristic, copy.seed) == ("A*", "Exacta", 1)
+    assert copy.bomb_planner is not None and copy.joker_planner is not None
+    assert copy.coordinator is None
+
+
+def test_save_and_load(tmp_path):
+    model = BombermanModel("data/mapa2.txt", "BFS", "Manhattan", seed=2, backend="lean", export_file=None)
+    advance(model, 10)
+    path = tmp_path / "partida.bmsn"
+    snapshot.save(model, path)
+    assert state(snapshot.load(path)) == state(model)
+
+
+@pytest.mark.parametrize("name", ["snapshot_v1.bmsn", "snapshot_v2.bmsn"])
+def test_reads_older_versions(name):
+    model = snapshot.load(os.path.join(DATA, name), backend="lean", export_file=None)
+    assert model.bombermen and model.balloons
+    advance(model, 40)
+
+
+def test_unknown_version_names_both_versions():
+    data = bytearray(snapshot.dumps(BombermanModel("data/mapa2.txt", "BFS", "Manhattan", seed=0, backend="lean",
+                                                   export_file=None)))
+    data[4] = 99
+    with pytest.raises(ValueError, match="99.*3"):
+        snapshot.loads(bytes(data))
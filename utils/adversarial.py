@@ -0,0 +1,287 @@
+import math
+import random
+import time
+from collections import deque
+from itertools import product
+from agents.metal import Metal
+from agents.rock import Rock
+
+# Algoritmos que deciden un solo movimiento por tick en lugar de un camino completo
+ADVERSARIAL_ALGORITHMS = ("AlphaBeta", "Expectimax", "MCTS")
+
+WIN = 1000
+LOSS = -1000
+# Pasos simulados por rollout después de salir del árbol de MCTS
+ROLLOUT_DEPTH = 30
+# Profundidad máxima (en jugadas de Bomberman) del árbol de MCTS
+TREE_DEPTH = 8
+
+
+class CompactState:
+    """
+    Estado mínimo del juego para simular miles de jugadas sin tocar la grilla de Mesa.
+
+    Guarda solo lo que cambia entre jugadas (posición de Bomberman y de los globos)
+    y, precalculado una vez por decisión, lo estático: casillas transitables para
+    cada tipo de agente y la distancia real de cada casilla a la meta. Es pickleable,
+    así que puede enviarse a un pool de procesos.
+    """
+
+    def __init__(self, width, height, walkable, balloon_walkable, goal, distances, bomberman, balloons):
+        self.width = width
+        self.height = height
+        self.walkable = walkable
+        self.balloon_walkable = balloon_walkable
+        self.goal = goal
+        self.distances = distances
+        self.bomberman = bomberman
+        self.balloons = balloons
+
+    @classmethod
+    def from_model(cls, model, start, goal):
+        from agents.balloon import Balloon
+        walkable = set()
+        balloon_walkable = set()
+        for x in range(model.grid_width):
+            for y in range(model.grid_height):
+                contents = model.grid.get_cell_list_contents((x, y))
+                if any(isinstance(obj, Metal) for obj in contents):
+                    continue
+                walkable.add((x, y))
+                if not any(isinstance(obj, Rock) for obj in contents):
+                    balloon_walkable.add((x, y))
+        balloons = tuple(agent.pos for agent in model.schedule.agents
+                         if isinstance(agent, Balloon) and agent.pos is not None)
+        state = cls(model.grid_width, model.grid_height, frozenset(walkable), frozenset(balloon_walkable),
+                    goal, {}, start, balloons)
+        state.distances = state.distance_map()
+        return state
+
+    def neighbors(self, pos, cells):
+        x, y = pos
+        return [n for n in ((x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)) if n in cells]
+
+    def distance_map(self):
+        """Distancia BFS de cada casilla transitable a la meta."""
+        distances = {self.goal: 0}
+        queue = deque([self.goal])
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.neighbors(current, self.walkable):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[current] + 1
+                    queue.append(neighbor)
+        return distances
+
+    def bomberman_moves(self, pos):
+        return self.neighbors(pos, self.walkable)
+
+    def balloon_moves(self, pos):
+        # Igual que Balloon.move: un globo sin salida se queda donde está
+        return self.neighbors(pos, self.balloon_walkable) or [pos]
+
+    def caught(self, old_bomberman, bomberman, old_balloons, balloons):
+        """Colisión directa o intercambio de casillas, como en BombermanModel.resolve_collisions."""
+        for old, new in zip(old_balloons, balloons):
+            if new == bomberman or (old == bomberman and new == old_bomberman):
+                return True
+        return False
+
+    def evaluate(self, bomberman):
+        return -self.distances.get(bomberman, self.width * self.height)
+
+
+def expectimax_search(start, goal, model, depth=2, record_state=None):
+    """
+    Expectimax para Bomberman frente a globos que se mueven al azar.
+
+    Los nodos de Bomberman maximizan; los nodos de azar promedian todos los
+    movimientos conjuntos de los globos, cada uno con la probabilidad uniforme que
+    usa Balloon.move. Solo se modelan los globos que pueden alcanzar a Bomberman
+    dentro de la profundidad; el resto no afecta la decisión.
+
+    Args:
+        start (tuple): Posición de Bomberman.
+        goal (tuple): Posición de la salida.
+        model (BombermanModel): Modelo (o vista del modelo) con el estado actual.
+        depth (int): Jugadas de Bomberman a considerar.
+
+    Returns:
+        tuple: La mejor casilla vecina y su valor esperado.
+    """
+    from utils.search_algorithms import report_search_stats
+    state = CompactState.from_model(model, start, goal)
+    reach = 2 * depth + 1
+    balloons = tuple(b for b in state.balloons
+                     if abs(b[0] - start[0]) + abs(b[1] - start[1]) <= reach)
+    nodes = [0]
+
+    def max_value(bomberman, balloons, remaining):
+        nodes[0] += 1
+        if bomberman == goal:
+            return WIN
+        if remaining == 0:
+            return state.evaluate(bomberman)
+        return max((chance_value(bomberman, move, balloons, remaining)
+                    for move in state.bomberman_moves(bomberman)), default=state.evaluate(bomberman))
+
+    def chance_value(bomberman, move, balloons, remaining):
+        options = [state.balloon_moves(b) for b in balloons]
+        probability = 1.0 / math.prod(len(o) for o in options)
+        expected = 0.0
+        for outcome in product(*options):
+            if state.caught(bomberman, move, balloons, outcome):
+                expected += probability * LOSS
+            else:
+                expected += probability * max_value(move, outcome, remaining - 1)
+        return expected
+
+    best_move, best_value = None, float('-inf')
+    for move in state.bomberman_moves(start):
+        value = chance_value(start, move, balloons, depth)
+        if record_state:
+            record_state(move, value)
+        if value > best_value:
+            best_move, best_value = move, value
+    report_search_stats(model, nodes[0], len(balloons), nodes[0])
+    return best_move, best_value
+
+
+def run_mcts(state, rollouts, time_budget=None, seed=None):
+    """
+    Ejecuta MCTS (UCT de lazo abierto) desde el estado compacto.
+
+    El árbol se indexa por la secuencia de jugadas de Bomberman: los globos se
+    muestrean de nuevo en cada simulación, así que el valor de un nodo ya promedia
+    su azar. Es una función de módulo para poder ejecutarse en otro proceso.
+
+    Args:
+        state (CompactState): Estado de partida.
+        rollouts (int): Número máximo de simulaciones.
+        time_budget (float, optional): Segundos máximos de búsqueda.
+        seed (int, optional): Semilla del generador de las simulaciones.
+
+    Returns:
+        tuple: ({primera jugada: [visitas, recompensa acumulada]}, nodos del árbol).
+    """
+    rng = random.Random(seed)
+    tree = {(): [0, 0.0]}
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    longest = max(state.distances.values(), default=1) or 1
+
+    for _ in range(rollouts):
+        if deadline and time.perf_counter() >= deadline:
+            break
+        bomberman, balloons = state.bomberman, state.balloons
+        sequence = ()
+        reward = None
+
+        # Selección y expansión
+        while reward is None and len(sequence) < TREE_DEPTH:
+            moves = state.bomberman_moves(bomberman)
+            if not moves:
+                break
+            untried = [m for m in moves if sequence + (m,) not in tree]
+            if untried:
+                move = rng.choice(untried)
+                tree[sequence + (move,)] = [0, 0.0]
+            else:
+                parent_visits = tree[sequence][0]
+                move = max(moves, key=lambda m: uct(tree[sequence + (m,)], parent_visits))
+            sequence += (move,)
+            reward, bomberman, balloons = simulate_turn(state, bomberman, move, balloons, rng)
+            if untried:
+                break
+
+        # Rollout: Bomberman avanza casi siempre hacia la meta, los globos al azar
+        for _ in range(ROLLOUT_DEPTH):
+            if reward is not None:
+                break
+            moves = state.bomberman_moves(bomberman)
+            if not moves:
+                break
+            if rng.random() < 0.8:
+                move = min(moves, key=lambda m: state.distances.get(m, longest))
+            else:
+                move = rng.choice(moves)
+            reward, bomberman, balloons = simulate_turn(state, bomberman, move, balloons, rng)
+        if reward is None:
+            reward = 0.5 * (1 - state.distances.get(bomberman, longest) / longest)
+
+        for length in range(len(sequence) + 1):
+            stats = tree[sequence[:length]]
+            stats[0] += 1
+            stats[1] += reward
+
+    return {sequence[0]: stats for sequence, stats in tree.items() if len(sequence) == 1}, len(tree)
+
+
+def simulate_turn(state, bomberman, move, balloons, rng):
+    """Aplica una jugada de Bomberman y un movimiento al azar de cada globo."""
+    moved = tuple(rng.choice(state.balloon_moves(b)) for b in balloons)
+    if state.caught(bomberman, move, balloons, moved):
+        return 0.0, move, moved
+    if move == state.goal:
+        return 1.0, move, moved
+    return None, move, moved
+
+
+def uct(stats, parent_visits, exploration=1.4):
+    visits, total = stats
+    return total / visits + exploration * math.sqrt(math.log(parent_visits) / visits)
+
+
+def mcts_search(start, goal, model, rollouts=200, time_budget=None, pool=None, workers=1, record_state=None,
+                seed=None):
+    """
+    Elige el movimiento de Bomberman con Monte Carlo Tree Search.
+
+    Con un pool de procesos, cada proceso construye su propio árbol con una semilla
+    distinta y parte del presupuesto; las visitas de la raíz se suman al final
+    (paralelización de raíz).
+
+    Args:
+        start (tuple): Posición de Bomberman.
+        goal (tuple): Posición de la salida.
+        model (BombermanModel): Modelo (o vista del modelo) con el estado actual.
+        rollouts (int): Simulaciones totales por movimiento.
+        time_budget (float, optional): Segundos por movimiento.
+        pool (Executor, optional): Pool de procesos para repartir las simulaciones.
+        workers (int): Cantidad de árboles independientes cuando hay pool.
+        seed (int, optional): Semilla de las simulaciones; por defecto se toma de
+            model.random. Una búsqueda en segundo plano la recibe ya sorteada en el
+            hilo principal, para no leer el generador mientras el modelo avanza.
+
+    Returns:
+        tuple: La casilla vecina más visitada y su recompensa media.
+    """
+    from utils.search_algorithms import report_search_stats
+    state = CompactState.from_model(model, start, goal)
+    if seed is None:
+        seed = model.random.randrange(2 ** 32)
+    if pool is not None and workers > 1:
+        share = max(1, rollouts // workers)
+        futures = [pool.submit(run_mcts, state, share, time_budget, seed + i) for i in range(workers)]
+        results = [future.result() for future in futures]
+    else:
+        results = [run_mcts(state, rollouts, time_budget, seed)]
+
+    root = {}
+    tree_nodes = 0
+    for result, size in results:
+        tree_nodes += size
+        for move, (visits, total) in result.items():
+            stats = root.setdefault(move, [0, 0.0])
+            stats[0] += visits
+            stats[1] += total
+
+    simulations = sum(visits for visits, _ in root.values())
+    # MCTS no tiene frontera: se informa el tamaño de los árboles como pico y como memoria
+    report_search_stats(model, simulations, tree_nodes, tree_nodes)
+    if not root:
+        return None, 0.0
+    for move, (visits, total) in root.items():
+        if record_state:
+            record_state(move, total / visits)
+    best_move = max(root, key=lambda move: root[move][0])
+    return best_move, root[best_move][1] / root[best_move][0]
@@ -0,0 +1,154 @@
+import numpy as np
+from agents.metal import Metal
+from agents.rock import Rock
+
+
+class GridBitboards:
+    """
+    Terreno de la grilla como bitboards: enteros de Python con un bit por casilla.
+
+    La casilla (x, y) es el bit y * (ancho + 1) + x. La columna extra queda siempre en
+    cero y hace de guarda: al desplazar un tablero una posición a la izquierda o a la
+    derecha, los bits no pasan de una fila a la siguiente. Moverse en las cuatro
+    direcciones es entonces un desplazamiento de 1 o de ancho + 1 bits, y una expansión
+    por anchura (flood fill) avanza todo un frente con un puñado de operaciones sobre
+    enteros, sin recorrer las casillas una por una.
+
+    Los tableros de metal y rocas se arman la primera vez que se piden y se corrigen
+    casilla por casilla desde notify_terrain_change.
+
+    Args:
+        model (BombermanModel): Modelo con el mapa ya cargado.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.width = model.grid_width
+        self.height = model.grid_height
+        self.stride = self.width + 1
+        self.size = self.stride * self.height
+        row = (1 << self.width) - 1
+        self.full = sum(row << (y * self.stride) for y in range(self.height))
+        metal, rock = [], []
+        for contents, (x, y) in model.grid.coord_iter():
+            for obj in contents:
+                if isinstance(obj, Metal):
+                    metal.append(y * self.stride + x)
+                elif isinstance(obj, Rock):
+                    rock.append(y * self.stride + x)
+        self.metal = self.from_indices(metal)
+        self.rock = self.from_indices(rock)
+
+    def from_indices(self, indices):
+        bits = np.zeros(self.size, dtype=np.uint8)
+        bits[indices] = 1
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+    def bit(self, pos):
+        return 1 << (pos[1] * self.stride + pos[0])
+
+    def board(self, cells):
+        """Tablero con las casillas dadas."""
+        return self.from_indices([y * self.stride + x for x, y in cells])
+
+    def cells(self, board):
+        """Casillas de un tablero, ordenadas por fila y luego por columna."""
+        if not board:
+            return []
+        data = board.to_bytes((self.size + 7) // 8, "little")
+        indices = np.flatnonzero(np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little"))
+        return [(int(index) % self.stride, int(index) // self.stride) for index in indices]
+
+    def update(self, pos):
+        """Vuelve a leer las rocas y el metal de pos (se llama desde notify_terrain_change)."""
+        bit = self.bit(pos)
+        contents = self.model.grid.get_cell_list_contents([pos])
+        self.rock = self.rock | bit if any(isinstance(obj, Rock) for obj in contents) else self.rock & ~bit
+        self.metal = self.metal | bit if any(isinstance(obj, Metal) for obj in contents) else self.metal & ~bit
+
+    def walkable(self):
+        """Casillas donde Bomberman puede escapar (sin roca ni metal, como is_valid_move_for_escape)."""
+        return self.full & ~self.metal & ~self.rock
+
+    def dilate(self, board):
+        """Casillas del tablero y sus cuatro vecinas."""
+        return (board | board << 1 | board >> 1 | board << self.stride | board >> self.stride) & self.full
+
+    def blast(self, pos, power):
+        """
+        Casillas que alcanza una bomba en pos, como en Bomb.explode: el fuego atraviesa
+        rocas y se detiene en el metal (la casilla de metal también se marca).
+        """
+        origin = self.bit(pos)
+        result = origin
+        for shift in (1, -1, self.stride, -self.stride):
+            ray = origin
+            for _ in range(power):
+                ray = (ray << shift if shift > 0 else ray >> -shift) & self.full
+                if not ray:
+                    break
+                result |= ray
+                if ray & self.metal:
+                    break
+        return result
+
+    def layers(self, start, passable, limit=None, until=0):
+        """
+        Expansión por anchura desde start sobre el tablero passable.
+
+        Args:
+            limit (int, optional): Máximo de movimientos.
+            until (int): Tablero de metas; la expansión se detiene en la primera capa que lo toca.
+
+        Returns:
+            list: Un tablero por distancia: layers[d] son las casillas a exactamente d movimientos.
+        """
+        frontier = self.bit(start)
+        seen = frontier
+        result = [frontier]
+        while frontier and not frontier & until and (limit is None or len(result) <= limit):
+            frontier = self.dilate(frontier) & passable & ~seen
+            if frontier:
+                seen |= frontier
+                result.append(frontier)
+        return result
+
+    def reachable(self, start, passable, limit=None):
+        """Casillas alcanzables desde start en a lo sumo limit movimientos (sin límite por defecto)."""
+        result = 0
+        for layer in self.layers(start, passable, limit):
+            result |= layer
+        return result
+
+    def path(self, layers, targets):
+        """
+        Camino más corto desde el inicio de layers hasta la casilla más cercana de targets.
+
+        Es el mismo camino que arma una BFS que expande los vecinos en el orden de
+        get_neighbors_in_orthogonal_order: primero se marcan, de la meta hacia atrás,
+        las casillas que están en algún camino más corto, y luego se avanza desde el
+        inicio tomando en cada paso el primer vecino marcado en ese orden. Con varias
+        metas a la misma distancia se llega a la que esa BFS encontraría primero.
+
+        Args:
+            layers (list): Resultado de layers().
+            targets (int): Tablero de metas.
+
+        Returns:
+            list: Casillas desde el inicio hasta la meta, o None si ninguna está en layers.
+        """
+        distance = next((d for d, layer in enumerate(layers) if layer & targets), None)
+        if distance is None:
+            return None
+        on_path = [0] * (distance + 1)
+        on_path[distance] = layers[distance] & targets
+        for d in range(distance - 1, -1, -1):
+            on_path[d] = layers[d] & self.dilate(on_path[d + 1])
+        path = self.cells(on_path[0])
+        for d in range(1, distance + 1):
+            x, y = path[-1]
+            for neighbor in ((x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)):
+                if 0 <= neighbor[0] < self.width and 0 <= neighbor[1] < self.height and on_path[d] & self.bit(neighbor):
+                    path.append(neighbor)
+                    break
+        return path
@@ -0,0 +1,219 @@
+from heapq import heappush, heappop
+from itertools import count
+from agents.bomb import Bomb
+from agents.fire import Fire
+from agents.metal import Metal
+from agents.rock import Rock
+
+# Casillas alrededor del tramo (además del alcance de la bomba) donde el plan puede esconderse
+SEGMENT_MARGIN = 4
+# Estados que puede expandir un tramo antes de rendirse y dejar la lógica reactiva
+SEGMENT_NODE_BUDGET = 20000
+
+
+def detonation_age(power):
+    """Ticks desde que se pone la bomba hasta que explota (Bomb.timer = power + 2)."""
+    return power + 2
+
+
+def clear_age(power):
+    """
+    Primer tick (contado desde que se pone la bomba) en que las rocas destruidas ya no
+    están, sin importar el orden de activación: la bomba explota en detonation_age, el
+    fuego borra las rocas en el tick siguiente y recién en el otro la casilla está libre.
+    """
+    return power + 4
+
+
+class BombPlanner:
+    """
+    Planificación en el espacio (posición, tiempo, estado de la bomba).
+
+    El camino espacial hacia la salida (el de la búsqueda elegida) atraviesa rocas;
+    en lugar de reaccionar al encontrarlas (poner la bomba, buscar dónde esconderse,
+    esperar a que no quede fuego y volver), el tramo que va desde Bomberman hasta la
+    primera casilla libre después de las rocas se resuelve con un A* en el tiempo. Cada
+    acción dura un tick: moverse, quedarse o poner una bomba. Así se elige a la vez
+    dónde poner la bomba (a distancia de alcance, no solo al lado de la roca), dónde
+    esperar fuera de la explosión y el tick exacto para volver a entrar.
+
+    La búsqueda se poda a una ventana alrededor del tramo y solo considera poner una
+    bomba si su explosión alcanza alguna roca. Los planes y las casillas de cada
+    explosión se guardan por revisión del terreno.
+
+    Args:
+        model (BombermanModel): Modelo con la grilla.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.revision = model.grid_revision
+        self.plans = {}  # (inicio, meta, poder) -> acciones
+        self.blasts = {}  # (casilla, poder) -> (casillas alcanzadas, rocas alcanzadas)
+
+    def refresh(self):
+        """Descarta lo guardado si el terreno cambió desde la última consulta."""
+        if self.revision != self.model.grid_revision:
+            self.revision = self.model.grid_revision
+            self.plans.clear()
+            self.blasts.clear()
+
+    def plan(self, start, route, power):
+        """
+        Acciones para recorrer route desde start hasta pasar el primer grupo de rocas.
+
+        Args:
+            start (tuple): Posición actual de Bomberman.
+            route (list): Camino espacial hacia la salida (puede incluir start).
+            power (int): Poder de las bombas que pondrá Bomberman.
+
+        Returns:
+            tuple: (acciones, resto del camino). Cada acción es (posición, pone_bomba) y
+                ocupa un tick. Las acciones son None si el tramo no pudo planificarse.
+        """
+        if route and route[0] == start:
+            route = route[1:]
+        blocked = next((i for i, pos in enumerate(route) if self.is_rock(pos)), None)
+        if blocked is None:
+            return [(pos, False) for pos in route], []
+        # La meta del tramo es la primera casilla sin roca después del grupo (o la salida)
+        target = blocked
+        while target < len(route) - 1 and self.is_rock(route[target]):
+            target += 1
+
+        goal = route[target]
+        targets = frozenset(pos for pos in route[blocked:target + 1] if self.is_rock(pos))
+        self.refresh()
+        active = self.active_bomb()
+        if active is not None:
+            # El plan depende de la bomba en curso: no se guarda
+            return self.plan_segment(start, goal, targets, power, active), route[target + 1:]
+        key = (start, goal, power)
+        if key not in self.plans:
+            self.plans[key] = self.plan_segment(start, goal, targets, power)
+        actions = self.plans[key]
+        return (list(actions) if actions is not None else None), route[target + 1:]
+
+    def is_rock(self, pos):
+        return any(isinstance(obj, Rock) for obj in self.model.grid.get_cell_list_contents(pos))
+
+    def active_bomb(self):
+        """Bomba que ya está en el mapa como (casilla, poder, edad), o None."""
+        for agent in self.model.schedule.agents:
+            if isinstance(agent, Bomb) and agent.pos is not None and not agent.exploded:
+                return agent.pos, agent.power, detonation_age(agent.power) - agent.timer
+        return None
+
+    def fire_on_rocks(self):
+        """Hay fuego sobre alguna roca: el terreno cambia en este tick y conviene esperar para planificar."""
+        for agent in self.model.schedule.agents:
+            if isinstance(agent, Fire) and agent.pos is not None and self.is_rock(agent.pos):
+                return True
+        return False
+
+    def blast(self, cell, power):
+        """Casillas que alcanza una bomba en cell y rocas entre ellas (el fuego atraviesa rocas, no metal)."""
+        cached = self.blasts.get((cell, power))
+        if cached:
+            return cached
+        cells = {cell}
+        rocks = set()
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            for i in range(1, power + 1):
+                pos = (cell[0] + dx * i, cell[1] + dy * i)
+                if self.model.grid.out_of_bounds(pos):
+                    break
+                contents = self.model.grid.get_cell_list_contents(pos)
+                if any(isinstance(obj, Metal) for obj in contents):
+                    break
+                cells.add(pos)
+                if any(isinstance(obj, Rock) for obj in contents):
+                    rocks.add(pos)
+        self.blasts[(cell, power)] = (frozenset(cells), frozenset(rocks))
+        return self.blasts[(cell, power)]
+
+    def plan_segment(self, start, goal, targets, power, active=None):
+        """
+        A* en el tiempo desde start hasta goal.
+
+        Un estado es (posición, rocas de targets ya destruidas, bomba activa), con la
+        bomba como (casilla, poder, edad). Solo se sigue el estado de las rocas del
+        tramo (targets): las demás se tratan como fijas, lo que evita combinar cada
+        explosión posible de la ventana y solo descarta atajos poco probables. Mientras la bomba está por explotar o su
+        fuego sigue en pie, Bomberman no puede estar en las casillas que alcanza; las
+        rocas alcanzadas se vuelven transitables en clear_age. La heurística es la
+        distancia Manhattan (cada tick avanza a lo sumo una casilla), así que el plan es
+        el más corto dentro de la ventana.
+
+        Returns:
+            list: Acciones (posición, pone_bomba), o None si no hay plan dentro de la ventana y del presupuesto.
+        """
+        reach = max(power, active[1] if active else 0) + SEGMENT_MARGIN
+        low = (min(start[0], goal[0]) - reach, min(start[1], goal[1]) - reach)
+        high = (max(start[0], goal[0]) + reach, max(start[1], goal[1]) + reach)
+
+        def passable(pos, cleared):
+            if not (low[0] <= pos[0] <= high[0] and low[1] <= pos[1] <= high[1]):
+                return False
+            if self.model.grid.out_of_bounds(pos):
+                return False
+            for obj in self.model.grid.get_cell_list_contents(pos):
+                if isinstance(obj, Metal) or (isinstance(obj, Rock) and pos not in cleared):
+                    return False
+            return True
+
+        def h(pos):
+            return abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
+
+        initial = (start, frozenset(), active)
+        counter = count()
+        queue = [(h(start), next(counter), 0, initial)]
+        came_from = {initial: None}
+        g_cost = {initial: 0}
+        expanded = 0
+
+        while queue:
+            _, _, g, state = heappop(queue)
+            if g > g_cost[state]:
+                continue
+            pos, cleared, bomb = state
+            if pos == goal:
+                actions = []
+                while came_from[state] is not None:
+                    state, action = came_from[state]
+                    actions.append(action)
+                actions.reverse()
+                return actions
+            expanded += 1
+            if expanded > SEGMENT_NODE_BUDGET:
+                return None
+
+            # La bomba envejece un tick; al llegar a clear_age sus rocas desaparecen
+            unsafe = frozenset()
+            if bomb is not None:
+                cell, bomb_power, age = bomb
+                age += 1
+                cells, rocks = self.blast(cell, bomb_power)
+                if age >= clear_age(bomb_power):
+                    cleared = cleared | (rocks & targets)
+                    bomb = None
+                else:
+                    bomb = (cell, bomb_power, age)
+                    # Fuera de la explosión desde el tick anterior a detonar hasta que el fuego se apaga
+                    if age >= detonation_age(bomb_power) - 1:
+                        unsafe = cells
+
+            successors = []
+            x, y = pos
+            for neighbor in (pos, (x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)):
+                if neighbor not in unsafe and (neighbor == pos or passable(neighbor, cleared)):
+                    successors.append(((neighbor, cleared, bomb), (neighbor, False)))
+            if bomb is None and pos not in unsafe and (self.blast(pos, power)[1] & targets) - cleared:
+                successors.append(((pos, cleared, (pos, power, 0)), (pos, True)))
+
+            for following, action in successors:
+                if g + 1 < g_cost.get(following, float('inf')):
+                    g_cost[following] = g + 1
+                    came_from[following] = (state, action)
+                    heappush(queue, (g + 1 + h(following[0]), next(counter), g + 1, following))
+        return None
@@ -0,0 +1,121 @@
+from agents.metal import Metal
+from agents.rock import Rock
+
+# Reglas de paso: tipos de agente que bloquean una casilla en cada una
+RULES = {
+    "move": (Metal,),  # is_valid_move y cell_cost: las búsquedas de Bomberman atraviesan rocas
+    "escape": (Metal, Rock),  # is_valid_move_for_escape: la BFS sin marcadores y las zonas seguras
+}
+
+
+class ConnectivityIndex:
+    """
+    Componentes conexas de la grilla para cada regla de paso, con union-find.
+
+    Responde en tiempo casi constante si una meta es alcanzable, sin que una búsqueda
+    recorra toda la región del inicio para devolver None. El terreno solo se abre
+    (las rocas se destruyen y el metal no cambia), así que notify_terrain_change une la
+    casilla liberada con sus vecinas abiertas; si alguna vez una casilla se cerrara, la
+    regla afectada se rearma en la próxima consulta.
+
+    Args:
+        model (BombermanModel): Modelo con el mapa ya cargado.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.width = model.grid_width
+        self.height = model.grid_height
+        self.open = {}  # regla -> lista de bool por casilla (índice x * alto + y)
+        self.parent = {}  # regla -> lista de padres del union-find
+        self.size = {}
+        self.stale = set()  # Reglas que hay que rearmar
+        for rule in RULES:
+            self.build(rule)
+
+    def build(self, rule):
+        blocked = RULES[rule]
+        cells = self.width * self.height
+        self.open[rule] = is_open = [True] * cells
+        self.parent[rule] = list(range(cells))
+        self.size[rule] = [1] * cells
+        for contents, (x, y) in self.model.grid.coord_iter():
+            if any(isinstance(obj, blocked) for obj in contents):
+                is_open[x * self.height + y] = False
+        for x in range(self.width):
+            for y in range(self.height):
+                index = x * self.height + y
+                if not is_open[index]:
+                    continue
+                if x + 1 < self.width and is_open[index + self.height]:
+                    self.union(rule, index, index + self.height)
+                if y + 1 < self.height and is_open[index + 1]:
+                    self.union(rule, index, index + 1)
+        self.stale.discard(rule)
+
+    def find(self, rule, index):
+        parent = self.parent[rule]
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]  # Compresión por mitades
+            index = parent[index]
+        return index
+
+    def union(self, rule, a, b):
+        a, b = self.find(rule, a), self.find(rule, b)
+        if a == b:
+            return
+        size = self.size[rule]
+        if size[a] < size[b]:
+            a, b = b, a
+        self.parent[rule][b] = a
+        size[a] += size[b]
+
+    def neighbors(self, pos):
+        x, y = pos
+        for nx, ny in ((x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)):
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                yield nx * self.height + ny
+
+    def update(self, pos):
+        """Vuelve a leer la casilla pos en cada regla (se llama desde notify_terrain_change)."""
+        contents = self.model.grid.get_cell_list_contents([pos])
+        index = pos[0] * self.height + pos[1]
+        for rule, blocked in RULES.items():
+            if rule in self.stale:
+                continue
+            is_open = not any(isinstance(obj, blocked) for obj in contents)
+            if is_open == self.open[rule][index]:
+                continue
+            if not is_open:
+                self.stale.add(rule)  # Union-find no separa componentes
+                continue
+            self.open[rule][index] = True
+            for neighbor in self.neighbors(pos):
+                if self.open[rule][neighbor]:
+                    self.union(rule, index, neighbor)
+
+    def connected(self, start, goal, rule="move"):
+        """
+        Indica si una búsqueda con la regla dada puede llegar de start a goal.
+
+        Como en las búsquedas, la casilla de inicio no se valida: basta con que una de
+        sus vecinas abiertas esté en la componente de la meta.
+
+        Args:
+            start (tuple): Posición inicial.
+            goal (tuple): Posición objetivo.
+            rule (str): "move" (solo bloquea el metal) o "escape" (bloquean metal y rocas).
+        """
+        if start == goal:
+            return True
+        if rule in self.stale:
+            self.build(rule)
+        is_open = self.open[rule]
+        goal_index = goal[0] * self.height + goal[1]
+        if not is_open[goal_index]:
+            return False
+        root = self.find(rule, goal_index)
+        start_index = start[0] * self.height + start[1]
+        if is_open[start_index]:
+            return self.find(rule, start_index) == root
+        return any(is_open[neighbor] and self.find(rule, neighbor) == root for neighbor in self.neighbors(start))
@@ -0,0 +1,229 @@
+from heapq import heappush, heappop
+from itertools import count
+from threading import Lock
+from utils.search_algorithms import cell_cost, get_neighbors_in_orthogonal_order, report_search_stats
+
+
+class CorridorGraph:
+    """
+    Grafo contraído de pasillos para UCS y A*.
+
+    Los nodos son las casillas transitables que no tienen exactamente dos vecinos
+    transitables (cruces, esquinas de salas y callejones sin salida); cada pasillo de
+    ancho uno entre dos nodos es una arista con sus casillas interiores guardadas en
+    orden. Una búsqueda sobre este grafo hace un solo push por pasillo en lugar de uno
+    por casilla, y el camino se expande de vuelta a casillas al final. Al cerrar un
+    nodo se numeran también las casillas del pasillo por el que se llegó a él. Un inicio o una
+    meta en medio de un pasillo se conectan temporalmente con los dos extremos.
+
+    La topología depende solo del metal (la regla de paso de is_valid_move); una roca
+    destruida solo cambia el costo con cell_cost de su casilla, así que se corrige la
+    suma del pasillo que la contiene en la siguiente búsqueda. Si una casilla cambia de
+    transitable a intransitable (o al revés), el grafo se rearma.
+
+    Args:
+        model (BombermanModel): Modelo con el mapa ya cargado.
+    """
+
+    def __init__(self, model):
+        self.dirty = set()
+        self.lock = Lock()  # Protege dirty, que se marca desde el hilo principal
+        self.search_lock = Lock()
+        self.build(model)
+
+    def build(self, model):
+        self.costs = {}  # casilla transitable -> cell_cost
+        for x in range(model.grid_width):
+            for y in range(model.grid_height):
+                cost = cell_cost((x, y), model)
+                if cost is not None:
+                    self.costs[(x, y)] = cost
+        self.neighbors = {pos: [n for n in get_neighbors_in_orthogonal_order(pos, model) if n in self.costs]
+                          for pos in self.costs}
+        self.nodes = {pos for pos, neighbors in self.neighbors.items() if len(neighbors) != 2}
+        self.edges = []  # [extremo a, extremo b, casillas interiores de a hacia b, las mismas al revés, suma de costos]
+        self.adjacency = {node: [] for node in self.nodes}  # nodo -> ids de aristas
+        self.edge_of = {}  # casilla interior -> (id de arista, índice en sus casillas)
+
+        started = set()  # (nodo, primera casilla) de los pasillos ya recorridos
+        for node in list(self.nodes):
+            self.walk_from(node, started)
+        # Ciclos sin ningún cruce: una casilla cualquiera de cada uno pasa a ser nodo
+        for pos in self.costs:
+            if pos not in self.nodes and pos not in self.edge_of:
+                self.nodes.add(pos)
+                self.adjacency[pos] = []
+                self.walk_from(pos, started)
+
+    def walk_from(self, node, started):
+        for first in self.neighbors[node]:
+            if (node, first) in started:
+                continue
+            cells = []
+            previous, current = node, first
+            while current not in self.nodes:
+                cells.append(current)
+                following = next(n for n in self.neighbors[current] if n != previous)
+                previous, current = current, following
+            started.add((node, first))
+            started.add((current, cells[-1] if cells else node))
+            edge = len(self.edges)
+            self.edges.append([node, current, tuple(cells), tuple(reversed(cells)),
+                               sum(self.costs[cell] for cell in cells)])
+            self.adjacency[node].append(edge)
+            if current != node:
+                self.adjacency[current].append(edge)
+            for index, cell in enumerate(cells):
+                self.edge_of[cell] = (edge, index)
+
+    def invalidate(self, pos):
+        """Marca pos como pendiente (se llama desde notify_terrain_change)."""
+        with self.lock:
+            self.dirty.add(pos)
+
+    def refresh(self, model):
+        """Actualiza los costos de las casillas marcadas y las sumas de sus pasillos."""
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+        for pos in dirty:
+            cost = cell_cost(pos, model)
+            if (cost is None) != (pos not in self.costs):
+                self.build(model)
+                return
+            if cost is None:
+                continue
+            self.costs[pos] = cost
+            if pos in self.edge_of:
+                edge = self.edges[self.edge_of[pos][0]]
+                edge[4] = sum(self.costs[cell] for cell in edge[2])
+
+    def segment(self, pos, weighted):
+        """
+        Arcos desde una casilla interior hasta los extremos de su pasillo.
+
+        Returns:
+            list: (extremo, costo de entrar en las casillas hasta el extremo incluido, casillas intermedias).
+        """
+        edge, index = self.edge_of[pos]
+        a, b, cells, _, _ = self.edges[edge]
+        toward_a = cells[index - 1::-1] if index else ()
+        toward_b = cells[index + 1:]
+        return [(a, self.path_cost(toward_a, weighted) + self.step_cost(a, weighted), toward_a),
+                (b, self.path_cost(toward_b, weighted) + self.step_cost(b, weighted), toward_b)]
+
+    def step_cost(self, pos, weighted):
+        return self.costs[pos] if weighted else 1
+
+    def path_cost(self, cells, weighted):
+        return sum(self.costs[cell] for cell in cells) if weighted else len(cells)
+
+    def find_path(self, start, goal, model, heuristic=None, cost=None, record_state=None):
+        """
+        Busca sobre el grafo contraído: UCS sin heurística, A* con ella.
+
+        Args:
+            start (tuple): Posición inicial.
+            goal (tuple): Posición objetivo.
+            model (BombermanModel): Modelo (o vista del modelo) sobre el que se busca.
+            heuristic (function, optional): Heurística admisible entre casillas.
+            cost (function, optional): cell_cost para pesar las rocas; por defecto cada paso cuesta 1.
+
+        Returns:
+            list: El camino casilla por casilla desde start hasta goal, o None si no hay camino.
+        """
+        # Varias búsquedas en segundo plano del mismo modelo pueden correr a la vez: una no
+        # debe recorrer el grafo mientras otra lo corrige en refresh
+        with self.search_lock:
+            return self.search(start, goal, model, heuristic=heuristic, cost=cost, record_state=record_state)
+
+    def search(self, start, goal, model, heuristic=None, cost=None, record_state=None):
+        self.refresh(model)
+        if start not in self.costs or goal not in self.costs:
+            return None
+        weighted = cost is not None
+
+        def h(node):
+            return heuristic(node, goal) if heuristic else 0
+
+        # Arcos temporales: del inicio a los extremos de su pasillo y de los extremos del de la meta a la meta
+        from_start = self.segment(start, weighted) if start not in self.nodes else []
+        into_goal = {}
+        if goal not in self.nodes:
+            goal_cost = self.step_cost(goal, weighted)
+            for end, end_cost, cells in self.segment(goal, weighted):
+                # Del extremo a la meta se recorren las mismas casillas al revés
+                arc_cost = end_cost - self.step_cost(end, weighted) + goal_cost
+                into_goal.setdefault(end, []).append((goal, arc_cost, cells[::-1]))
+            if start in self.edge_of and self.edge_of[start][0] == self.edge_of[goal][0]:
+                index, goal_index = self.edge_of[start][1], self.edge_of[goal][1]
+                cells = self.edges[self.edge_of[goal][0]][2]
+                between = cells[index + 1:goal_index] if index < goal_index else cells[goal_index + 1:index][::-1]
+                from_start.append((goal, self.path_cost(between, weighted) + goal_cost, between))
+
+        def successors(node):
+            if node == start and node not in self.nodes:
+                return from_start
+            result = []
+            for edge in self.adjacency[node]:
+                a, b, cells, reverse, total = self.edges[edge]
+                for origin, end, inner in ((a, b, cells), (b, a, reverse)):
+                    if origin == node:
+                        result.append((end, (total if weighted else len(inner)) + self.step_cost(end, weighted), inner))
+            result.extend(into_goal.get(node, ()))
+            return result
+
+        counter = count()
+        # (f(n), h(n), contador, nodo): a igual f se prefiere el nodo más cerca de la meta, como en a_star_search
+        queue = [(h(start), h(start), next(counter), start)]
+        g_cost = {start: 0}
+        came_from = {start: None}  # nodo -> (nodo anterior, casillas intermedias)
+        closed = set()
+        step_counter = 0
+        numbered = 0  # Casillas numeradas, incluidas las interiores de cada pasillo
+        frontier_peak = 1
+
+        while queue:
+            _, _, _, node = heappop(queue)
+            if node in closed:
+                continue
+            closed.add(node)
+            # Las casillas del pasillo por el que se llegó se numeran en orden antes que el
+            # nodo, como las visitaría la búsqueda casilla por casilla: Bomb.explode solo
+            # libera el comodín de una roca con número de exploración
+            for cell in (*came_from[node][1], node) if came_from[node] else (node,):
+                model.place_agent_number(cell, numbered)
+                numbered += 1
+            if record_state:
+                record_state(node, heuristic(node, goal) if heuristic else None)
+            step_counter += 1
+
+            if node == goal:
+                report_search_stats(model, step_counter, frontier_peak, len(g_cost))
+                return self.expand(goal, came_from)
+
+            for neighbor, arc_cost, cells in successors(node):
+                if neighbor in closed:
+                    continue
+                tentative = g_cost[node] + arc_cost
+                if tentative < g_cost.get(neighbor, float('inf')):
+                    g_cost[neighbor] = tentative
+                    came_from[neighbor] = (node, cells)
+                    estimate = h(neighbor)
+                    heappush(queue, (tentative + estimate, estimate, next(counter), neighbor))
+            frontier_peak = max(frontier_peak, len(queue))
+
+        report_search_stats(model, step_counter, frontier_peak, len(g_cost))
+        return None
+
+    def expand(self, goal, came_from):
+        """Convierte la secuencia de nodos en el camino completo, con las casillas de cada pasillo."""
+        pieces = []
+        node = goal
+        while came_from[node] is not None:
+            previous, cells = came_from[node]
+            pieces.append([*cells, node])
+            node = previous
+        path = [node]
+        for piece in reversed(pieces):
+            path.extend(piece)
+        return path
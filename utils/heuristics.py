@@ -0,0 +1,188 @@
+from heapq import heapify, heappush, heappop
+from itertools import count
+from threading import Lock
+from utils.search_algorithms import cell_cost, get_neighbors_in_orthogonal_order, manhattan_distance, euclidean_distance
+
+# Heurísticas cuyo valor sale de tablas de distancias reales; miden el costo de cell_cost
+TABLE_HEURISTICS = ("Exacta", "ALT")
+# Cantidad de landmarks para las heurísticas diferenciales
+LANDMARK_COUNT = 4
+
+
+def distance_table(source, model, reverse=False):
+    """
+    Dijkstra desde source con los costos de cell_cost (las rocas pesan ROCK_COST).
+
+    Args:
+        source (tuple): Casilla de origen.
+        model (BombermanModel): Modelo con la grilla.
+        reverse (bool): Si es True, calcula el costo de ir de cada casilla hasta
+            source (búsqueda inversa desde la meta) en lugar de ir desde source.
+
+    Returns:
+        dict: {posición: costo}; las casillas inalcanzables no aparecen.
+    """
+    dist = {source: 0}
+    relax(dist, [(0, 0, source)], model, reverse)
+    return dist
+
+
+def patch_table(dist, cells, model, reverse=False):
+    """
+    Corrige en dist el costo que bajó en cells (rocas destruidas) sin rehacer el Dijkstra.
+
+    El terreno solo cambia al destruirse rocas, así que los costos de cell_cost nunca
+    suben y la corrección solo baja valores: basta volver a relajar desde las casillas
+    afectadas y propagar las mejoras. En la tabla inversa entrar en la casilla cambiada
+    es más barato para sus vecinos; en la directa, llegar a ella desde sus vecinos.
+
+    Args:
+        dist (dict): Tabla de distance_table; se modifica en el lugar.
+        cells (iterable): Casillas cuyo costo bajó.
+        model (BombermanModel): Modelo con la grilla ya cambiada.
+        reverse (bool): El mismo valor con el que se calculó la tabla.
+    """
+    queue = []
+    for cell in cells:
+        sources = [cell] if reverse else get_neighbors_in_orthogonal_order(cell, model)
+        queue.extend((dist[pos], 0, pos) for pos in sources if pos in dist)
+    heapify(queue)
+    relax(dist, queue, model, reverse)
+
+
+def relax(dist, queue, model, reverse):
+    """Bucle de Dijkstra compartido por distance_table y patch_table: (costo, desempate, casilla)."""
+    counter = count(1)
+    while queue:
+        cost, _, node = heappop(queue)
+        if cost > dist[node]:
+            continue
+        # En la búsqueda inversa, pasar de neighbor a node cuesta entrar en node
+        reverse_step = cell_cost(node, model) if reverse else None
+        for neighbor in get_neighbors_in_orthogonal_order(node, model):
+            step = cell_cost(neighbor, model)
+            if step is None:
+                continue
+            if reverse:
+                step = reverse_step
+            if cost + step < dist.get(neighbor, float('inf')):
+                dist[neighbor] = cost + step
+                heappush(queue, (cost + step, next(counter), neighbor))
+
+
+def goal_distance_table(goal, model):
+    """Costo real desde cada casilla hasta goal (búsqueda inversa desde la meta)."""
+    return distance_table(goal, model, reverse=True)
+
+
+def select_landmarks(model, start, amount):
+    """
+    Elige landmarks por el método del punto más lejano: cada uno es la casilla
+    alcanzable más alejada de los anteriores.
+    """
+    landmarks = []
+    closest = distance_table(start, model)
+    for _ in range(amount):
+        candidates = [pos for pos in closest if pos not in landmarks]
+        if not candidates:
+            break
+        landmark = max(candidates, key=lambda pos: closest[pos])
+        landmarks.append(landmark)
+        for pos, cost in distance_table(landmark, model).items():
+            closest[pos] = min(closest.get(pos, cost), cost)
+    return landmarks
+
+
+class HeuristicLibrary:
+    """
+    Heurísticas disponibles para BombermanModel.heuristic.
+
+    - "Manhattan" y "Euclidiana": las de siempre, sin precálculo.
+    - "Exacta": tabla con el costo real hasta la meta, calculada con una búsqueda
+      inversa y guardada por meta; con ella A* solo expande el camino óptimo.
+    - "ALT": cota diferencial con landmarks, h(n) = max(d(L, meta) - d(L, n), d(n, L) - d(meta, L)),
+      útil cuando la meta cambia seguido y no conviene una tabla por meta.
+
+    Las tablas dependen del terreno. notify_terrain_change anota cada casilla que
+    cambió (invalidate) y la próxima consulta de una tabla le aplica las pendientes
+    con patch_table, en lugar de rehacer los Dijkstra en cada roca destruida; los
+    landmarks elegidos al principio se conservan. Las búsquedas en segundo plano usan
+    las tablas desde otros hilos: la corrección se hace con un candado sobre una copia,
+    y la copia corregida reemplaza a la tabla, así que quien ya la estaba leyendo sigue
+    con la anterior.
+
+    Args:
+        model (BombermanModel): Modelo con el mapa cargado.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.changes = []  # Casillas que cambiaron, en orden; su largo es la revisión de las tablas
+        self.tables = {}  # meta -> (cambios aplicados, tabla de distancias)
+        self.landmarks = None  # (cambios aplicados, [(desde L, hasta L)])
+        self.lock = Lock()
+
+    def invalidate(self, pos):
+        """Anota que el costo de pos bajó (se llama desde notify_terrain_change)."""
+        with self.lock:
+            self.changes.append(pos)
+
+    def function(self, name):
+        """Devuelve la heurística h(pos, goal) con ese nombre."""
+        if name == "Manhattan":
+            return manhattan_distance
+        if name == "Euclidiana":
+            return euclidean_distance
+        if name == "Exacta":
+            return self.exact
+        if name == "ALT":
+            return self.alt
+        raise ValueError(f"Heurística desconocida: {name}")
+
+    def goal_table(self, goal):
+        cached = self.tables.get(goal)
+        if cached is None or cached[0] < len(self.changes):
+            with self.lock:
+                # Otro hilo pudo corregirla mientras se esperaba el candado
+                cached = self.tables.get(goal)
+                applied = len(self.changes)
+                if cached is None:
+                    cached = self.tables[goal] = (applied, goal_distance_table(goal, self.model))
+                elif cached[0] < applied:
+                    table = dict(cached[1])
+                    patch_table(table, set(self.changes[cached[0]:]), self.model, reverse=True)
+                    cached = self.tables[goal] = (applied, table)
+        return cached[1]
+
+    def exact(self, pos, goal):
+        return self.goal_table(goal).get(pos, float('inf'))
+
+    def landmark_tables(self):
+        cached = self.landmarks
+        if cached is None or cached[0] < len(self.changes):
+            with self.lock:
+                cached = self.landmarks
+                applied = len(self.changes)
+                if cached is None:
+                    start = self.model.bombermen[0].pos if self.model.bombermen else (0, 0)
+                    tables = [(distance_table(landmark, self.model), distance_table(landmark, self.model, reverse=True))
+                              for landmark in select_landmarks(self.model, start, LANDMARK_COUNT)]
+                    cached = self.landmarks = (applied, tables)
+                elif cached[0] < applied:
+                    cells = set(self.changes[cached[0]:])
+                    tables = []
+                    for from_landmark, to_landmark in cached[1]:
+                        from_landmark, to_landmark = dict(from_landmark), dict(to_landmark)
+                        patch_table(from_landmark, cells, self.model)
+                        patch_table(to_landmark, cells, self.model, reverse=True)
+                        tables.append((from_landmark, to_landmark))
+                    cached = self.landmarks = (applied, tables)
+        return cached[1]
+    def alt(self, pos, goal):
+        best = 0
+        for from_landmark, to_landmark in self.landmark_tables():
+            # Desigualdad triangular en ambos sentidos: d(n, meta) >= d(L, meta) - d(L, n)
+            # y d(n, meta) >= d(n, L) - d(meta, L)
+            if pos in from_landmark and goal in from_landmark:
+                best = max(best, from_landmark[goal] - from_landmark[pos], to_landmark[pos] - to_landmark[goal])
+        return best
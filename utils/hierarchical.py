@@ -0,0 +1,281 @@
+from heapq import heappush, heappop
+from itertools import count
+from threading import Lock
+from utils.search_algorithms import cell_cost, get_neighbors_in_orthogonal_order, report_search_stats
+
+# Un tramo de borde más largo que esto aporta dos entradas (una en cada extremo) en vez de una
+LONG_SEGMENT = 6
+
+
+class ClusterAbstraction:
+    """
+    Grafo abstracto para búsqueda jerárquica (HPA*).
+
+    La grilla se divide en clusters de cluster_size x cluster_size. En cada borde entre
+    dos clusters vecinos, los tramos de casillas transitables a ambos lados se convierten
+    en entradas; dentro de cada cluster se precalcula el costo entre todas sus entradas.
+    Cuando el terreno cambia, solo se recalculan los clusters tocados, en la siguiente
+    búsqueda. Los costos son los de cell_cost, así que una roca destruida abarata los
+    caminos que pasaban por ella.
+
+    Args:
+        model (BombermanModel): Modelo con el mapa ya cargado.
+        cluster_size (int): Lado de cada cluster en casillas.
+    """
+
+    def __init__(self, model, cluster_size=8):
+        self.width = model.grid_width
+        self.height = model.grid_height
+        self.cluster_size = cluster_size
+        self.transitions = {}  # (cluster, cluster vecino) -> [(casilla de un lado, casilla del otro)]
+        self.links = {}  # entrada -> casillas vecinas en otro cluster
+        self.edges = {}  # cluster -> {entrada: {otra entrada: costo}}
+        self.paths = {}  # cluster -> {(entrada, entrada): camino refinado}
+        self.dirty = set()
+        self.lock = Lock()  # Protege dirty, que se marca desde el hilo principal
+        self.search_lock = Lock()
+
+        clusters = [(cx, cy) for cx in range(self.cluster_count(self.width))
+                    for cy in range(self.cluster_count(self.height))]
+        for cluster in clusters:
+            for border in self.borders_of(cluster):
+                if border[0] == cluster:
+                    self.build_border(border, model)
+        for cluster in clusters:
+            self.build_cluster(cluster, model)
+
+    def cluster_count(self, cells):
+        return (cells + self.cluster_size - 1) // self.cluster_size
+
+    def cluster_of(self, pos):
+        return pos[0] // self.cluster_size, pos[1] // self.cluster_size
+
+    def borders_of(self, cluster):
+        """Bordes del cluster con sus vecinos a la derecha, arriba, izquierda y abajo."""
+        cx, cy = cluster
+        borders = []
+        if (cx + 1) * self.cluster_size < self.width:
+            borders.append((cluster, (cx + 1, cy)))
+        if (cy + 1) * self.cluster_size < self.height:
+            borders.append((cluster, (cx, cy + 1)))
+        if cx > 0:
+            borders.append(((cx - 1, cy), cluster))
+        if cy > 0:
+            borders.append(((cx, cy - 1), cluster))
+        return borders
+
+    def invalidate(self, pos):
+        """Marca como pendiente el cluster que contiene pos (se llama desde notify_terrain_change)."""
+        with self.lock:
+            self.dirty.add(self.cluster_of(pos))
+
+    def refresh(self, model):
+        """Recalcula los clusters marcados y los vecinos cuyas entradas cambiaron."""
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+        touched = set(dirty)
+        for cluster in dirty:
+            for border in self.borders_of(cluster):
+                if self.build_border(border, model):
+                    touched.update(border)
+        for cluster in touched:
+            self.build_cluster(cluster, model)
+
+    def build_border(self, border, model):
+        """
+        Calcula las transiciones de un borde.
+
+        Returns:
+            bool: True si las transiciones cambiaron respecto a las anteriores.
+        """
+        (ax, ay), (bx, by) = border
+        size = self.cluster_size
+        if bx > ax:
+            x = bx * size
+            pairs = [((x - 1, y), (x, y)) for y in range(ay * size, min((ay + 1) * size, self.height))]
+        else:
+            y = by * size
+            pairs = [((x, y - 1), (x, y)) for x in range(ax * size, min((ax + 1) * size, self.width))]
+
+        transitions = []
+        segment = []
+        for pair in pairs + [None]:
+            if pair is not None and all(cell_cost(cell, model) is not None for cell in pair):
+                segment.append(pair)
+                continue
+            if len(segment) >= LONG_SEGMENT:
+                transitions.extend((segment[0], segment[-1]))
+            elif segment:
+                transitions.append(segment[len(segment) // 2])
+            segment = []
+
+        previous = self.transitions.get(border, [])
+        if transitions == previous:
+            return False
+        for a, b in previous:
+            self.links[a].discard(b)
+            self.links[b].discard(a)
+        for a, b in transitions:
+            self.links.setdefault(a, set()).add(b)
+            self.links.setdefault(b, set()).add(a)
+        self.transitions[border] = transitions
+        return True
+
+    def entrances_of(self, cluster):
+        entrances = set()
+        for border in self.borders_of(cluster):
+            side = 0 if border[0] == cluster else 1
+            entrances.update(pair[side] for pair in self.transitions.get(border, []))
+        return entrances
+
+    def build_cluster(self, cluster, model):
+        """Precalcula el costo entre cada par de entradas del cluster."""
+        entrances = self.entrances_of(cluster)
+        edges = {}
+        for entrance in entrances:
+            dist, _ = self.local_search(entrance, cluster, model)
+            edges[entrance] = {other: dist[other] for other in entrances if other != entrance and other in dist}
+        self.edges[cluster] = edges
+        self.paths[cluster] = {}
+
+    def local_search(self, start, cluster, model, goal=None):
+        """
+        Dijkstra restringido a las casillas de un cluster.
+
+        Returns:
+            tuple: (costos desde start, diccionario de padres). Con goal, se detiene al alcanzarlo.
+        """
+        dist = {start: 0}
+        came_from = {start: None}
+        counter = count()
+        queue = [(0, next(counter), start)]
+        while queue:
+            cost, _, node = heappop(queue)
+            if cost > dist[node]:
+                continue
+            if node == goal:
+                break
+            for neighbor in get_neighbors_in_orthogonal_order(node, model):
+                if self.cluster_of(neighbor) != cluster:
+                    continue
+                step = cell_cost(neighbor, model)
+                if step is None:
+                    continue
+                if cost + step < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = cost + step
+                    came_from[neighbor] = node
+                    heappush(queue, (cost + step, next(counter), neighbor))
+        return dist, came_from
+
+    def local_path(self, start, goal, model):
+        cluster = self.cluster_of(start)
+        cache = self.paths[cluster] if start in self.edges[cluster] and goal in self.edges[cluster] else {}
+        path = cache.get((start, goal))
+        if path is None:
+            _, came_from = self.local_search(start, cluster, model, goal)
+            path = []
+            node = goal
+            while node is not None:
+                path.append(node)
+                node = came_from[node]
+            path.reverse()
+            cache[(start, goal)] = path
+        return path
+
+    def find_path(self, start, goal, model, heuristic, record_state=None):
+        """
+        Busca un camino con A* sobre el grafo abstracto y lo refina dentro de cada cluster.
+
+        Args:
+            start (tuple): Posición inicial.
+            goal (tuple): Posición objetivo.
+            model (BombermanModel): Modelo (o vista del modelo) sobre el que se busca.
+            heuristic (function): Heurística admisible para el A* abstracto.
+
+        Returns:
+            list: El camino casilla por casilla, o None si no hay camino.
+        """
+        # Varias búsquedas en segundo plano del mismo modelo pueden correr a la vez: una no
+        # debe recorrer el grafo mientras otra lo corrige en refresh
+        with self.search_lock:
+            return self.search(start, goal, model, heuristic, record_state=record_state)
+
+    def search(self, start, goal, model, heuristic, record_state=None):
+        self.refresh(model)
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+
+        # Inicio y meta se conectan temporalmente con las entradas de su cluster
+        dist, _ = self.local_search(start, start_cluster, model)
+        from_start = {node: cost for node, cost in dist.items()
+                      if node in self.edges[start_cluster] or node == goal}
+        dist, _ = self.local_search(goal, goal_cluster, model)
+        # El costo de e a la meta es el del camino inverso corregido por las casillas extremas
+        goal_cost = cell_cost(goal, model)
+        into_goal = {node: cost - cell_cost(node, model) + goal_cost
+                     for node, cost in dist.items() if node in self.edges[goal_cluster]}
+
+        def successors(node):
+            cluster = self.cluster_of(node)
+            result = list(self.edges[cluster].get(node, {}).items())
+            for other in self.links.get(node, ()):
+                cost = cell_cost(other, model)
+                if cost is not None:
+                    result.append((other, cost))
+            if node == start:
+                result.extend(from_start.items())
+            if node in into_goal:
+                result.append((goal, into_goal[node]))
+            return result
+
+        counter = count()
+        queue = [(heuristic(start, goal), next(counter), start)]
+        g_cost = {start: 0}
+        came_from = {start: None}
+        closed = set()
+        step_counter = 0
+        frontier_peak = 1
+
+        while queue:
+            _, _, node = heappop(queue)
+            if node in closed:
+                continue
+            closed.add(node)
+            model.place_agent_number(node, step_counter)
+            if record_state:
+                record_state(node, heuristic(node, goal))
+            step_counter += 1
+
+            if node == goal:
+                report_search_stats(model, step_counter, frontier_peak, len(g_cost))
+                return self.refine(goal, came_from, model)
+
+            for neighbor, cost in successors(node):
+                if neighbor in closed or neighbor == node:
+                    continue
+                tentative = g_cost[node] + cost
+                if tentative < g_cost.get(neighbor, float('inf')):
+                    g_cost[neighbor] = tentative
+                    came_from[neighbor] = node
+                    heappush(queue, (tentative + heuristic(neighbor, goal), next(counter), neighbor))
+            frontier_peak = max(frontier_peak, len(queue))
+
+        report_search_stats(model, step_counter, frontier_peak, len(g_cost))
+        return None
+
+    def refine(self, goal, came_from, model):
+        """Convierte la secuencia de nodos abstractos en el camino completo."""
+        abstract = []
+        node = goal
+        while node is not None:
+            abstract.append(node)
+            node = came_from[node]
+        abstract.reverse()
+
+        path = [abstract[0]]
+        for current, following in zip(abstract, abstract[1:]):
+            if following in self.links.get(current, ()):
+                path.append(following)
+            else:
+                path.extend(self.local_path(current, following, model)[1:])
+        return path
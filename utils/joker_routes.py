@@ -0,0 +1,259 @@
+from heapq import heappush, heappop
+from math import ceil, inf
+from agents.joker import Joker
+from agents.rock import Rock
+from utils.bomb_planner import clear_age
+from utils.search_algorithms import ROCK_COST, cell_cost, get_neighbors_in_orthogonal_order
+
+# Con hasta EXACT_LIMIT comodines candidatos la ruta se resuelve exacta (Held-Karp);
+# con más, por inserción del comodín que más ticks ahorra
+EXACT_LIMIT = 10
+# Comodines que se consideran como máximo: los de menor desvío estimado hacia la salida
+MAX_CANDIDATES = 16
+# Movimientos estimados para esconderse de cada bomba y volver
+ESCAPE_TICKS = 2
+
+
+def leg_ticks(steps, rocks, power):
+    """
+    Ticks estimados para recorrer un tramo con bombas de poder power.
+
+    Cada bomba despeja hasta power rocas seguidas del tramo y cuesta clear_age(power)
+    ticks de espera más el escape, así que más poder conviene cuando quedan muchas rocas.
+
+    Args:
+        steps (int): Casillas del tramo (incluidas las de roca).
+        rocks (int): Rocas del tramo.
+        power (int): Poder de las bombas durante el tramo.
+    """
+    return steps + ceil(rocks / power) * (clear_age(power) + ESCAPE_TICKS)
+
+
+def leg_matrix(points, model, limit=inf):
+    """
+    Tramos entre todos los pares de points con una sola búsqueda de varios orígenes.
+
+    Es Dijkstra con cell_cost desde todos los puntos a la vez: cada etiqueta del
+    montículo es (costo, rocas, origen, casilla) y cada origen guarda sus propias
+    casillas cerradas, mientras que los vecinos transitables de cada casilla y sus
+    costos se calculan una sola vez para todos. El costo de un camino es la suma de
+    las casillas en las que entra, así que el tramo de b a a es el de a a b corregido
+    por las casillas de los extremos: cada origen solo busca los puntos que le siguen
+    en la lista y se detiene al alcanzarlos.
+
+    Args:
+        points (list): Posiciones distintas (inicio, salida y comodines).
+        model (BombermanModel): Modelo sobre el que se busca.
+        limit (float): Costo máximo de un tramo; los más caros quedan en None.
+
+    Returns:
+        list: legs[i][j] = (pasos, rocas) del camino más barato de points[i] a points[j],
+            o None si no hay camino.
+    """
+    n = len(points)
+    index = {point: i for i, point in enumerate(points)}
+    found = [[None] * n for _ in range(n)]  # found[i][j] = (costo, rocas) con i < j
+    pending = [n - 1 - i for i in range(n)]  # Puntos que le faltan a cada origen
+    closed = [set() for _ in range(n)]
+    best = [{point: 0} for point in points]
+    adjacent = {}  # casilla -> [(vecino transitable, su cell_cost)]
+    heap = [(0, 0, i, point) for i, point in enumerate(points) if pending[i]]
+
+    while heap:
+        cost, rocks, source, cell = heappop(heap)
+        if not pending[source] or cell in closed[source]:
+            continue
+        closed[source].add(cell)
+        target = index.get(cell)
+        if target is not None and target > source:
+            found[source][target] = (cost, rocks)
+            pending[source] -= 1
+            if not pending[source]:
+                continue
+        if cell not in adjacent:
+            adjacent[cell] = [(neighbor, step) for neighbor in get_neighbors_in_orthogonal_order(cell, model)
+                              for step in (cell_cost(neighbor, model),) if step is not None]
+        for neighbor, step in adjacent[cell]:
+            new_cost = cost + step
+            if new_cost <= limit and new_cost < best[source].get(neighbor, inf) and neighbor not in closed[source]:
+                best[source][neighbor] = new_cost
+                heappush(heap, (new_cost, rocks + (step == ROCK_COST), source, neighbor))
+
+    point_costs = [cell_cost(point, model) or 0 for point in points]
+    legs = [[None] * n for _ in range(n)]
+    for i in range(n):
+        legs[i][i] = (0, 0)
+        for j in range(i + 1, n):
+            if found[i][j] is None:
+                continue
+            cost, rocks = found[i][j]
+            back_cost = cost + point_costs[i] - point_costs[j]
+            back_rocks = rocks + (point_costs[i] == ROCK_COST) - (point_costs[j] == ROCK_COST)
+            legs[i][j] = (cost - rocks * (ROCK_COST - 1), rocks)
+            if back_cost <= limit:
+                legs[j][i] = (back_cost - back_rocks * (ROCK_COST - 1), back_rocks)
+    return legs
+
+
+def route_ticks(route, legs, power):
+    """Ticks de ir del inicio (0) a la salida (1) pasando por los comodines de route en orden."""
+    total = 0
+    previous = 0
+    for node in [*route, 1]:
+        leg = legs[previous][node]
+        if leg is None:
+            return inf
+        total += leg_ticks(*leg, power)
+        power += node != 1
+        previous = node
+    return total
+
+
+def exact_route(legs, power):
+    """
+    Mejor orden de comodines con programación dinámica sobre subconjuntos (Held-Karp).
+
+    El poder al salir de un comodín es el inicial más la cantidad de comodines del
+    subconjunto, así que el costo de cada tramo depende solo del estado (subconjunto, último).
+
+    Args:
+        legs (list): Resultado de leg_matrix con el inicio en 0, la salida en 1 y los comodines después.
+        power (int): Poder actual de Bomberman.
+
+    Returns:
+        list: Índices (en legs) de los comodines a visitar en orden; vacía si no conviene ninguno.
+    """
+    k = len(legs) - 2
+    ticks = [[inf] * k for _ in range(1 << k)]
+    previous = [[None] * k for _ in range(1 << k)]
+    for j in range(k):
+        if legs[0][j + 2] is not None:
+            ticks[1 << j][j] = leg_ticks(*legs[0][j + 2], power)
+
+    best_total = route_ticks([], legs, power)
+    best_state = None
+    for mask in range(1, 1 << k):
+        current_power = power + bin(mask).count("1")
+        for j in range(k):
+            value = ticks[mask][j]
+            if value == inf:
+                continue
+            leg = legs[j + 2][1]
+            if leg is not None:
+                total = value + leg_ticks(*leg, current_power)
+                if total < best_total:
+                    best_total, best_state = total, (mask, j)
+            for following in range(k):
+                if mask & (1 << following) or legs[j + 2][following + 2] is None:
+                    continue
+                candidate = value + leg_ticks(*legs[j + 2][following + 2], current_power)
+                state = mask | (1 << following)
+                if candidate < ticks[state][following]:
+                    ticks[state][following] = candidate
+                    previous[state][following] = j
+
+    route = []
+    while best_state is not None:
+        mask, j = best_state
+        route.append(j + 2)
+        before = previous[mask][j]
+        best_state = (mask & ~(1 << j), before) if before is not None else None
+    return route[::-1]
+
+
+def insertion_route(legs, power):
+    """
+    Orden de comodines por inserción más barata, para muchos candidatos.
+
+    Parte del camino directo a la salida y agrega, de a uno, el comodín y la posición
+    en la ruta que más ticks ahorran; se detiene cuando ninguna inserción ahorra.
+
+    Returns:
+        list: Índices (en legs) de los comodines a visitar en orden.
+    """
+    route = []
+    total = route_ticks(route, legs, power)
+    remaining = set(range(2, len(legs)))
+    while remaining:
+        best = None
+        for node in sorted(remaining):
+            for position in range(len(route) + 1):
+                candidate = route[:position] + [node] + route[position:]
+                ticks = route_ticks(candidate, legs, power)
+                if best is None or ticks < best[0]:
+                    best = (ticks, candidate, node)
+        if best[0] >= total:
+            break
+        total, route, node = best
+        remaining.discard(node)
+    return route
+
+
+class JokerRoutePlanner:
+    """
+    Decide qué comodines recoger antes de ir a la salida y en qué orden.
+
+    Los comodines suben el poder de la bomba y con él la cantidad de rocas que despeja
+    cada explosión, pero desviarse cuesta ticks. El planificador arma los tramos entre
+    Bomberman, los comodines candidatos y la salida con una sola búsqueda (leg_matrix) y
+    elige la ruta de menos ticks estimados (leg_ticks): exacta con pocos comodines y por
+    inserción con muchos. Si ningún desvío conviene, la ruta va directo a la salida.
+
+    Args:
+        model (BombermanModel): Modelo con el mapa ya cargado.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def has_joker(self, pos):
+        """Hay un comodín en pos: una roca que lo esconde o uno ya liberado."""
+        return any(isinstance(obj, Joker) or isinstance(obj, Rock) and obj.has_power_item
+                   for obj in self.model.grid.get_cell_list_contents([pos]))
+
+    def candidates(self, start, exit_position, budget=inf):
+        """
+        Comodines del mapa, los MAX_CANDIDATES de menor desvío en distancia Manhattan.
+
+        Args:
+            budget (float): Ticks de ir directo a la salida; se descartan los comodines
+                cuyo desvío Manhattan ya los supera.
+        """
+        cells = {agent.pos for agent in self.model.schedule.agents
+                 if agent.pos is not None and agent.pos not in (start, exit_position)
+                 and (isinstance(agent, Joker) or isinstance(agent, Rock) and agent.has_power_item)}
+
+        def detour(pos):
+            return (abs(pos[0] - start[0]) + abs(pos[1] - start[1])
+                    + abs(pos[0] - exit_position[0]) + abs(pos[1] - exit_position[1]))
+
+        return sorted((pos for pos in cells if detour(pos) < budget), key=lambda pos: (detour(pos), pos))[:MAX_CANDIDATES]
+
+    def plan(self, start, power):
+        """
+        Calcula la ruta de comodines desde start.
+
+        Args:
+            start (tuple): Posición de Bomberman.
+            power (int): Poder actual de su bomba.
+
+        Returns:
+            list: Casillas de los comodines a recoger, en orden, antes de ir a la salida.
+        """
+        exit_position = self.model.exit_position
+        if not exit_position:
+            return []
+        direct = leg_matrix([start, exit_position], self.model)[0][1]
+        if direct is None:
+            return []
+        # Ninguna ruta que tarde más que ir directo conviene: un tramo de costo c (cell_cost)
+        # tarda al menos c / ROCK_COST ticks y un comodín a más de esa distancia Manhattan sobra
+        budget = leg_ticks(*direct, power)
+        jokers = self.candidates(start, exit_position, budget)
+        if not jokers:
+            return []
+        legs = leg_matrix([start, exit_position, *jokers], self.model, limit=budget * ROCK_COST)
+        solve = exact_route if len(jokers) <= EXACT_LIMIT else insertion_route
+        route = solve(legs, power)
+        self.model.events["comodines_planificados"] += len(route)
+        return [jokers[node - 2] for node in route]
@@ -0,0 +1,166 @@
+import argparse
+import os
+import random
+from collections import deque
+
+LAYOUTS = ("classic", "maze", "arena")
+# Casillas alrededor de Bomberman que quedan sin rocas para que pueda esconderse de su primera bomba
+SAFE_RADIUS = 2
+# Distancia mínima entre Bomberman y los globos al empezar
+BALLOON_MIN_DISTANCE = 5
+
+
+def generate_map(width, height, layout="classic", rock_density=0.3, balloons=3, seed=None):
+    """
+    Genera un mapa en el formato de los archivos de data/ con una salida siempre alcanzable.
+
+    Bomberman empieza en la esquina inferior izquierda, rodeado de casillas libres. La
+    salida se esconde bajo una roca alcanzable desde el inicio (las rocas se pueden
+    romper, solo el metal bloquea), elegida entre las más lejanas.
+
+    Args:
+        width (int): Ancho del mapa.
+        height (int): Alto del mapa.
+        layout (str): "classic" (pilares de metal alternados), "maze" (laberinto de metal)
+            o "arena" (sin metal).
+        rock_density (float): Probabilidad de que una casilla libre tenga una roca.
+        balloons (int): Cantidad de globos.
+        seed (int, optional): Semilla; el mismo valor genera el mismo mapa.
+
+    Returns:
+        list: Filas del mapa en el orden del archivo (la primera es la de arriba), cada
+            una como lista de códigos ("C", "C_b", "C_g", "R", "R_s", "M").
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Distribución desconocida: {layout}")
+    rng = random.Random(seed)
+    # cells[y * width + x], con y = 0 en la fila de abajo como en BombermanModel
+    cells = ["C"] * (width * height)
+    if layout == "classic":
+        for y in range(1, height, 2):
+            for x in range(1, width, 2):
+                cells[y * width + x] = "M"
+    elif layout == "maze":
+        carve_maze(cells, width, height, rng)
+
+    start = 0
+    for index, cell in enumerate(cells):
+        x, y = index % width, index // width
+        if cell == "C" and x + y > SAFE_RADIUS and rng.random() < rock_density:
+            cells[index] = "R"
+
+    order, distances = reachable_cells(cells, width, height, start)
+    # order está ordenado por distancia: la mitad final de las rocas es la más lejana
+    rocks = [index for index in order if cells[index] == "R"]
+    exit_index = rng.choice(rocks[len(rocks) // 2:]) if rocks else order[-1]
+    cells[exit_index] = "R_s"
+
+    free = [index for index in order
+            if cells[index] == "C" and distances[index] >= BALLOON_MIN_DISTANCE]
+    for index in rng.sample(free, min(balloons, len(free))):
+        cells[index] = "C_g"
+    cells[start] = "C_b"
+
+    return [cells[y * width:(y + 1) * width] for y in reversed(range(height))]
+
+
+def carve_maze(cells, width, height, rng, loops=0.1):
+    """
+    Laberinto: las casillas pares son cuartos y se abren pasillos con DFS iterativo.
+    Luego se abre una fracción loops de las paredes restantes entre cuartos, para que
+    haya ciclos y los pasillos sin salida no sean trampas seguras con los globos.
+    """
+    for index in range(len(cells)):
+        cells[index] = "M"
+    cells[0] = "C"
+    stack = [(0, 0)]
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 <= x + dx < width and 0 <= y + dy < height and cells[(y + dy) * width + x + dx] == "M"]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        cells[((y + ny) // 2) * width + (x + nx) // 2] = "C"
+        cells[ny * width + nx] = "C"
+        stack.append((nx, ny))
+
+    for y in range(height):
+        for x in range(width):
+            # Paredes entre dos cuartos: una coordenada par y la otra impar
+            if (x + y) % 2 == 1 and cells[y * width + x] == "M" and rng.random() < loops:
+                horizontal = x % 2 == 1 and x + 1 < width
+                vertical = y % 2 == 1 and y + 1 < height
+                if horizontal or vertical:
+                    cells[y * width + x] = "C"
+
+
+def reachable_cells(cells, width, height, start):
+    """
+    BFS desde start por las casillas sin metal.
+
+    Returns:
+        tuple: (casillas alcanzables en orden de distancia, lista de distancias con -1
+            para las inalcanzables).
+    """
+    distances = [-1] * len(cells)
+    distances[start] = 0
+    order = [start]
+    queue = deque([start])
+    while queue:
+        index = queue.popleft()
+        x = index % width
+        neighbors = []
+        if x > 0:
+            neighbors.append(index - 1)
+        if x < width - 1:
+            neighbors.append(index + 1)
+        if index >= width:
+            neighbors.append(index - width)
+        if index < width * (height - 1):
+            neighbors.append(index + width)
+        for neighbor in neighbors:
+            if distances[neighbor] < 0 and cells[neighbor] != "M":
+                distances[neighbor] = distances[index] + 1
+                order.append(neighbor)
+                queue.append(neighbor)
+    return order, distances
+
+
+def map_to_text(rows):
+    return "\n".join(",".join(row) for row in rows) + "\n"
+
+
+def write_map(rows, path):
+    with open(path, "w") as f:
+        f.write(map_to_text(rows))
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera mapas de Bomberman con salida alcanzable.")
+    parser.add_argument("--size", default="100x100", help="Tamaño ANCHOxALTO.")
+    parser.add_argument("--layout", default="classic", choices=LAYOUTS)
+    parser.add_argument("--rock-density", type=float, default=0.3)
+    parser.add_argument("--balloons", type=int, default=3)
+    parser.add_argument("--count", type=int, default=1, help="Cantidad de mapas (semillas seed, seed+1, ...).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="data/generated", help="Carpeta de salida.")
+    args = parser.parse_args(argv)
+
+    width, height = parse_size(args.size)
+    os.makedirs(args.out, exist_ok=True)
+    for seed in range(args.seed, args.seed + args.count):
+        rows = generate_map(width, height, args.layout, args.rock_density, args.balloons, seed)
+        path = os.path.join(args.out, f"{args.layout}_{width}x{height}_{seed}.txt")
+        write_map(rows, path)
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,17 @@ from itertools import count
 from agents.metal import Metal
 from agents.rock import Rock
 
+# Costo de entrar en una casilla con roca: Bomberman debe poner la bomba, esconderse y volver
+ROCK_COST = 5
+# Expansiones permitidas a SMA* por cada nodo de memoria antes de abandonar la búsqueda
+SMA_EXPANSIONS_PER_NODE = 200
+
 def breadth_first_search(start, goal, model, record_state=None):
     queue = deque([start])
     visited = {start}
     came_from = {start: None}
     step_counter = 0
+    frontier_peak = 1
 
     while queue:
         current = queue.popleft()
@@ -21,6 +27,7 @@ def breadth_first_search(start, goal, model, record_state=None):
 
         # Si estamos en una casilla adyacente a la roca con la salida, terminamos la búsqueda
         if current == goal:
+            report_search_stats(model, step_counter, frontier_peak, len(came_from))
             return reconstruct_path(came_from, current)
         
         # Obtener vecinos en el orden ortogonal
@@ -31,7 +38,9 @@ def breadth_first_search(start, goal, model, record_state=None):
                 visited.add(neighbor)
                 queue.append(neighbor)
                 came_from[neighbor] = current
+        frontier_peak = max(frontier_peak, len(queue))
 
+    report_search_stats(model, step_counter, frontier_peak, len(came_from))
     return None 
 
 def depth_first_search(start, goal, model, record_state=None):
@@ -39,6 +48,7 @@ def depth_first_search(start, goal, model, record_state=None):
     visited = {start}
     came_from = {start: None}
     step_counter = 0
+    frontier_peak = 1
 
     while stack:
         current = stack.pop()
@@ -51,6 +61,7 @@ def depth_first_search(start, goal, model, record_state=None):
 
         # Si estamos en una casilla adyacente a la roca con la salida, terminamos la búsqueda
         if current == goal:
+            report_search_stats(model, step_counter, frontier_peak, len(came_from))
             return reconstruct_path(came_from, current)
         
         # Obtener vecinos en el orden ortogonal
@@ -63,7 +74,9 @@ def depth_first_search(start, goal, model, record_state=None):
                 visited.add(neighbor)
                 stack.append(neighbor)
                 came_from[neighbor] = current
+        frontier_peak = max(frontier_peak, len(stack))
 
+    report_search_stats(model, step_counter, frontier_peak, len(came_from))
     return None 
 
 def uniform_cost_search(start, goal, model, record_state=None):
@@ -86,6 +99,7 @@ def uniform_cost_search(start, goal, model, record_state=None):
     visited = set()
     came_from = {start: None}
     step_counter = 0
+    frontier_peak = 1
 
     while queue:
         # Extraer el nodo con el menor costo acumulado y menor contador
@@ -108,6 +122,7 @@ def uniform_cost_search(start, goal, model, record_state=None):
         
         # Verificar si el nodo actual está adyacente a la meta
         if current_node == goal:
+            report_search_stats(model, step_counter, frontier_peak, len(came_from))
             return reconstruct_path(came_from, current_node)
         
         # Obtener vecinos en el orden ortogonal: izquierda, arriba, derecha, abajo
@@ -118,7 +133,9 @@ def uniform_cost_search(start, goal, model, record_state=None):
                 new_cost = current_cost + 1  # Asumimos que el costo de moverse es 1
                 heappush(queue, (new_cost, next(counter), neighbor))  # Insertar con contador
                 came_from[neighbor] = current_node
+        frontier_peak = max(frontier_peak, len(queue))
 
+    report_search_stats(model, step_counter, frontier_peak, len(came_from))
     return None  # Si no se encuentra un camino
 
 def beam_search(start, goal, model, heuristic ,beam_width=2, record_state=None):
@@ -137,6 +154,7 @@ def beam_search(start, goal, model, heuristic ,beam_width=2, record_state=None):
     queue = [(start, 0)]  # (nodo actual, valor heurístico)
     came_from = {start: None}
     step_counter = 0
+    frontier_peak = 1
 
     while queue:
         # Ordenar la lista según el valor heurístico (distancia a la meta)
@@ -158,6 +176,7 @@ def beam_search(start, goal, model, heuristic ,beam_width=2, record_state=None):
 
             # Si estamos en una casilla adyacente a la roca con la salida, terminamos la búsqueda
             if current_node == goal:
+                report_search_stats(model, step_counter, frontier_peak, len(came_from))
                 return reconstruct_path(came_from, current_node)
             
             # Obtener vecinos en el orden ortogonal
@@ -172,7 +191,9 @@ def beam_search(start, goal, model, heuristic ,beam_width=2, record_state=None):
         
         # Actualizar la cola con los nuevos nodos a expandir
         queue = next_queue
+        frontier_peak = max(frontier_peak, len(queue))
 
+    report_search_stats(model, step_counter, frontier_peak, len(came_from))
     return None  # Si no se encuentra un camino
 
 def hill_climbing(start, goal, model, heuristic, record_state=None):
@@ -193,6 +214,7 @@ def hill_climbing(start, goal, model, heuristic, record_state=None):
     step_counter = 0
     backtrack_stack = []
     visited = set()  # Conjunto de nodos visitados
+    frontier_peak = 0
 
     while current_node != goal:
         
@@ -220,6 +242,7 @@ def hill_climbing(start, goal, model, heuristic, record_state=None):
             next_node, _ = min(valid_neighbors, key=lambda x: x[1])
             came_from[next_node] = current_node
             backtrack_stack.append(current_node)
+            frontier_peak = max(frontier_peak, len(backtrack_stack))
             current_node = next_node
         else:
             # Backtrack if no valid neighbors are found
@@ -227,13 +250,15 @@ def hill_climbing(start, goal, model, heuristic, record_state=None):
                 current_node = backtrack_stack.pop(0)
             else:
                 # No path found; return None if stack is empty
+                report_search_stats(model, step_counter, frontier_peak, len(came_from))
                 return None
 
     # Reconstruir el camino hacia la salida
+    report_search_stats(model, step_counter, frontier_peak, len(came_from))
     return reconstruct_path(came_from, current_node) if current_node == goal else None
 
 
-def a_star_search(start, goal, model, heuristic, record_state=None):
+def a_star_search(start, goal, model, heuristic, record_state=None, cost=None):
     """
     Implementación del algoritmo de búsqueda A* (A estrella).
     
@@ -242,6 +267,7 @@ def a_star_search(start, goal, model, heuristic, record_state=None):
         goal (tuple): Posición objetivo (normalmente la salida bajo una roca).
         model (BombermanModel): El modelo de Mesa que contiene el mapa y los agentes.
         heuristic (function): Función heurística para estimar la distancia a la meta.
+        cost (function, optional): Costo de entrar en una casilla, p. ej. cell_cost; por defecto 1.
     
     Returns:
         list: El camino encontrado desde el inicio hasta la meta.
@@ -249,15 +275,25 @@ def a_star_search(start, goal, model, heuristic, record_state=None):
     # Inicializar la cola de prioridad con un contador para desempate
     queue = []
     counter = count()  # Generador de contadores para desempatar
-    heappush(queue, (0, next(counter), start))  # (f(n), contador, nodo)
+    # (f(n), desempate, contador, nodo). Con las heurísticas de tabla (cost dado), a igual
+    # f se prefiere el nodo de menor h(n), el más cerca de la meta; con Manhattan y
+    # Euclidiana el desempate es 0 y se conserva el orden de siempre (por contador)
+    heappush(queue, (0, 0, next(counter), start))
     
     came_from = {start: None}
     g_cost = {start: 0}  # Diccionario para almacenar el costo g(n) de cada nodo
+    closed = set()  # Nodos ya expandidos
     step_counter = 0
+    frontier_peak = 1
 
     while queue:
-        # Extraer el nodo con el menor valor de f(n) y menor contador
-        _, _, current_node = heappop(queue)
+        # Extraer el nodo con el menor f(n); a igual f, el de menor desempate y menor contador
+        _, _, _, current_node = heappop(queue)
+
+        # Un nodo puede quedar varias veces en la cola; las entradas obsoletas se descartan
+        if current_node in closed:
+            continue
+        closed.add(current_node)
         
         # Marcar la casilla actual con el número de visita
         model.place_agent_number(current_node, step_counter)
@@ -269,26 +305,271 @@ def a_star_search(start, goal, model, heuristic, record_state=None):
 
         # Si el nodo actual está adyacente a la meta, se reconstruye el camino
         if current_node == goal:
+            report_search_stats(model, step_counter, frontier_peak, len(g_cost))
             return reconstruct_path(came_from, current_node)
         
         # Obtener vecinos en el orden ortogonal
         neighbors = get_neighbors_in_orthogonal_order(current_node, model)
 
         for neighbor in neighbors:
-            if is_valid_move(neighbor, model):
+            if neighbor not in closed and is_valid_move(neighbor, model):
                 # Calcular g(n) para el vecino
-                tentative_g_cost = g_cost[current_node] + 1  # Se asume un costo de 1 por movimiento
+                tentative_g_cost = g_cost[current_node] + (cost(neighbor, model) if cost else 1)
                 
                 # Si encontramos un camino más corto a neighbor, o es la primera vez que lo encontramos
                 if neighbor not in g_cost or tentative_g_cost < g_cost[neighbor]:
                     g_cost[neighbor] = tentative_g_cost
-                    f_cost = tentative_g_cost + heuristic(neighbor, goal)  # f(n) = g(n) + h(n)
-                    heappush(queue, (f_cost, next(counter), neighbor))
+                    h_cost = heuristic(neighbor, goal)
+                    f_cost = tentative_g_cost + h_cost  # f(n) = g(n) + h(n)
+                    heappush(queue, (f_cost, h_cost if cost else 0, next(counter), neighbor))
                     came_from[neighbor] = current_node
+        frontier_peak = max(frontier_peak, len(queue))
 
+    report_search_stats(model, step_counter, frontier_peak, len(g_cost))
     return None  # Si no se encuentra un camino
 
 
+def ida_star_search(start, goal, model, heuristic, max_nodes=None, record_state=None, cost=None):
+    """
+    Implementación de A* con profundización iterativa (IDA*).
+
+    Recorre en profundidad con un límite sobre f(n) = g(n) + h(n) que se amplía en
+    cada iteración. Solo guarda el camino actual, así que la memoria es proporcional
+    a la longitud del camino y no a la región explorada.
+
+    Args:
+        start (tuple): Posición inicial de Bomberman.
+        goal (tuple): Posición objetivo.
+        model (BombermanModel): El modelo que contiene el mapa y los agentes.
+        heuristic (function): Función heurística admisible.
+        max_nodes (int, optional): Máximo de expansiones entre todas las iteraciones.
+        cost (function, optional): Costo de entrar en una casilla, p. ej. cell_cost; por defecto 1.
+
+    Returns:
+        list: El camino encontrado, o None si no hay camino o se agotó el presupuesto.
+    """
+    bound = heuristic(start, goal)
+    step_counter = 0
+    frontier_peak = 1
+
+    while True:
+        path = [start]
+        on_path = {start}
+        g_costs = [0]  # g(n) de cada nodo del camino
+        # Iterador de vecinos pendientes por cada nodo del camino (None = aún sin expandir)
+        pending = [None]
+        next_bound = float('inf')
+
+        while path:
+            node = path[-1]
+            if pending[-1] is None:
+                f_cost = g_costs[-1] + heuristic(node, goal)
+                if f_cost > bound:
+                    next_bound = min(next_bound, f_cost)
+                    path.pop()
+                    on_path.discard(node)
+                    g_costs.pop()
+                    pending.pop()
+                    continue
+
+                model.place_agent_number(node, step_counter)
+                if record_state:
+                    record_state(node, heuristic(node, goal))
+                step_counter += 1
+
+                if node == goal:
+                    report_search_stats(model, step_counter, frontier_peak, frontier_peak)
+                    return list(path)
+                if max_nodes is not None and step_counter >= max_nodes:
+                    report_search_stats(model, step_counter, frontier_peak, frontier_peak)
+                    return None
+
+                pending[-1] = iter(get_neighbors_in_orthogonal_order(node, model))
+
+            neighbor = next(pending[-1], None)
+            if neighbor is None:
+                path.pop()
+                on_path.discard(node)
+                g_costs.pop()
+                pending.pop()
+            elif neighbor not in on_path and is_valid_move(neighbor, model):
+                path.append(neighbor)
+                on_path.add(neighbor)
+                g_costs.append(g_costs[-1] + (cost(neighbor, model) if cost else 1))
+                pending.append(None)
+                frontier_peak = max(frontier_peak, len(path))
+
+        if next_bound == float('inf'):
+            report_search_stats(model, step_counter, frontier_peak, frontier_peak)
+            return None
+        bound = next_bound
+
+
+def sma_star_search(start, goal, model, heuristic, max_nodes=None, record_state=None, cost=None):
+    """
+    Implementación simplificada de A* con memoria acotada (SMA*).
+
+    Funciona como A* mientras quepan los nodos; al superar max_nodes olvida la hoja
+    con mayor f(n) y guarda ese valor en su padre, que vuelve a la frontera para
+    regenerar la rama si más adelante resulta ser la mejor opción. El f de cada nodo
+    se respalda con el menor de sus hijos y nunca baja, así que el camino devuelto es
+    óptimo mientras quepa en la memoria. Con memoria
+    muy justa las ramas se regeneran muchas veces, por eso la búsqueda se abandona
+    tras SMA_EXPANSIONS_PER_NODE * max_nodes expansiones.
+
+    Args:
+        start (tuple): Posición inicial de Bomberman.
+        goal (tuple): Posición objetivo.
+        model (BombermanModel): El modelo que contiene el mapa y los agentes.
+        heuristic (function): Función heurística admisible.
+        max_nodes (int, optional): Máximo de nodos en memoria; sin límite se comporta como A*.
+        cost (function, optional): Costo de entrar en una casilla, p. ej. cell_cost; por defecto 1.
+
+    Returns:
+        list: El camino encontrado, o None si no hay camino que quepa en la memoria.
+    """
+    infinity = float('inf')
+    limit = max_nodes if max_nodes is not None else infinity
+    max_expansions = limit * SMA_EXPANSIONS_PER_NODE
+    counter = count()
+
+    # nodo -> [g(n), f(n), padre, hijos en memoria, {hijo olvidado: su f}, profundidad]
+    nodes = {start: [0, heuristic(start, goal), None, set(), {}, 0]}
+    open_nodes = {start}
+    best = [(nodes[start][1], 0, next(counter), start)]  # menor f y mayor profundidad primero
+    worst = [(-nodes[start][1], 0, next(counter), start)]  # mayor f y menor profundidad primero
+    step_counter = 0
+    frontier_peak = 1
+    stored_peak = 1
+
+    def key(entry):
+        # Un padre con hijos olvidados vuelve a la frontera recién cuando le toca al mejor
+        # de ellos; con la clave de los hijos que siguen en memoria se re-expandiría una y
+        # otra vez solo para volver a olvidar la misma rama
+        return max(entry[1], min(entry[4].values())) if entry[4] else entry[1]
+
+    def push(node):
+        f_value, depth = key(nodes[node]), nodes[node][5]
+        heappush(best, (f_value, -depth, next(counter), node))
+        heappush(worst, (-f_value, depth, next(counter), node))
+
+    def backup(node):
+        # El f de un nodo es el menor entre sus hijos (en memoria y olvidados) y nunca baja;
+        # si sube, puede subir también el de sus ancestros
+        while node is not None:
+            entry = nodes[node]
+            values = [nodes[child][1] for child in entry[3]] + list(entry[4].values())
+            if not values or min(values) <= entry[1]:
+                return
+            entry[1] = min(values)
+            push(node)
+            node = entry[2]
+
+    def forget_worst_leaf(current):
+        while worst:
+            neg_f, _, _, node = heappop(worst)
+            entry = nodes.get(node)
+            if entry is None or key(entry) != -neg_f or entry[3] or node in (start, current):
+                continue
+            del nodes[node]
+            open_nodes.discard(node)
+            parent = nodes[entry[2]]
+            parent[3].discard(node)
+            parent[4][node] = entry[1]
+            # El padre vuelve a la frontera para regenerar la rama si llega a ser la mejor
+            open_nodes.add(entry[2])
+            push(entry[2])
+            backup(entry[2])
+            return True
+        return False
+
+    while best:
+        f_value, _, _, current_node = heappop(best)
+        entry = nodes.get(current_node)
+        if entry is None or current_node not in open_nodes or key(entry) != f_value:
+            continue
+        if f_value == infinity:
+            break
+        open_nodes.discard(current_node)
+        forgotten, entry[4] = entry[4], {}
+        if step_counter >= max_expansions:
+            break
+
+        model.place_agent_number(current_node, step_counter)
+        if record_state:
+            record_state(current_node, heuristic(current_node, goal))
+        step_counter += 1
+
+        if current_node == goal:
+            report_search_stats(model, step_counter, frontier_peak, stored_peak)
+            path = []
+            while current_node is not None:
+                path.append(current_node)
+                current_node = nodes[current_node][2]
+            path.reverse()
+            return path
+
+        had_children = bool(entry[3])
+        for neighbor in get_neighbors_in_orthogonal_order(current_node, model):
+            if not is_valid_move(neighbor, model):
+                continue
+            g_value = entry[0] + (cost(neighbor, model) if cost else 1)
+            depth = entry[5] + 1
+            known = nodes.get(neighbor)
+            if known is not None and known[0] <= g_value:
+                continue
+            if known is not None:
+                nodes[known[2]][3].discard(neighbor)
+                # Los descendientes guardan g y profundidad del camino peor: se descartan y
+                # se regeneran desde el nuevo
+                stack = list(known[3])
+                while stack:
+                    open_nodes.discard(stack[-1])
+                    stack.extend(nodes.pop(stack.pop())[3])
+            # Sin memoria para llegar más profundo, la rama no puede alcanzar la meta
+            if depth >= limit - 1 and neighbor != goal:
+                f_neighbor = infinity
+            else:
+                # Un hijo regenerado recupera el valor con el que se olvidó su rama
+                f_neighbor = max(g_value + heuristic(neighbor, goal), entry[1], forgotten.get(neighbor, 0))
+            nodes[neighbor] = [g_value, f_neighbor, current_node, set(), {}, depth]
+            entry[3].add(neighbor)
+            open_nodes.add(neighbor)
+            push(neighbor)
+
+            while len(nodes) > limit:
+                if not forget_worst_leaf(current_node):
+                    break
+        # Sin sucesores nuevos el nodo es un callejón: ningún camino mejor pasa por él
+        if not had_children and not entry[3] and not entry[4]:
+            entry[1] = infinity
+            push(current_node)
+        # Sin límite de memoria nada se olvida y los valores respaldados no se usan
+        if max_nodes is not None:
+            backup(current_node)
+        frontier_peak = max(frontier_peak, len(open_nodes))
+        stored_peak = max(stored_peak, len(nodes))
+
+    report_search_stats(model, step_counter, frontier_peak, stored_peak)
+    return None
+
+
+def report_search_stats(model, nodes_expanded, frontier_peak, nodes_stored):
+    """
+    Guarda en el modelo las métricas de memoria de la última búsqueda.
+
+    Args:
+        nodes_expanded (int): Nodos expandidos.
+        frontier_peak (int): Tamaño máximo que alcanzó la frontera (cola, pila o camino actual).
+        nodes_stored (int): Máximo de nodos guardados a la vez (frontera más visitados).
+    """
+    model.search_stats = {
+        "nodes_expanded": nodes_expanded,
+        "frontier_peak": frontier_peak,
+        "nodes_stored": nodes_stored,
+    }
+
+
 def manhattan_distance(pos1, pos2):
     """
     Calcula la distancia de Manhattan entre dos posiciones.
@@ -305,7 +586,7 @@ def euclidean_distance(pos1, pos2):
     '''
     x1, y1 = pos1
     x2, y2 = pos2
-    return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+    return math.hypot(x2 - x1, y2 - y1)
 
 
 def reconstruct_path(came_from, current):
@@ -337,6 +618,20 @@ def is_valid_move(pos, model):
     
     return True  
 
+def cell_cost(pos, model):
+    """
+    Costo para Bomberman de entrar en pos, o None si la casilla es intransitable.
+
+    Usa la misma regla de paso que is_valid_move, pero las rocas cuestan ROCK_COST.
+    """
+    cost = 1
+    for obj in model.grid.get_cell_list_contents(pos):
+        if isinstance(obj, Metal):
+            return None
+        if isinstance(obj, Rock):
+            cost = ROCK_COST
+    return cost
+
 def is_valid_move_for_balloons(pos, model):
     cell_contents = model.grid.get_cell_list_contents(pos)
     for obj in cell_contents:
@@ -350,6 +645,9 @@ from collections import deque
 def breadth_first_search_without_markers(start, goal, model):
     """
     Algoritmo de búsqueda por anchura (BFS) sin alterar los NumberMarker.
+
+    La expansión usa los bitboards del modelo (utils.bitboard): cada capa de la
+    búsqueda es un desplazamiento de bits sobre las casillas sin rocas ni metal.
     
     Args:
         start (tuple): La posición inicial de Bomberman.
@@ -359,27 +657,11 @@ def breadth_first_search_without_markers(start, goal, model):
     Returns:
         list: El camino encontrado desde el inicio hasta la meta. Si no hay camino, devuelve None.
     """
-    queue = deque([start])
-    visited = {start}
-    came_from = {start: None}
-
-    while queue:
-        current = queue.popleft()
-
-        # Terminar la búsqueda si alcanzamos la meta
-        if current == goal:
-            return reconstruct_path(came_from, current)
-
-        # Obtener vecinos en orden ortogonal
-        neighbors = get_neighbors_in_orthogonal_order(current, model)
-
-        for neighbor in neighbors:
-            if neighbor not in visited and is_valid_move_for_escape(neighbor, model):
-                visited.add(neighbor)
-                queue.append(neighbor)
-                came_from[neighbor] = current
-
-    return None  # Si no se encuentra un camino
+    if not model.is_reachable(start, goal, "escape"):
+        return None
+    boards = model.get_bitboards()
+    goal_bit = boards.bit(goal)
+    return boards.path(boards.layers(start, boards.walkable(), until=goal_bit), goal_bit)
 
 def is_valid_move_for_escape(pos, model):
     """Verifica si Bomberman puede moverse a una posición para escapar, ignorando NumberMarker."""
@@ -397,7 +679,7 @@ def bomberman_heuristic(pos, goal, model):
 
     # Penalización basada en la distancia a los globos
     for agent in model.schedule.agents:
-        if isinstance(agent, Balloon):
+        if isinstance(agent, Balloon) and agent.pos is not None:
             balloon_distance = abs(pos[0] - agent.pos[0]) + abs(pos[1] - agent.pos[1])
             danger_penalty += max(0, 20 - balloon_distance)  # Penalización más fuerte para globos cercanos
 